@@ -14,7 +14,10 @@ Key Features:
 
 Example Usage:
     # Basic agent setup
-    from hexaeight_agent import HexaEightAgent, HexaEightEnvironmentManager
+    from hexaeight_agent import HexaEightAgent, HexaEightEnvironmentManager, warmup
+    
+    # Optionally load the .NET runtime up front (otherwise it loads on first use)
+    warmup()
     
     # Load environment
     HexaEightEnvironmentManager.load_hexaeight_variables_from_env_file("env-file")
@@ -117,8 +120,7 @@ def _setup_native_libraries():
         print(f"⚠️ HexaEight Agent: Failed to setup native libraries: {e}")
         print("SQLite operations may not work properly")
 
-# Setup native libraries on import - this happens automatically when package is imported
-_setup_native_libraries()
+# Native libraries are set up together with the .NET runtime, on first use or warmup()
 
 __version__ = "1.6.805"
 __author__ = "HexaEight"
@@ -130,13 +132,29 @@ from .hexaeight_agent import (
     HexaEightAgent,
     HexaEightAgentConfig,  # Alias for backwards compatibility
     
+    # PubSub connection sessions
+    PubSubSession,
+    
+    # LLM gateway client
+    LLMClient,
+    LLMResponseCache,
+    
     # Environment management
     HexaEightEnvironmentManager,
     
+    # Multi-process workers
+    HexaEightWorkerPool,
+    AgentWorkerConfig,
+    run_agent_workers,
+    
     # Data classes
     TaskStep,
     TaskInfo,
+    TaskHandle,
     MessageLock,
+    MessageLockScope,
+    ScheduledMessage,
+    SigningContext,
     LLMMessage,
     LLMRequest,
     LLMResponse,
@@ -152,6 +170,7 @@ from .hexaeight_agent import (
     # Enums
     MessageType,
     TargetType,
+    OverflowPolicy,
     
     # Exceptions
     HexaEightAgentError,
@@ -164,21 +183,40 @@ from .hexaeight_agent import (
 )
 
 # Import global debug control functions
-from .hexaeight_agent import enable_library_debug, is_library_debug_enabled, show_examples, get_demo_path, get_create_scripts_path
+from .hexaeight_agent import enable_library_debug, is_library_debug_enabled, get_import_metrics, show_examples, get_demo_path, get_create_scripts_path
+
+# Explicit runtime initialization for services that want to pay the start-up cost up front
+from .hexaeight_agent import warmup
+
+
+def __getattr__(name):
+    """Expose availability flags; reading them initializes the .NET runtime if needed (not in __all__)."""
+    if name in ("DOTNET_AVAILABLE", "HEXAEIGHT_AGENT_AVAILABLE"):
+        from . import hexaeight_agent as _agent_module
+        return getattr(_agent_module, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-# Expose availability flags
-from .hexaeight_agent import DOTNET_AVAILABLE, HEXAEIGHT_AGENT_AVAILABLE
 
 __all__ = [
     # Main classes
     "HexaEightAgent",
     "HexaEightAgentConfig",
+    "PubSubSession",
+    "LLMClient",
+    "LLMResponseCache",
     "HexaEightEnvironmentManager",
+    "HexaEightWorkerPool",
+    "AgentWorkerConfig",
+    "run_agent_workers",
     
     # Data classes
     "TaskStep",
     "TaskInfo", 
+    "TaskHandle",
     "MessageLock",
+    "MessageLockScope",
+    "ScheduledMessage",
+    "SigningContext",
     "LLMMessage",
     "LLMRequest",
     "LLMResponse",
@@ -194,6 +232,7 @@ __all__ = [
     # Enums
     "MessageType",
     "TargetType",
+    "OverflowPolicy",
     
     # Exceptions
     "HexaEightAgentError",
@@ -207,11 +246,14 @@ __all__ = [
     # Global debug control
     "enable_library_debug",
     "is_library_debug_enabled",
+    "get_import_metrics",
     "show_examples",
     "get_demo_path",
     "get_create_scripts_path",
     
-    # Availability flags
-    "DOTNET_AVAILABLE",
-    "HEXAEIGHT_AGENT_AVAILABLE",
+    # Runtime initialization
+    "warmup",
+    
+    # DOTNET_AVAILABLE / HEXAEIGHT_AGENT_AVAILABLE are left out on purpose:
+    # reading them loads the .NET runtime, which star-imports must not do
 ]
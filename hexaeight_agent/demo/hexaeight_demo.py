@@ -6,6 +6,7 @@ Fixed version with proper task completion handling to prevent race conditions.
 """
 
 import asyncio
+import contextlib
 import json
 import os
 import sys
@@ -28,7 +29,8 @@ try:
         TaskStepEvent,
         TaskStepUpdateEvent,
         TaskCompleteEvent,
-        ScheduledTaskCreationEvent
+        ScheduledTaskCreationEvent,
+        HexaEightAgentError
     )
 except ImportError as e:
     print(f"❌ Error importing hexaeight_agent: {e}")
@@ -1227,9 +1229,8 @@ class HexaEightAgentDemo:
             print("No messages received yet.")
             return
         
-        # Get active locks
-        active_locks = self.agent.get_active_locks()
-        active_message_ids = {lock.message_id for lock in active_locks}
+        # Get active locks from the agent's local lock index
+        active_message_ids = self.agent.get_locked_message_ids()
         
         # Filter messages based on view type
         if view_type == "active":
@@ -1425,9 +1426,13 @@ class HexaEightAgentDemo:
         
         print(f"🔒 Attempting to lock message #{msg_number}...")
         
-        locked = await self.agent.lock_message(self.pubsub_url, message.message_id)
-        
-        if locked:
+        async with contextlib.AsyncExitStack() as stack:
+            try:
+                lock = await stack.enter_async_context(self.agent.locked(self.pubsub_url, message.message_id))
+            except HexaEightAgentError:
+                print(f"❌ Failed to lock message (another agent may have it)")
+                return
+            
             message.is_locked = True
             print(f"✅ Message #{msg_number} locked successfully!")
             print(f"   Message ID: {message.message_id}")
@@ -1443,16 +1448,24 @@ class HexaEightAgentDemo:
             
             # Process task step if applicable
             if message.is_task_step:
-                await self.process_task_step(message)
+                if await self.process_task_step(message):
+                    # Keep the lock until the parent acknowledges the step
+                    lock.detach()
             else:
+                lock.detach()
                 print("Message is now exclusively yours for processing.")
                 print(f"Use 'unlock {msg_number}' when done.")
-        else:
-            print(f"❌ Failed to lock message (another agent may have it)")
+        
+        if not lock.detached:
+            message.is_locked = False
+            if message.is_task_step:
+                print(f"⚠️ Lock released because the step completion could not be sent")
+            else:
+                print(f"⚠️ Lock released")
 
 
-    async def process_task_step(self, message: IncomingMessage):
-        """Process a task step with simulated work"""
+    async def process_task_step(self, message: IncomingMessage) -> bool:
+        """Process a task step with simulated work. Returns True once the completion is sent."""
         print(f"🔄 Processing task step {message.step_number}...")
         print(f"   Description: {message.content}")
         print(f"   Task ID: {message.task_id}")
@@ -1489,24 +1502,12 @@ class HexaEightAgentDemo:
                 print(f"⏳ Waiting for parent acknowledgment before releasing lock...")
                 print(f"   Result: {simple_result}")
                 print(f"   Processing time: 2.5 seconds")
-            else:
-                print(f"⚠️ Failed to send step completion notification")
-                # Release lock immediately if sending failed
-                unlocked = await self.agent.release_lock(self.pubsub_url, message.message_id)
-                if unlocked:
-                    message.is_locked = False
-                    print(f"⚠️ Lock released due to communication failure")
-
+                return True
 
+            print(f"⚠️ Failed to send step completion notification")
         except Exception as e:
             print(f"❌ Error updating task completion: {e}")
-            # Try to unlock on error
-            try:
-                await self.agent.release_lock(self.pubsub_url, message.message_id)
-                message.is_locked = False
-                print(f"⚠️ Lock released due to error")
-            except Exception as unlock_ex:
-                print(f"❌ Error unlocking message: {unlock_ex}")
+        return False
 
     async def process_task_step2(self, message: IncomingMessage):
         """Process a task step with simulated work"""
@@ -10,17 +10,33 @@ import json
 import sys
 import asyncio
 import uuid
-from datetime import datetime, timedelta
-from typing import Dict, Tuple, List, Optional, Any, AsyncGenerator, Callable, Union
-from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Tuple, List, Optional, Any, AsyncGenerator, Awaitable, Callable, Union
+from dataclasses import dataclass, field, fields, replace, asdict
 from enum import Enum
 import threading
+import contextvars
+import contextlib
 import queue
 import weakref
-
-# Flag to track whether .NET components are available
-DOTNET_AVAILABLE = False
-HEXAEIGHT_AGENT_AVAILABLE = False
+import collections
+import pickle
+import sqlite3
+import tempfile
+import time
+import hashlib
+import mmap
+import stat
+import base64
+import heapq
+import itertools
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor
+
+# Flags tracking whether .NET components are loaded; exposed as DOTNET_AVAILABLE and
+# HEXAEIGHT_AGENT_AVAILABLE through the module __getattr__ below
+_DOTNET_AVAILABLE = False
+_HEXAEIGHT_AGENT_AVAILABLE = False
 
 # Global debug flag for library-level debugging (separate from agent-level)
 LIBRARY_DEBUG = False
@@ -30,167 +46,403 @@ def _library_debug_log(message: str):
     if LIBRARY_DEBUG:
         print(f"🔧 LIB DEBUG: {message}")
 
-# Try to initialize Python.NET and load .NET components
-try:
-    import pythonnet
-    from pythonnet import load
-    
-    # Load the .NET Core runtime
-    _library_debug_log("Loading .NET Core runtime...")
-    load("coreclr")
-    _library_debug_log("✅ .NET Core runtime loaded")
-    
-    import clr
-    _library_debug_log(f"CLR module loaded: {type(clr)}")
-    
-    # Verify CLR bridge is working
-    if not hasattr(clr, 'AddReference'):
-        raise ImportError("CLR bridge failed - AddReference method not available")
-    
-    _library_debug_log("✅ CLR bridge established successfully")
-    
-    # DLL integrity verification using signed JWTs
-    # Each DLL has a corresponding .jwt file containing its cryptographically signed content
-    # JWTs are signed by support@hexaeight.com and cannot be forged without the private key
-    CRITICAL_DLLS = [
-        "HexaEightAgent.dll",
-        "HexaEightJWTLibrary.dll",
-        "HexaEightASKClientLibrary.dll"
-    ]
-
-    EXPECTED_DLL_VERSIONS = {
-        "HexaEightAgent.dll": "1.6.861.0",
-        "HexaEightJWTLibrary.dll": "1.9.268.0",
-        "HexaEightASKClientLibrary.dll": "1.9.103.0"
-    }
+# Timings of the .NET bootstrap, reported by get_import_metrics()
+_IMPORT_METRICS: Dict[str, Any] = {}
 
-    def _get_dll_directory():
-        """Get the DLL directory path."""
-        return os.path.join(os.path.dirname(os.path.abspath(__file__)), "dlls")
+# ==================================================================================
+# DLL INTEGRITY CACHE - FAST IMPORT MODE
+# ==================================================================================
+# With HEXAEIGHT_FAST_IMPORT=1, a successful JWT verification of a DLL is recorded
+# in a cache file keyed on the DLL's path, size, mtime, inode and SHA-256 (plus the
+# SHA-256 of its .jwt signature). Later imports skip the JWT verification for
+# DLLs whose fingerprint is unchanged.
+#
+# The cache is only as trustworthy as the file holding it, so it is written
+# owner-only and ignored unless the file and its directory are owned by the
+# current user, are not symlinks and are not writable by group or others.
 
-    def _verify_dll_integrity():
-        """Verify DLL integrity using JWT signatures after CLR is loaded."""
-        import os
+FAST_IMPORT_ENV = "HEXAEIGHT_FAST_IMPORT"
+INTEGRITY_CACHE_ENV = "HEXAEIGHT_INTEGRITY_CACHE"
 
-        try:
-            dll_dir = _get_dll_directory()
-            _library_debug_log(f"🔍 Verifying DLL integrity using JWT signatures...")
 
-            # Create a temporary agent instance for verification (no signing environment needed)
-            temp_agent_config = CSharpAgentConfig()
+def _fast_import_enabled() -> bool:
+    return os.environ.get(FAST_IMPORT_ENV, "").strip().lower() in ("1", "true", "yes", "on")
 
-            for dll_name in CRITICAL_DLLS:
-                dll_path = os.path.join(dll_dir, dll_name)
-                jwt_path = os.path.join(dll_dir.replace("/dlls", ""), f"{dll_name}.jwt")
-                print(f"   JWT file path: {jwt_path}")
 
-                if not os.path.exists(jwt_path):
-                    raise RuntimeError(f"🚨 SECURITY ERROR: JWT signature missing for {dll_name}. DLL integrity cannot be verified!")
+def _get_integrity_cache_path() -> str:
+    """Cache file location: $HEXAEIGHT_INTEGRITY_CACHE or the user cache directory."""
+    override = os.environ.get(INTEGRITY_CACHE_ENV)
+    if override:
+        return override
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(cache_home, "hexaeight-agent", "dll-integrity.json")
 
-                # Read JWT content
-                with open(jwt_path, 'r') as f:
-                    jwt_content = f.read().strip()
 
-                # Verify JWT against DLL file using the new isFilePath parameter
-                print(f"🔐 Verifying JWT signature for {dll_name}...")
-                print(f"   JWT length: {len(jwt_content)} chars")
-                print(f"   DLL path: {dll_path}")
+class _FileFingerprintCache:
+    """
+    SHA-256 of files, memory-mapped and hashed once per (device, inode, size, mtime).
 
-                result = temp_agent_config.VerifyJwtAsync(jwt_content, dll_path, "support@hexaeight.com", True).Result
+    Concurrent requests for the same unchanged file wait for a single hash. A file
+    modified while it is being hashed is not cached.
+    """
 
-                print(f"   Verification result: Success={result.Success}")
-                if hasattr(result, 'ErrorMessage') and result.ErrorMessage:
-                    print(f"   Error message: {result.ErrorMessage}")
+    def __init__(self, max_entries: int = 1024):
+        self._max_entries = max_entries
+        self._lock = threading.Lock()
+        self._digests: "collections.OrderedDict[Tuple, str]" = collections.OrderedDict()
+        self._hashing: Dict[Tuple, threading.Lock] = {}
+        self._stats = {"hits": 0, "misses": 0, "bytes_hashed": 0}
 
-                if not result.Success:
-                    raise RuntimeError(f"🚨 SECURITY ERROR: JWT verification failed for {dll_name}! {result.ErrorMessage}")
+    @staticmethod
+    def _identity(path: str) -> Tuple:
+        st = os.stat(path)
+        return (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns)
 
-                _library_debug_log(f"✅ DLL integrity verified: {dll_name}")
+    @staticmethod
+    def _hash(path: str) -> str:
+        with open(path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return hashlib.sha256(b"").hexdigest()
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                return hashlib.sha256(mapped).hexdigest()
+
+    def _lookup(self, key: Tuple) -> Optional[str]:
+        with self._lock:
+            digest = self._digests.get(key)
+            if digest is not None:
+                self._digests.move_to_end(key)
+                self._stats["hits"] += 1
+            return digest
+
+    def digest(self, path: str) -> str:
+        key = self._identity(path)
+        digest = self._lookup(key)
+        if digest is not None:
+            return digest
+        with self._lock:
+            hashing = self._hashing.setdefault(key, threading.Lock())
+        with hashing:
+            digest = self._lookup(key)
+            if digest is not None:
+                return digest
+            try:
+                digest = self._hash(path)
+            finally:
+                with self._lock:
+                    self._hashing.pop(key, None)
+            with self._lock:
+                self._stats["misses"] += 1
+                self._stats["bytes_hashed"] += key[2]
+                if self._identity(path) == key:
+                    self._digests[key] = digest
+                    while len(self._digests) > self._max_entries:
+                        self._digests.popitem(last=False)
+            return digest
+
+    def statistics(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self._stats, entries=len(self._digests))
+
+
+_FILE_FINGERPRINTS = _FileFingerprintCache()
+
+
+def _sha256_file(path: str) -> str:
+    # Always read: integrity checks must not trust a (size, mtime) that can be restored
+    return _FileFingerprintCache._hash(path)
+
+
+def _dll_fingerprint(dll_path: str, jwt_path: str, expected_version: str) -> Dict[str, Any]:
+    """Identity of a DLL + signature pair; any change forces a full JWT verification."""
+    st = os.stat(dll_path)
+    return {
+        "path": os.path.abspath(dll_path),
+        "size": st.st_size,
+        "mtime_ns": st.st_mtime_ns,
+        "inode": st.st_ino,
+        "sha256": _sha256_file(dll_path),
+        "jwt_sha256": _sha256_file(jwt_path),
+        "expected_version": expected_version,
+    }
 
-            _library_debug_log("✅ All DLL integrity checks passed!")
 
-        except Exception as e:
-            raise RuntimeError(f"🚨 CRITICAL SECURITY ERROR: DLL integrity verification failed: {e}")
+def _is_private_path(path: str) -> bool:
+    """True if path is not a symlink, is owned by the current user and is not group/world-writable."""
+    st = os.lstat(path)
+    if stat.S_ISLNK(st.st_mode):
+        return False
+    if os.name == "nt":
+        return True  # No POSIX ownership; the default cache lives in the user's profile
+    return st.st_uid == os.geteuid() and not st.st_mode & (stat.S_IWGRP | stat.S_IWOTH)
+
+
+def _integrity_cache_trusted(cache_path: str) -> bool:
+    try:
+        return _is_private_path(cache_path) and _is_private_path(os.path.dirname(os.path.abspath(cache_path)))
+    except OSError:
+        return False
+
+
+def _load_integrity_cache() -> Dict[str, Any]:
+    cache_path = _get_integrity_cache_path()
+    if not os.path.exists(cache_path):
+        return {}
+    if not _integrity_cache_trusted(cache_path):
+        _library_debug_log(f"⚠️ Ignoring DLL integrity cache {cache_path}: not private to the current user")
+        return {}
+    try:
+        with open(cache_path, 'r') as f:
+            cache = json.load(f)
+        return cache if isinstance(cache, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_integrity_cache(cache: Dict[str, Any]):
+    """Write the cache atomically; failures only cost a re-verification next time."""
+    cache_path = _get_integrity_cache_path()
+    try:
+        os.makedirs(os.path.dirname(cache_path), mode=0o700, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(prefix=".dll-integrity-", dir=os.path.dirname(cache_path))
+        with os.fdopen(fd, 'w') as f:
+            json.dump(cache, f, indent=2)
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        _library_debug_log(f"⚠️ Could not write DLL integrity cache {cache_path}: {e}")
+
+
+# ==================================================================================
+# .NET RUNTIME BOOTSTRAP - DEFERRED UNTIL FIRST USE
+# ==================================================================================
+# Loading coreclr, the HexaEight assemblies and verifying DLL integrity takes
+# seconds, so it happens on the first CLR-dependent call (or an explicit
+# warmup()) rather than at import. Pure-Python consumers of the dataclasses and
+# helpers never pay for it.
+
+# DLL integrity verification using signed JWTs
+# Each DLL has a corresponding .jwt file containing its cryptographically signed content
+# JWTs are signed by support@hexaeight.com and cannot be forged without the private key
+CRITICAL_DLLS = [
+    "HexaEightAgent.dll",
+    "HexaEightJWTLibrary.dll",
+    "HexaEightASKClientLibrary.dll"
+]
+
+EXPECTED_DLL_VERSIONS = {
+    "HexaEightAgent.dll": "1.6.861.0",
+    "HexaEightJWTLibrary.dll": "1.9.268.0",
+    "HexaEightASKClientLibrary.dll": "1.9.103.0"
+}
+
+# .NET types - bound by _initialize_runtime()
+clr = None
+CSharpMessage = None
+CSharpAgentConfig = None
+CSharpEnvironmentManager = None
+EnhancedPubSubSubscriptionEventArgs = None
+DateTime = None
+Environment = None
+String = None
+Guid = None
+Action = None
+Task = None
+CSharpList = None
+ClrArray = None
+DateTimeKind = None
+AnonymousPipeServerStream = None
+AnonymousPipeClientStream = None
+PipeDirection = None
+
+_RUNTIME_LOCK = threading.Lock()
+_RUNTIME_INIT_ERROR: Optional[BaseException] = None
+
+
+def _get_dll_directory():
+    """Get the DLL directory path."""
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), "dlls")
+
+
+def _verify_dll_integrity():
+    """
+    Verify DLL integrity using JWT signatures after CLR is loaded.
+
+    All verifications are started at once and awaited together. In fast
+    import mode, DLLs whose fingerprint matches the integrity cache are skipped.
+    """
+    verify_started = time.perf_counter()
+    try:
+        dll_dir = _get_dll_directory()
+        _library_debug_log(f"🔍 Verifying DLL integrity using JWT signatures...")
 
-    # Add the HexaEightAgent assembly to the path
-    def add_assemblies():
-        """Load the HexaEightAgent assembly from the bundled dlls directory."""
-        dll_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "dlls")
+        fast_import = _fast_import_enabled()
+        cache = _load_integrity_cache() if fast_import else {}
+        fingerprints = {}
+        pending = {}
 
-        if not os.path.exists(dll_dir):
-            raise FileNotFoundError(f"HexaEight DLL directory not found: {dll_dir}")
+        # Create a temporary agent instance for verification (no signing environment needed)
+        temp_agent_config = CSharpAgentConfig()
 
-        # Verify critical DLL integrity using signed JWTs before loading
         for dll_name in CRITICAL_DLLS:
             dll_path = os.path.join(dll_dir, dll_name)
             jwt_path = os.path.join(dll_dir.replace("/dlls", ""), f"{dll_name}.jwt")
-
-            if not os.path.exists(dll_path):
-                raise FileNotFoundError(f"Required DLL not found: {dll_path}")
+            _library_debug_log(f"   JWT file path: {jwt_path}")
 
             if not os.path.exists(jwt_path):
-                raise FileNotFoundError(f"Required JWT signature not found: {jwt_path}")
+                raise RuntimeError(f"🚨 SECURITY ERROR: JWT signature missing for {dll_name}. DLL integrity cannot be verified!")
 
-            # Basic integrity check - will be enhanced after CLR is loaded
-            _library_debug_log(f"✅ DLL and JWT found: {dll_name}")
+            if fast_import:
+                fingerprints[dll_name] = _dll_fingerprint(dll_path, jwt_path, EXPECTED_DLL_VERSIONS.get(dll_name, ""))
+                if cache.get(dll_name) == fingerprints[dll_name]:
+                    _library_debug_log(f"✅ DLL integrity cached: {dll_name}")
+                    continue
 
-        sys.path.append(dll_dir)
-        _library_debug_log(f"Added DLL directory to path: {dll_dir}")
+            # Read JWT content
+            with open(jwt_path, 'r') as f:
+                jwt_content = f.read().strip()
 
-        # Load assemblies in dependency order
-        try:
-            clr.AddReference("HexaEightAgent")
-            _library_debug_log("✅ HexaEightAgent assembly loaded")
-            
-            # Load other assemblies
-            assemblies = ["Newtonsoft.Json", "SystemHelper", "System.Text.Json",
-                         "jose-jwt", "HexaEightJWTLibrary", "HexaEightASKClientLibrary"]
-            for assembly in assemblies:
-                try:
-                    clr.AddReference(assembly)
-                    _library_debug_log(f"✅ Loaded assembly: {assembly}")
-                except Exception as e:
-                    _library_debug_log(f"⚠️ Assembly failed: {assembly} ({e})")
-
-            # Verify DLL versions after loading
-            from System.Reflection import Assembly
-            for dll_name, expected_version in EXPECTED_DLL_VERSIONS.items():
-                dll_path = os.path.join(dll_dir, dll_name)
-                try:
-                    asm = Assembly.LoadFrom(dll_path)
-                    actual_version = str(asm.GetName().Version)
-                    if actual_version != expected_version:
-                        raise RuntimeError(
-                            f"DLL version mismatch for {dll_name}!\n"
-                            f"Expected: {expected_version}\n"
-                            f"Actual:   {actual_version}\n"
-                            f"The DLL may have been replaced. Please reinstall the package."
-                        )
-                    _library_debug_log(f"✅ DLL version verified: {dll_name} v{actual_version}")
-                except RuntimeError:
-                    raise
-                except Exception as e:
-                    _library_debug_log(f"⚠️ Could not verify version for {dll_name}: {e}")
+            # Start verification of the JWT against the DLL file (isFilePath=True)
+            _library_debug_log(f"🔐 Verifying JWT signature for {dll_name} ({len(jwt_content)} chars, {dll_path})")
+            pending[dll_name] = temp_agent_config.VerifyJwtAsync(jwt_content, dll_path, "support@hexaeight.com", True)
 
-        except Exception as e:
-            raise ImportError(f"Failed to load HexaEightAgent assembly: {e}")
+        # The verifications run concurrently on the CLR; collect their results
+        for dll_name, verify_task in pending.items():
+            result = verify_task.Result
+
+            _library_debug_log(f"   {dll_name} verification result: Success={result.Success}")
+            if not result.Success:
+                raise RuntimeError(f"🚨 SECURITY ERROR: JWT verification failed for {dll_name}! {result.ErrorMessage}")
+
+            _library_debug_log(f"✅ DLL integrity verified: {dll_name}")
+            if fast_import:
+                cache[dll_name] = fingerprints[dll_name]
+
+        if fast_import and pending:
+            _save_integrity_cache(cache)
+
+        _IMPORT_METRICS["integrity_cache_hits"] = len(CRITICAL_DLLS) - len(pending)
+        _library_debug_log("✅ All DLL integrity checks passed!")
+
+    except Exception as e:
+        raise RuntimeError(f"🚨 CRITICAL SECURITY ERROR: DLL integrity verification failed: {e}")
+    finally:
+        _IMPORT_METRICS["integrity_check_ms"] = (time.perf_counter() - verify_started) * 1000
+
+
+# Add the HexaEightAgent assembly to the path
+def add_assemblies():
+    """Load the HexaEightAgent assembly from the bundled dlls directory."""
+    dll_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "dlls")
+
+    if not os.path.exists(dll_dir):
+        raise FileNotFoundError(f"HexaEight DLL directory not found: {dll_dir}")
+
+    # Verify critical DLL integrity using signed JWTs before loading
+    for dll_name in CRITICAL_DLLS:
+        dll_path = os.path.join(dll_dir, dll_name)
+        jwt_path = os.path.join(dll_dir.replace("/dlls", ""), f"{dll_name}.jwt")
+
+        if not os.path.exists(dll_path):
+            raise FileNotFoundError(f"Required DLL not found: {dll_path}")
+
+        if not os.path.exists(jwt_path):
+            raise FileNotFoundError(f"Required JWT signature not found: {jwt_path}")
+
+        # Basic integrity check - will be enhanced after CLR is loaded
+        _library_debug_log(f"✅ DLL and JWT found: {dll_name}")
+
+    sys.path.append(dll_dir)
+    _library_debug_log(f"Added DLL directory to path: {dll_dir}")
+
+    # Load assemblies in dependency order
+    loaded_assemblies = {}
+    try:
+        loaded_assemblies["HexaEightAgent"] = clr.AddReference("HexaEightAgent")
+        _library_debug_log("✅ HexaEightAgent assembly loaded")
+
+        # Load other assemblies
+        assemblies = ["Newtonsoft.Json", "SystemHelper", "System.Text.Json",
+                     "jose-jwt", "HexaEightJWTLibrary", "HexaEightASKClientLibrary"]
+        for assembly in assemblies:
+            try:
+                loaded_assemblies[assembly] = clr.AddReference(assembly)
+                _library_debug_log(f"✅ Loaded assembly: {assembly}")
+            except Exception as e:
+                _library_debug_log(f"⚠️ Assembly failed: {assembly} ({e})")
+
+        # Verify DLL versions after loading - reuse the loaded assemblies instead of re-opening the files
+        from System.Reflection import Assembly
+        for dll_name, expected_version in EXPECTED_DLL_VERSIONS.items():
+            dll_path = os.path.join(dll_dir, dll_name)
+            try:
+                asm = loaded_assemblies.get(os.path.splitext(dll_name)[0]) or Assembly.LoadFrom(dll_path)
+                actual_version = str(asm.GetName().Version)
+                if actual_version != expected_version:
+                    raise RuntimeError(
+                        f"DLL version mismatch for {dll_name}!\n"
+                        f"Expected: {expected_version}\n"
+                        f"Actual:   {actual_version}\n"
+                        f"The DLL may have been replaced. Please reinstall the package."
+                    )
+                _library_debug_log(f"✅ DLL version verified: {dll_name} v{actual_version}")
+            except RuntimeError:
+                raise
+            except Exception as e:
+                _library_debug_log(f"⚠️ Could not verify version for {dll_name}: {e}")
+
+    except Exception as e:
+        raise ImportError(f"Failed to load HexaEightAgent assembly: {e}")
+
+
+def _initialize_runtime():
+    """Load the .NET Core runtime and HexaEight assemblies, then verify DLL integrity."""
+    global clr, CSharpMessage, CSharpAgentConfig, CSharpEnvironmentManager
+    global EnhancedPubSubSubscriptionEventArgs, DateTime, Environment, String, Guid, Action, Task, CSharpList
+    global ClrArray, DateTimeKind, AnonymousPipeServerStream, AnonymousPipeClientStream, PipeDirection
+    global _DOTNET_AVAILABLE, _HEXAEIGHT_AGENT_AVAILABLE
+
+    bootstrap_started = time.perf_counter()
+
+    # Copy the platform's native SQLite interop library into place
+    from . import _setup_native_libraries
+    _setup_native_libraries()
+
+    from pythonnet import load
+    
+    # Load the .NET Core runtime
+    _library_debug_log("Loading .NET Core runtime...")
+    load("coreclr")
+    _IMPORT_METRICS["clr_load_ms"] = (time.perf_counter() - bootstrap_started) * 1000
+    _library_debug_log("✅ .NET Core runtime loaded")
+    
+    import clr as clr_module
+    clr = clr_module
+    _library_debug_log(f"CLR module loaded: {type(clr)}")
+    
+    # Verify CLR bridge is working
+    if not hasattr(clr, 'AddReference'):
+        raise ImportError("CLR bridge failed - AddReference method not available")
+    
+    _library_debug_log("✅ CLR bridge established successfully")
 
+    assemblies_started = time.perf_counter()
     add_assemblies()
+    _IMPORT_METRICS["assembly_load_ms"] = (time.perf_counter() - assemblies_started) * 1000
     
     # Import C# classes - only import what actually exists
     _library_debug_log("Importing HexaEight classes...")
-    from HexaEightAgent import Message as CSharpMessage
-    from HexaEightAgent import AgentConfig as CSharpAgentConfig
-    from HexaEightAgent import EnvironmentManager as CSharpEnvironmentManager
+    from HexaEightAgent import Message, AgentConfig, EnvironmentManager
+    CSharpMessage = Message
+    CSharpAgentConfig = AgentConfig
+    CSharpEnvironmentManager = EnvironmentManager
     
     # Try to import event args - these may not exist in all versions
     try:
-        from HexaEightAgent import EnhancedPubSubSubscriptionEventArgs
+        from HexaEightAgent import EnhancedPubSubSubscriptionEventArgs as EventArgs
         _library_debug_log("✅ EnhancedPubSubSubscriptionEventArgs imported")
     except ImportError:
         _library_debug_log("⚠️ EnhancedPubSubSubscriptionEventArgs not available")
         # Create a dummy class
-        class EnhancedPubSubSubscriptionEventArgs:
+        class EventArgs:
             def __init__(self):
                 self.Topic = ""
                 self.Sender = ""
@@ -202,29 +454,70 @@ try:
                 self.IsFromSelf = False
                 self.IsScheduleNotification = False
                 self.IsLockExpired = False
+    EnhancedPubSubSubscriptionEventArgs = EventArgs
     
     # Import System types
-    from System import DateTime, Environment, String, Guid
-    from System.Threading.Tasks import Task
-    from System.Collections.Generic import List as CSharpList
+    import System
+    from System.Threading.Tasks import Task as ClrTask
+    from System.Collections.Generic import List as ClrList
+    DateTime, Environment, String, Guid, Action = (
+        System.DateTime, System.Environment, System.String, System.Guid, System.Action
+    )
+    Task = ClrTask
+    CSharpList = ClrList
+    ClrArray = System.Array
+    DateTimeKind = System.DateTimeKind
+    from System.IO.Pipes import (
+        AnonymousPipeServerStream as ClrPipeServer, AnonymousPipeClientStream as ClrPipeClient,
+        PipeDirection as ClrPipeDirection
+    )
+    AnonymousPipeServerStream, AnonymousPipeClientStream, PipeDirection = ClrPipeServer, ClrPipeClient, ClrPipeDirection
     
-    DOTNET_AVAILABLE = True
-    HEXAEIGHT_AGENT_AVAILABLE = True
+    _DOTNET_AVAILABLE = True
     _library_debug_log("✅ Successfully imported all HexaEightAgent classes")
 
     # Now that CLR is loaded, verify DLL integrity using JWTs
     _verify_dll_integrity()
+    _HEXAEIGHT_AGENT_AVAILABLE = True
     
-except Exception as e:
-    print(f"CRITICAL ERROR: Failed to initialize Python.NET or load HexaEightAgent assembly:")
-    print(f"Error: {e}")
-    print("\nHexaEightAgent .NET assembly is REQUIRED for this library to function.")
-    print("Please ensure:")
-    print("1. .NET 8.0+ runtime is installed")
-    print("2. pythonnet is properly installed: 'pip install pythonnet>=3.0.0'")
-    print("3. HexaEightAgent.dll is present in the dlls/ directory")
-    import traceback
-    traceback.print_exc()
+    _IMPORT_METRICS["total_ms"] = (time.perf_counter() - bootstrap_started) * 1000
+    _library_debug_log(f"⏱️ .NET bootstrap completed in {_IMPORT_METRICS['total_ms']:.1f}ms")
+
+
+def _ensure_runtime() -> bool:
+    """Run the .NET bootstrap once, on first use. Returns True if the runtime is usable."""
+    global _RUNTIME_INIT_ERROR
+
+    if _HEXAEIGHT_AGENT_AVAILABLE:
+        return True
+
+    with _RUNTIME_LOCK:
+        if _HEXAEIGHT_AGENT_AVAILABLE or _RUNTIME_INIT_ERROR is not None:
+            return _HEXAEIGHT_AGENT_AVAILABLE
+        try:
+            _initialize_runtime()
+        except Exception as e:
+            _RUNTIME_INIT_ERROR = e
+            print(f"CRITICAL ERROR: Failed to initialize Python.NET or load HexaEightAgent assembly:")
+            print(f"Error: {e}")
+            print("\nHexaEightAgent .NET assembly is REQUIRED for this library to function.")
+            print("Please ensure:")
+            print("1. .NET 8.0+ runtime is installed")
+            print("2. pythonnet is properly installed: 'pip install pythonnet>=3.0.0'")
+            print("3. HexaEightAgent.dll is present in the dlls/ directory")
+            import traceback
+            traceback.print_exc()
+        return _HEXAEIGHT_AGENT_AVAILABLE
+
+
+def __getattr__(name: str):
+    """Resolve the availability flags on access, initializing the runtime if needed."""
+    if name == "DOTNET_AVAILABLE":
+        _ensure_runtime()
+        return _DOTNET_AVAILABLE
+    if name == "HEXAEIGHT_AGENT_AVAILABLE":
+        return _ensure_runtime()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 class HexaEightAgentError(Exception):
@@ -233,15 +526,127 @@ class HexaEightAgentError(Exception):
 
 
 def _ensure_agent_available():
-    """Ensure HexaEightAgent is available, raise exception if not."""
-    if not HEXAEIGHT_AGENT_AVAILABLE:
+    """Ensure HexaEightAgent is available (initializing it on first use), raise exception if not."""
+    if not _ensure_runtime():
         raise HexaEightAgentError(
             "HexaEightAgent .NET assembly is not available. "
             "Please ensure the HexaEightAgent NuGet package DLL is installed "
-            "in the dlls/ directory and .NET runtime is available."
+            "in the dlls/ directory and .NET runtime is available. "
+            f"({_RUNTIME_INIT_ERROR})"
         )
 
 
+def warmup() -> Dict[str, Any]:
+    """
+    Initialize the .NET runtime now instead of on first use.
+
+    Loads coreclr and the HexaEight assemblies and verifies DLL integrity, so
+    services can pay the start-up cost before taking traffic.
+
+    Returns:
+        Bootstrap timings, as reported by get_import_metrics()
+
+    Raises:
+        HexaEightAgentError: If the runtime could not be initialized
+    """
+    _ensure_agent_available()
+    return get_import_metrics()
+
+
+# ==================================================================================
+# CLR TASK BRIDGE - AWAIT .NET TASKS WITHOUT PARKING PYTHON THREADS
+# ==================================================================================
+
+def _await_clr_task(clr_task) -> "asyncio.Future":
+    """
+    Wrap a .NET Task in an asyncio Future on the running event loop.
+
+    Instead of blocking an executor thread on ``task.Result``, a continuation is
+    registered on the Task's awaiter. When the Task finishes on a .NET thread the
+    future is resolved on the loop via ``call_soon_threadsafe``, so any number of
+    in-flight CLR calls costs no Python threads.
+    """
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+
+    if clr_task.IsCompleted:
+        _resolve_future_from_clr_task(future, clr_task)
+        return future
+
+    def _on_completed():
+        try:
+            loop.call_soon_threadsafe(_resolve_future_from_clr_task, future, clr_task)
+        except RuntimeError:
+            # Event loop already closed - nobody is waiting for this result
+            pass
+
+    clr_task.GetAwaiter().OnCompleted(Action(_on_completed))
+    return future
+
+
+def _resolve_future_from_clr_task(future: "asyncio.Future", clr_task):
+    """Copy the outcome of a completed .NET Task onto an asyncio Future."""
+    if future.done():
+        return  # Awaiting coroutine was cancelled
+
+    if clr_task.IsCanceled:
+        future.cancel()
+        return
+
+    if clr_task.IsFaulted:
+        error = clr_task.Exception
+        if error is not None and error.InnerException is not None:
+            error = error.InnerException
+        if not isinstance(error, BaseException):
+            error = HexaEightAgentError(str(error))
+        future.set_exception(error)
+        return
+
+    # Task<T> exposes Result; a plain Task completes with no value
+    future.set_result(clr_task.Result if hasattr(clr_task, 'Result') else None)
+
+
+async def _map_bounded(func: Callable[[Any], Awaitable[Any]], items: List[Any], concurrency: int) -> List[Any]:
+    """Apply an async function to every item with at most `concurrency` calls in flight; results keep input order."""
+    if concurrency <= 0:
+        raise ValueError("concurrency must be positive")
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def _run(item):
+        async with semaphore:
+            return await func(item)
+
+    return list(await asyncio.gather(*(_run(item) for item in items)))
+
+
+def _to_clr_datetime(value: datetime):
+    """
+    Convert a datetime to System.DateTime without dropping sub-second precision.
+    
+    Timezone-aware values are converted to UTC and marked DateTimeKind.Utc. Naive
+    values are local time, as from datetime.now(), and are passed through as
+    DateTimeKind.Unspecified, which .NET also reads as local time.
+    """
+    kind = DateTimeKind.Unspecified
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+        kind = DateTimeKind.Utc
+    clr_value = DateTime(value.year, value.month, value.day, value.hour, value.minute,
+                         value.second, value.microsecond // 1000, kind)
+    # A tick is 100ns; add the microseconds below the millisecond
+    return clr_value.AddTicks((value.microsecond % 1000) * 10)
+
+
+def _as_utc_naive(value: datetime) -> datetime:
+    """Normalize a datetime to naive UTC for comparisons; naive values are local time."""
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def _to_clr_string_list(items: List[str]):
+    """Build a List<string> in one marshalling step (typed array copy) instead of one Add per item."""
+    return CSharpList[String](ClrArray[String]([str(item) for item in items]))
+
+
 # ==================================================================================
 # SIMPLE MESSAGE CLASS - NO PRE-PROCESSING
 # ==================================================================================
@@ -421,6 +826,7 @@ class HexaEightMessage:
     @classmethod
     def parse(cls, json_string: str, debug_mode: bool = False):
         """Parse message from JSON string."""
+        _ensure_agent_available()
         try:
             clr_message = CSharpMessage.Parse(json_string)
             message = cls.__new__(cls)
@@ -460,6 +866,9 @@ class TaskInfo:
     created_at: datetime = field(default_factory=datetime.utcnow)
     created_by: str = ""
     created_by_internal_id: str = ""
+    
+    def _content_key(self) -> Tuple[str, str, Tuple[str, ...]]:
+        return (self.title, self.description, tuple(step.description for step in self.steps))
 
 
 @dataclass
@@ -470,6 +879,120 @@ class MessageLock:
     locked_by_internal_id: str
     locked_at: datetime = field(default_factory=datetime.utcnow)
     expires_at: datetime = field(default_factory=lambda: datetime.utcnow() + timedelta(minutes=1))
+    pubsub_server_url: str = ""
+
+
+@dataclass
+class MessageLockScope:
+    """A lock held by `async with agent.locked(...)`; call detach() to keep it past the block."""
+    pubsub_server_url: str
+    message_id: str
+    acquired_at: float = field(default_factory=time.monotonic)
+    detached: bool = False
+    keep_alive: bool = False
+    
+    @property
+    def held_seconds(self) -> float:
+        return time.monotonic() - self.acquired_at
+    
+    def detach(self, keep_alive: bool = False):
+        """
+        Keep the lock after the block exits; release it yourself later.
+        
+        Heartbeats stop when the block exits, so a lock that is never released
+        still expires on the server. Pass keep_alive=True to go on heartbeating
+        it until it is released.
+        """
+        self.detached = True
+        self.keep_alive = keep_alive
+
+
+@dataclass
+class TaskHandle:
+    """
+    A task created (and locked) by create_and_lock_task, bound to its server and agent.
+    
+    Unpacks like the old (task_id, message_id) tuple: `task_id, message_id = handle`.
+    """
+    task_id: str
+    message_id: str
+    pubsub_server_url: str = ""
+    created_by_internal_id: str = ""
+    created_at: datetime = field(default_factory=datetime.utcnow)
+    _agent: Any = field(default=None, repr=False, compare=False)
+    
+    def __iter__(self):
+        return iter((self.task_id, self.message_id))
+    
+    def __getitem__(self, index):
+        return (self.task_id, self.message_id)[index]
+    
+    def __len__(self) -> int:
+        return 2
+    
+    @property
+    def lock_expires_at(self) -> Optional[datetime]:
+        """Expiry of the task message lock as last seen by the agent, or None if not held."""
+        if self._agent is None:
+            return None
+        lock = self._agent._lock_index.get(self.message_id, self.pubsub_server_url)
+        return lock.expires_at if lock is not None else None
+    
+    @property
+    def is_locked(self) -> bool:
+        return self._agent is not None and self._agent.is_locked(self.message_id, self.pubsub_server_url)
+    
+    async def update_step(self, step_number: int, result: Any) -> bool:
+        """Report completion of one of this task's steps."""
+        return await self._agent.update_task_step_completion(
+            self.pubsub_server_url, self.task_id, step_number, result
+        )
+    
+    async def heartbeat(self) -> bool:
+        """Renew the task message lock now (held locks are also heartbeated automatically)."""
+        return await self._agent.send_lock_heartbeat(self.pubsub_server_url, self.message_id)
+    
+    async def complete(self) -> bool:
+        """Complete the task and release its lock."""
+        return await self._agent.complete_task(self.pubsub_server_url, self.task_id, self.message_id)
+    
+    async def release(self) -> bool:
+        """Release the task message lock without completing the task."""
+        return await self._agent.release_lock(self.pubsub_server_url, self.message_id)
+
+
+@dataclass
+class ScheduledMessage:
+    """A message scheduled through this agent, as tracked by its local schedule index."""
+    schedule_id: str
+    scheduled_for: datetime
+    target_type: str
+    target_value: str
+    message: str
+    message_type: str = "message"
+    status: str = "queued"  # queued, submitting, submitted, local, delivered, failed or cancelled
+    error: Optional[str] = None
+    pubsub_server_url: str = ""
+    durable: bool = False  # always schedule on the server, never in the local scheduler
+
+
+@dataclass(frozen=True)
+class SigningContext:
+    """
+    Signing credentials of one identity, read once by set_signing_folder.
+    
+    Immutable, so it can be shared between tasks and passed to signing calls; the
+    secrets are left out of repr().
+    """
+    folder_path: str
+    resource_name: str = field(repr=False)
+    machine_token: str = field(repr=False)
+    secret: str = field(repr=False)
+    license_code: str = field(repr=False)
+    
+    @property
+    def identity(self) -> Tuple[str, str, str, str]:
+        return (self.resource_name, self.machine_token, self.secret, self.license_code)
 
 
 @dataclass
@@ -522,6 +1045,14 @@ class TargetType(Enum):
     GROUP = "group"
 
 
+class OverflowPolicy(Enum):
+    """What the event buffer does when CLR callbacks outpace the consumer."""
+    BLOCK = "block"                  # Callback thread waits for free space
+    DROP_OLDEST = "drop_oldest"      # Evict the oldest buffered event
+    DROP_NEWEST = "drop_newest"      # Discard the incoming event
+    SPILL_TO_DISK = "spill_to_disk"  # Overflow to a temporary file, delivered in order
+
+
 # ==================================================================================
 # EVENT HANDLING - CLEAN HANDOVER
 # ==================================================================================
@@ -596,6 +1127,1127 @@ class ScheduledTaskCreationEvent:
     original_schedule_time: datetime
 
 
+# ==================================================================================
+# LAZY EVENTS - DEFER CLR-TO-PYTHON MARSHALLING UNTIL A FIELD IS READ
+# ==================================================================================
+
+def _clr_datetime(value, fallback: datetime) -> datetime:
+    """Convert a CLR timestamp, falling back to the time the event was received."""
+    return value.ToDateTime() if hasattr(value, 'ToDateTime') else fallback
+
+
+class _LazyClrField:
+    """
+    Non-data descriptor that reads a field from the CLR event args on first
+    access and caches the converted value on the instance.
+    """
+    __slots__ = ('name', 'convert')
+
+    def __init__(self, convert: Callable[[Any, Any], Any]):
+        self.name = None
+        self.convert = convert
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        value = self.convert(instance._clr_args, instance)
+        instance.__dict__[self.name] = value
+        return value
+
+
+class _LazyClrEvent:
+    """
+    Mixin for event dataclasses backed by CLR event args.
+
+    Instances only hold the CLR reference until a field is read, so consumers
+    that filter on message_id or sender never marshal large payloads. Pickling
+    (e.g. when the event buffer spills to disk) materializes a plain dataclass.
+    Built from field values instead (as dataclasses.replace() does), an instance
+    holds no CLR reference and behaves like the plain dataclass.
+    """
+    _event_class = None
+
+    def __init__(self, clr_args=None, **values):
+        self._clr_args = clr_args
+        self._received_at = datetime.utcnow()
+        if clr_args is None:
+            # Validates the fields exactly as the dataclass would
+            self.__dict__.update(vars(self._event_class(**values)))
+        elif values:
+            raise TypeError("Field values cannot be combined with CLR event args")
+
+    def _field_values(self) -> Tuple[Any, ...]:
+        return tuple(getattr(self, f.name) for f in fields(self._event_class))
+
+    def _materialize(self):
+        """The plain event dataclass with every field read."""
+        return self._event_class(*self._field_values())
+
+    def __reduce__(self):
+        return (self._event_class, self._field_values())
+
+    def __repr__(self):
+        values = ", ".join(f"{f.name}={getattr(self, f.name)!r}" for f in fields(self._event_class))
+        return f"{self._event_class.__qualname__}({values})"
+
+    def __eq__(self, other):
+        if not isinstance(other, self._event_class):
+            return NotImplemented
+        return self._field_values() == tuple(getattr(other, f.name) for f in fields(self._event_class))
+
+    __hash__ = None
+
+
+class _LazyMessageReceivedEvent(_LazyClrEvent, MessageReceivedEvent):
+    _event_class = MessageReceivedEvent
+
+    topic = _LazyClrField(lambda e, ev: e.Topic or "")
+    sender = _LazyClrField(lambda e, ev: e.Sender or "")
+    sender_internal_id = _LazyClrField(lambda e, ev: e.SenderInternalId or "")
+    decrypted_content = _LazyClrField(lambda e, ev: e.DecryptedContent or "")
+    timestamp = _LazyClrField(lambda e, ev: _clr_datetime(e.Timestamp, ev._received_at))
+    message_id = _LazyClrField(lambda e, ev: e.MessageId or "")
+    is_task_message = _LazyClrField(lambda e, ev: e.IsTaskMessage)
+    is_from_self = _LazyClrField(lambda e, ev: e.IsFromSelf)
+    is_schedule_notification = _LazyClrField(lambda e, ev: e.IsScheduleNotification)
+    is_lock_expired = _LazyClrField(lambda e, ev: e.IsLockExpired)
+
+
+class _LazyLockExpiredEvent(_LazyClrEvent, MessageReceivedEvent):
+    _event_class = MessageReceivedEvent
+
+    topic = ""
+    sender = "SYSTEM"
+    sender_internal_id = ""
+    decrypted_content = ""
+    timestamp = _LazyClrField(lambda e, ev: _clr_datetime(e.Timestamp, ev._received_at))
+    message_id = _LazyClrField(lambda e, ev: e.MessageId or "")
+    is_lock_expired = True
+
+
+class _LazyTaskReceivedEvent(_LazyClrEvent, TaskReceivedEvent):
+    _event_class = TaskReceivedEvent
+
+    task_id = _LazyClrField(lambda e, ev: e.TaskId or "")
+    title = _LazyClrField(lambda e, ev: e.Title or "")
+    description = _LazyClrField(lambda e, ev: e.Description or "")
+    total_steps = _LazyClrField(lambda e, ev: e.TotalSteps)
+    status = _LazyClrField(lambda e, ev: e.Status or "")
+    created_by = _LazyClrField(lambda e, ev: e.CreatedBy or "")
+    created_at = _LazyClrField(lambda e, ev: _clr_datetime(e.CreatedAt, ev._received_at))
+    message_id = _LazyClrField(lambda e, ev: e.MessageId or "")
+
+
+class _LazyTaskStepEvent(_LazyClrEvent, TaskStepEvent):
+    _event_class = TaskStepEvent
+
+    parent_task_id = _LazyClrField(lambda e, ev: e.ParentTaskId or "")
+    step_number = _LazyClrField(lambda e, ev: e.StepNumber)
+    description = _LazyClrField(lambda e, ev: e.Description or "")
+    status = _LazyClrField(lambda e, ev: e.Status or "")
+    message_id = _LazyClrField(lambda e, ev: e.MessageId or "")
+
+
+class _LazyTaskStepUpdateEvent(_LazyClrEvent, TaskStepUpdateEvent):
+    _event_class = TaskStepUpdateEvent
+
+    parent_task_id = _LazyClrField(lambda e, ev: e.ParentTaskId or "")
+    step_number = _LazyClrField(lambda e, ev: e.StepNumber)
+    status = _LazyClrField(lambda e, ev: e.Status or "")
+    completed_by = _LazyClrField(lambda e, ev: e.CompletedBy or "")
+    completed_at = _LazyClrField(lambda e, ev: _clr_datetime(e.CompletedAt, ev._received_at))
+    result = _LazyClrField(lambda e, ev: e.Result)
+
+
+class _LazyTaskCompleteEvent(_LazyClrEvent, TaskCompleteEvent):
+    _event_class = TaskCompleteEvent
+
+    task_id = _LazyClrField(lambda e, ev: e.TaskId or "")
+    completed_by = _LazyClrField(lambda e, ev: e.CompletedBy or "")
+    completed_at = _LazyClrField(lambda e, ev: _clr_datetime(e.CompletedAt, ev._received_at))
+
+
+class _LazyScheduledTaskCreationEvent(_LazyClrEvent, ScheduledTaskCreationEvent):
+    _event_class = ScheduledTaskCreationEvent
+
+    task_id = _LazyClrField(lambda e, ev: e.TaskId or "")
+    title = _LazyClrField(lambda e, ev: e.Title or "")
+    description = _LazyClrField(lambda e, ev: e.Description or "")
+    # Convert C# List<string> to Python list
+    steps = _LazyClrField(lambda e, ev: [str(step) for step in e.Steps] if getattr(e, 'Steps', None) else [])
+    scheduled_by = _LazyClrField(lambda e, ev: e.ScheduledBy or "")
+    scheduled_by_internal_id = _LazyClrField(lambda e, ev: e.ScheduledByInternalId or "")
+    original_schedule_time = _LazyClrField(
+        lambda e, ev: _clr_datetime(e.OriginalScheduleTime, ev._received_at)
+    )
+
+
+# ==================================================================================
+# EVENT INGRESS - BOUNDED HANDOFF FROM CLR CALLBACK THREADS
+# ==================================================================================
+
+class _EventIngressClosed(HexaEightAgentError):
+    """Raised by _EventIngress.get() once the buffer is closed and drained."""
+
+
+class _EventIngress:
+    """
+    Thread-safe buffer between CLR callback threads and asyncio consumers.
+
+    .NET threads call put(); consumers await get() on their event loop. Waiting
+    consumers are woken with call_soon_threadsafe so no wakeup is lost when
+    events arrive from foreign threads. The buffer is unbounded unless maxsize
+    is given; overflow of a bounded buffer follows an OverflowPolicy and is
+    counted per event type.
+    """
+
+    def __init__(self, maxsize: Optional[int] = None,
+                 overflow_policy: Union[OverflowPolicy, str] = OverflowPolicy.DROP_OLDEST,
+                 spill_directory: Optional[str] = None):
+        if maxsize is not None and maxsize <= 0:
+            raise ValueError("Event queue size must be positive")
+        self._maxsize = maxsize
+        self._policy = OverflowPolicy(overflow_policy)
+        self._spill_directory = spill_directory
+
+        self._buffer = collections.deque()
+        self._lock = threading.Lock()
+        self._not_full = threading.Condition(self._lock)
+        self._waiters: List[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = []
+        self._closed = False
+
+        # Spill file state (SPILL_TO_DISK only)
+        self._spill_file = None
+        self._spill_read_offset = 0
+        self._spill_count = 0
+
+        self._high_watermark = 0
+        self._counters: Dict[str, Dict[str, int]] = {}
+
+    def _counter(self, event_type: str) -> Dict[str, int]:
+        counter = self._counters.get(event_type)
+        if counter is None:
+            counter = {"received": 0, "delivered": 0, "dropped": 0, "spilled": 0}
+            self._counters[event_type] = counter
+        return counter
+
+    def put(self, event_type: str, event_data: Any) -> bool:
+        """Buffer an event from any thread. Returns False if the event was dropped."""
+        with self._lock:
+            if self._closed:
+                return False
+            counter = self._counter(event_type)
+            counter["received"] += 1
+
+            if self._policy is OverflowPolicy.SPILL_TO_DISK:
+                # Once spilling has started, keep spilling until the file drains to preserve order
+                if self._spill_count or self._full_locked():
+                    if not self._spill_locked(event_type, event_data):
+                        counter["dropped"] += 1
+                        return False
+                    counter["spilled"] += 1
+                    self._wake_consumers_locked()
+                    return True
+
+            elif self._full_locked():
+                if self._policy is OverflowPolicy.BLOCK:
+                    while self._full_locked() and not self._closed:
+                        self._not_full.wait()
+                    if self._closed:
+                        counter["dropped"] += 1
+                        return False
+                elif self._policy is OverflowPolicy.DROP_OLDEST:
+                    oldest_type, _ = self._buffer.popleft()
+                    self._counter(oldest_type)["dropped"] += 1
+                else:  # DROP_NEWEST
+                    counter["dropped"] += 1
+                    return False
+
+            self._buffer.append((event_type, event_data))
+            depth = len(self._buffer) + self._spill_count
+            if depth > self._high_watermark:
+                self._high_watermark = depth
+            self._wake_consumers_locked()
+            return True
+
+    def _full_locked(self) -> bool:
+        return self._maxsize is not None and len(self._buffer) >= self._maxsize
+
+    def _spill_locked(self, event_type: str, event_data: Any) -> bool:
+        """Append an event to the spill file. Caller holds the lock."""
+        try:
+            if self._spill_file is None:
+                self._spill_file = tempfile.TemporaryFile(
+                    prefix="hexaeight-events-", dir=self._spill_directory
+                )
+            self._spill_file.seek(0, os.SEEK_END)
+            pickle.dump((event_type, event_data), self._spill_file, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception as e:
+            _library_debug_log(f"Failed to spill {event_type} event to disk: {e}")
+            return False
+
+        self._spill_count += 1
+        depth = len(self._buffer) + self._spill_count
+        if depth > self._high_watermark:
+            self._high_watermark = depth
+        return True
+
+    def _unspill_locked(self) -> Optional[Tuple[str, Any]]:
+        """Read the next spilled event. Caller holds the lock."""
+        self._spill_file.seek(self._spill_read_offset)
+        item = pickle.load(self._spill_file)
+        self._spill_read_offset = self._spill_file.tell()
+        self._spill_count -= 1
+        if self._spill_count == 0:
+            # Fully drained - reclaim the disk space
+            self._spill_file.seek(0)
+            self._spill_file.truncate()
+            self._spill_read_offset = 0
+        return item
+
+    def _pop_locked(self) -> Optional[Tuple[str, Any]]:
+        """Take the next event in arrival order. Caller holds the lock."""
+        if self._buffer:
+            item = self._buffer.popleft()
+            self._not_full.notify()
+        elif self._spill_count:
+            item = self._unspill_locked()
+        else:
+            return None
+        self._counter(item[0])["delivered"] += 1
+        return item
+
+    def _wake_consumers_locked(self):
+        waiters, self._waiters = self._waiters, []
+        for loop, future in waiters:
+            try:
+                loop.call_soon_threadsafe(_set_future_result_if_pending, future, None)
+            except RuntimeError:
+                pass  # Consumer's loop is closed
+
+    def get_nowait(self) -> Optional[Tuple[str, Any]]:
+        """Return the next event, or None if nothing is buffered."""
+        with self._lock:
+            return self._pop_locked()
+
+    async def _wait_for_events(self, timeout: Optional[float] = None) -> bool:
+        """Wait until an event is buffered or the timeout expires. Returns True if woken."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self._buffer or self._spill_count or self._closed:
+                return True
+            waiter = loop.create_future()
+            self._waiters.append((loop, waiter))
+        try:
+            await asyncio.wait([waiter], timeout=timeout)
+        finally:
+            with self._lock:
+                self._waiters = [w for w in self._waiters if w[1] is not waiter]
+        return waiter.done()
+
+    async def get(self) -> Tuple[str, Any]:
+        """Wait for the next event; raises _EventIngressClosed once closed and drained."""
+        while True:
+            with self._lock:
+                item = self._pop_locked()
+                if item is not None:
+                    return item
+                if self._closed:
+                    raise _EventIngressClosed("Event buffer closed")
+            await self._wait_for_events()
+
+    async def get_batch(self, max_batch: int, max_wait: float) -> List[Tuple[str, Any]]:
+        """
+        Wait for at least one event, then collect up to max_batch events,
+        waiting at most max_wait seconds for the batch to fill.
+        """
+        loop = asyncio.get_running_loop()
+        batch = [await self.get()]
+        deadline = loop.time() + max_wait
+        while True:
+            with self._lock:
+                while len(batch) < max_batch:
+                    item = self._pop_locked()
+                    if item is None:
+                        break
+                    batch.append(item)
+                closed = self._closed
+            if len(batch) >= max_batch or closed:
+                return batch
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return batch
+            await self._wait_for_events(remaining)
+
+    def qsize(self) -> int:
+        with self._lock:
+            return len(self._buffer) + self._spill_count
+
+    def close(self):
+        """Release blocked producers and waiting consumers; further events are dropped."""
+        with self._lock:
+            self._closed = True
+            self._not_full.notify_all()
+            self._wake_consumers_locked()
+            if self._spill_file is not None:
+                try:
+                    self._spill_file.close()
+                except Exception:
+                    pass
+                self._spill_file = None
+                self._spill_count = 0
+                self._spill_read_offset = 0
+
+    def statistics(self) -> Dict[str, Any]:
+        """Snapshot of depth, high watermark and per-event-type counters."""
+        with self._lock:
+            return {
+                "depth": len(self._buffer) + self._spill_count,
+                "memory_depth": len(self._buffer),
+                "spilled_depth": self._spill_count,
+                "high_watermark": self._high_watermark,
+                "max_size": self._maxsize,
+                "overflow_policy": self._policy.value,
+                "event_types": {name: dict(counter) for name, counter in self._counters.items()},
+            }
+
+
+def _set_future_result_if_pending(future: "asyncio.Future", result: Any):
+    """Resolve a future from call_soon_threadsafe unless it was already cancelled."""
+    if not future.done():
+        future.set_result(result)
+
+
+# ==================================================================================
+# EVENT DISPATCH - CONCURRENT HANDLERS WITH PER-KEY ORDERING
+# ==================================================================================
+
+def _default_event_ordering_key(event_type: str, event_data: Any) -> Any:
+    """Events sharing this key are handled in arrival order; others may run in parallel."""
+    if event_type == 'message_received':
+        return getattr(event_data, 'sender_internal_id', None) or getattr(event_data, 'sender', None)
+    if event_type in ('task_step_received', 'task_step_updated'):
+        return getattr(event_data, 'parent_task_id', None)
+    if event_type in ('task_received', 'task_completed', 'scheduled_task_creation'):
+        return getattr(event_data, 'task_id', None)
+    if event_type == 'lock_expired':
+        return getattr(event_data, 'message_id', None)
+    return event_type
+
+
+class _EventDispatcher:
+    """
+    Runs event handlers on a fixed pool of worker tasks.
+
+    Each event is routed to a worker by hashing its ordering key, so events with
+    the same key (sender, task, message) keep their order while different keys are
+    handled in parallel. Worker queues are bounded, which pushes backpressure to
+    the event buffer. Optional per-event-type limits cap how many handlers of one
+    type run at once.
+    """
+
+    def __init__(self, agent: "HexaEightAgent", concurrency: int,
+                 event_type_limits: Optional[Dict[str, int]] = None,
+                 offload_sync_handlers: bool = False, queue_size: int = 100):
+        if concurrency <= 0:
+            raise ValueError("concurrency must be positive")
+        self._agent = agent
+        self._queues = [asyncio.Queue(maxsize=queue_size) for _ in range(concurrency)]
+        self._limits = {
+            event_type: asyncio.Semaphore(limit)
+            for event_type, limit in (event_type_limits or {}).items()
+        }
+        self._executor = (
+            ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="hexaeight-handler")
+            if offload_sync_handlers else None
+        )
+        self._workers = [asyncio.ensure_future(self._worker(queue)) for queue in self._queues]
+
+    async def submit(self, key: Any, event_type: str, payload: Any):
+        """Queue an event for the worker owning key; waits while that worker is saturated."""
+        queue = self._queues[hash(key) % len(self._queues)]
+        await queue.put((event_type, payload))
+
+    async def _worker(self, queue: asyncio.Queue):
+        while True:
+            item = await queue.get()
+            if item is None:
+                break
+            event_type, payload = item
+            limit = self._limits.get(event_type)
+            if limit is None:
+                await self._agent._dispatch_event(event_type, payload, self._executor)
+            else:
+                async with limit:
+                    await self._agent._dispatch_event(event_type, payload, self._executor)
+
+    async def close(self, drain: bool = True):
+        """Stop the workers, by default after they finish already queued events."""
+        if drain:
+            for queue in self._queues:
+                await queue.put(None)
+            await asyncio.gather(*self._workers, return_exceptions=True)
+        else:
+            for worker in self._workers:
+                worker.cancel()
+            await asyncio.gather(*self._workers, return_exceptions=True)
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+
+
+# ==================================================================================
+# LOCK HEARTBEATS - ONE TIMER WHEEL FOR ALL HELD LOCKS
+# ==================================================================================
+
+# Locks acquired while an event handler runs, when the agent releases handler locks
+_HANDLER_LOCK_SCOPE = contextvars.ContextVar("hexaeight_handler_lock_scope", default=None)
+
+
+class _LockHeartbeatScheduler:
+    """
+    Keeps held message locks alive from a single timer wheel.
+
+    The wheel has one slot per tick of the heartbeat interval. A lock sits in the
+    slot where its next heartbeat falls due; every tick, all locks in the current
+    slot are heartbeated together in one bounded round and moved back one full
+    revolution. Thousands of held locks cost a single timer task.
+    """
+
+    def __init__(self, agent: "HexaEightAgent", interval: float = 20.0, tick: float = 1.0,
+                 concurrency: int = 64):
+        if interval <= 0 or tick <= 0:
+            raise ValueError("interval and tick must be positive")
+        self._agent = agent
+        self._interval = interval
+        self._tick = min(tick, interval)
+        self._slots: List[set] = [set() for _ in range(max(1, int(round(interval / self._tick))))]
+        self._positions: Dict[Tuple[str, str], Optional[int]] = {}  # None while in a round
+        self._cursor = 0
+        self._concurrency = concurrency
+        self._task: Optional[asyncio.Task] = None
+        self._stats = {"rounds": 0, "heartbeats_sent": 0, "heartbeat_failures": 0}
+
+    def track(self, url: str, message_id: str):
+        """Start heartbeating a lock; the first heartbeat goes out one interval from now."""
+        key = (url, message_id)
+        if key in self._positions:
+            return
+        self._place(key)
+        try:
+            if self._task is None or self._task.done():
+                self._task = asyncio.get_running_loop().create_task(self._run())
+        except RuntimeError:
+            # No running loop: heartbeats start once the next lock is taken inside one
+            pass
+
+    def untrack(self, url: str, message_id: str) -> bool:
+        """Stop heartbeating a lock. Returns False if it was not tracked."""
+        key = (url, message_id)
+        if key not in self._positions:
+            return False
+        slot = self._positions.pop(key)
+        if slot is not None:
+            self._slots[slot].discard(key)
+        return True
+
+    def is_tracked(self, url: str, message_id: str) -> bool:
+        return (url, message_id) in self._positions
+
+    def held_locks(self) -> List[Tuple[str, str]]:
+        """(url, message_id) of every lock currently being heartbeated."""
+        return list(self._positions)
+
+    def statistics(self) -> Dict[str, Any]:
+        return dict(self._stats, held_locks=len(self._positions), interval_seconds=self._interval)
+
+    def close(self):
+        """Stop the timer and forget all locks (they are not released)."""
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+        self._task = None
+        self._positions.clear()
+        for slot in self._slots:
+            slot.clear()
+
+    def _place(self, key: Tuple[str, str]):
+        # The slot just behind the cursor comes round again after a full revolution
+        slot = (self._cursor - 1) % len(self._slots)
+        self._slots[slot].add(key)
+        self._positions[key] = slot
+
+    async def _heartbeat(self, key: Tuple[str, str]) -> bool:
+        url, message_id = key
+        return bool(await self._agent.send_lock_heartbeat(url, message_id))
+
+    async def _run(self):
+        try:
+            while self._positions:
+                await asyncio.sleep(self._tick)
+                due = list(self._slots[self._cursor])
+                self._slots[self._cursor].clear()
+                self._cursor = (self._cursor + 1) % len(self._slots)
+                if not due:
+                    continue
+
+                for key in due:
+                    self._positions[key] = None
+                results = await _map_bounded(self._heartbeat, due, self._concurrency)
+                self._stats["rounds"] += 1
+
+                for key, ok in zip(due, results):
+                    if key not in self._positions:
+                        continue  # released while the round was in flight
+                    if ok:
+                        self._stats["heartbeats_sent"] += 1
+                        self._place(key)
+                    else:
+                        # The server refused the heartbeat: the lock is gone, forget it everywhere
+                        self._stats["heartbeat_failures"] += 1
+                        if self._agent._on_lock_lost(*key):
+                            self._agent._log_warning(f"Lost lock on message {key[1]}: heartbeat was rejected")
+        finally:
+            if self._task is asyncio.current_task():
+                self._task = None
+
+
+class _LockIndex:
+    """
+    In-process mirror of the locks this agent holds, keyed by (server URL, message ID).
+
+    Updated from lock, heartbeat, release and completion results and from lock
+    expiry notifications (which arrive on CLR threads, hence the mutex), so lock
+    queries never cross into the CLR. Listeners are called with (change, lock)
+    where change is "acquired", "renewed", "released" or "expired".
+    """
+
+    def __init__(self, agent: "HexaEightAgent", lock_duration: timedelta = timedelta(minutes=1)):
+        self._agent = agent
+        self._lock_duration = lock_duration
+        self._mutex = threading.Lock()
+        self._locks: Dict[Tuple[str, str], MessageLock] = {}
+        self._listeners: List[Callable[[str, MessageLock], Any]] = []
+
+    def acquired(self, url: str, message_id: str, locked_by: str = "", locked_by_internal_id: str = ""):
+        now = datetime.utcnow()
+        lock = MessageLock(message_id, locked_by, locked_by_internal_id, now, now + self._lock_duration, url)
+        with self._mutex:
+            self._locks[(url, message_id)] = lock
+        self._notify("acquired", lock)
+
+    def renewed(self, url: str, message_id: str):
+        with self._mutex:
+            lock = self._locks.get((url, message_id))
+            if lock is None:
+                return
+            lock = replace(lock, expires_at=datetime.utcnow() + self._lock_duration)
+            self._locks[(url, message_id)] = lock
+        self._notify("renewed", lock)
+
+    def released(self, url: str, message_id: str, change: str = "released"):
+        with self._mutex:
+            lock = self._locks.pop((url, message_id), None)
+        if lock is not None:
+            self._notify(change, lock)
+
+    def expired(self, message_id: str) -> List[Tuple[str, str]]:
+        """Drop message_id on every server (expiry notifications carry no URL); returns the dropped keys."""
+        with self._mutex:
+            keys = [key for key in self._locks if key[1] == message_id]
+            locks = [self._locks.pop(key) for key in keys]
+        for lock in locks:
+            self._notify("expired", lock)
+        return keys
+
+    def reconcile(self, locks: List[MessageLock]):
+        """
+        Replace the mirror with an authoritative lock list, notifying the differences.
+
+        The CLR lock list carries no server URL, so a lock keeps the URL it was
+        acquired on when the mirror already knows its message ID.
+        """
+        with self._mutex:
+            urls = {key[1]: key[0] for key in self._locks}
+            incoming = {}
+            for lock in locks:
+                if not lock.pubsub_server_url and lock.message_id in urls:
+                    lock = replace(lock, pubsub_server_url=urls[lock.message_id])
+                incoming[(lock.pubsub_server_url, lock.message_id)] = lock
+            previous, self._locks = self._locks, incoming
+        for key, lock in previous.items():
+            if key not in incoming:
+                self._notify("released", lock)
+        for key, lock in incoming.items():
+            if key not in previous:
+                self._notify("acquired", lock)
+            elif previous[key].expires_at != lock.expires_at:
+                self._notify("renewed", lock)
+
+    def is_locked(self, message_id: str, url: Optional[str] = None) -> bool:
+        lock = self.get(message_id, url)
+        return lock is not None and lock.expires_at > datetime.utcnow()
+
+    def get(self, message_id: str, url: Optional[str] = None) -> Optional[MessageLock]:
+        """The lock on message_id on url, or on any server when url is None (latest expiry wins)."""
+        if url is not None:
+            return self._locks.get((url, message_id))
+        with self._mutex:
+            matches = [lock for key, lock in self._locks.items() if key[1] == message_id]
+        return max(matches, key=lambda lock: lock.expires_at) if matches else None
+
+    def message_ids(self) -> set:
+        now = datetime.utcnow()
+        with self._mutex:
+            return {key[1] for key, lock in self._locks.items() if lock.expires_at > now}
+
+    def by_expiry(self) -> List[MessageLock]:
+        with self._mutex:
+            locks = list(self._locks.values())
+        return sorted(locks, key=lambda lock: lock.expires_at)
+
+    def add_listener(self, callback: Callable[[str, MessageLock], Any]):
+        self._listeners.append(callback)
+
+    def remove_listener(self, callback: Callable[[str, MessageLock], Any]):
+        try:
+            self._listeners.remove(callback)
+        except ValueError:
+            pass
+
+    def _notify(self, change: str, lock: MessageLock):
+        for callback in list(self._listeners):
+            try:
+                callback(change, lock)
+            except Exception as e:
+                self._agent._log_error(f"Error in lock listener: {e}")
+
+
+# ==================================================================================
+# LOCAL SCHEDULER - NEAR-TERM SCHEDULES FIRED IN-PROCESS
+# ==================================================================================
+
+# Target types the local scheduler can deliver itself, and the publish method used
+_LOCAL_SCHEDULE_PUBLISHERS = {
+    "agent_name": "publish_to_agent",
+    "internal_id": "publish_to_internal_id",
+    "broadcast": "publish_broadcast",
+}
+
+
+class _LocalScheduler:
+    """
+    Holds plain messages due within the horizon in a heap and publishes them when due.
+
+    A single task sleeps until the earliest entry is due and is woken early when a
+    sooner one arrives. Entries live only in this process: they are lost if it
+    exits, which is why durable schedules always go to the server.
+    """
+
+    def __init__(self, agent: "HexaEightAgent", horizon_seconds: float):
+        self._agent = agent
+        self.horizon_seconds = horizon_seconds
+        self._heap: List[Tuple[float, int, ScheduledMessage]] = []
+        self._sequence = itertools.count()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._deliveries: Dict[asyncio.Future, ScheduledMessage] = {}
+        self._stats = {"scheduled": 0, "delivered": 0, "failed": 0}
+
+    def accepts(self, entry: ScheduledMessage, delay: float) -> bool:
+        """True if the entry is this scheduler's to deliver; past-due entries included (the caller refuses them)."""
+        return (self.horizon_seconds > 0
+                and delay <= self.horizon_seconds
+                and entry.message_type == "message"
+                and entry.target_type in _LOCAL_SCHEDULE_PUBLISHERS)
+
+    def add(self, entry: ScheduledMessage, delay: float):
+        loop = asyncio.get_running_loop()
+        heapq.heappush(self._heap, (loop.time() + delay, next(self._sequence), entry))
+        self._stats["scheduled"] += 1
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._task = loop.create_task(self._run())
+        else:
+            self._wakeup.set()
+
+    def statistics(self) -> Dict[str, Any]:
+        return dict(self._stats, pending=len(self._heap), horizon_seconds=self.horizon_seconds)
+
+    def close(self) -> int:
+        """Stop the timer and cancel deliveries in flight; returns how many schedules were dropped."""
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+        self._task = None
+        for delivery in self._deliveries:
+            delivery.cancel()
+        dropped = list(self._deliveries.values())
+        dropped += [entry for _, _, entry in self._heap if entry.status == "local"]
+        self._deliveries.clear()
+        self._heap.clear()
+        for entry in dropped:
+            entry.status, entry.error = "cancelled", "Local scheduler closed"
+            self._agent._schedules.pop(entry.schedule_id, None)
+        return len(dropped)
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while self._heap:
+            due, _, entry = self._heap[0]
+            delay = due - loop.time()
+            if delay > 0:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            heapq.heappop(self._heap)
+            if entry.status != "local":
+                continue  # cancelled
+            delivery = asyncio.ensure_future(self._deliver(entry))
+            self._deliveries[delivery] = entry
+            delivery.add_done_callback(lambda done: self._deliveries.pop(done, None))
+
+    async def _deliver(self, entry: ScheduledMessage):
+        publish = getattr(self._agent, _LOCAL_SCHEDULE_PUBLISHERS[entry.target_type])
+        if entry.target_type == "broadcast":
+            success = await publish(entry.pubsub_server_url, entry.message)
+        else:
+            success = await publish(entry.pubsub_server_url, entry.target_value, entry.message)
+        if success:
+            entry.status = "delivered"
+            self._stats["delivered"] += 1
+        else:
+            entry.status, entry.error = "failed", "Local delivery failed"
+            self._stats["failed"] += 1
+        self._agent._schedules.pop(entry.schedule_id, None)
+
+
+# ==================================================================================
+# SIGNING IDENTITY - ONE SET OF CREDENTIALS IN THE PROCESS ENVIRONMENT AT A TIME
+# ==================================================================================
+
+def _apply_signing_context(context: SigningContext):
+    """Copy a context's credentials to the env vars the CLR signer reads."""
+    Environment.SetEnvironmentVariable("HEXAEIGHT_RESOURCENAME", context.resource_name)
+    Environment.SetEnvironmentVariable("HEXAEIGHT_MACHINETOKEN", context.machine_token)
+    Environment.SetEnvironmentVariable("HEXAEIGHT_SECRET", context.secret)
+    Environment.SetEnvironmentVariable("HEXAEIGHT_LICENSECODE", context.license_code)
+
+
+class _SigningIdentityGate:
+    """
+    Serializes switches of the process-wide signing identity.
+
+    The CLR signer reads its credentials from process environment variables, so
+    one identity is applied at a time. Signings with the applied identity run
+    concurrently and leave the environment alone. While another identity is
+    waiting, no new signings are admitted for the applied one; once those in
+    flight finish, the waiting identity's credentials are applied and every
+    signing it had queued runs. Identities take turns, so a long batch for one
+    identity does not starve the others.
+
+    The gate is shared by every thread and event loop in the process: its state
+    is guarded by a threading.Lock and each waiter is woken on its own loop.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._active: Optional[Tuple[str, str, str, str]] = None
+        self._in_flight = 0
+        self._waiting: Dict[Tuple[str, str, str, str], int] = {}
+        self._waiters: List[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = []
+        self._tickets = itertools.count()
+        self._turn_ticket = 0  # signings queued before the last switch belong to its turn
+        self.switches = 0
+
+    def invalidate(self):
+        """Forget the applied identity (the environment was changed elsewhere)."""
+        with self._lock:
+            self._active = None
+
+    async def acquire(self, context: SigningContext):
+        """Wait for context's turn and make it the applied identity; pair with release()."""
+        identity = context.identity
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            ticket = next(self._tickets)
+            self._waiting[identity] = self._waiting.get(identity, 0) + 1
+        waiting = True
+        try:
+            while True:
+                with self._lock:
+                    if self._admits(identity, ticket):
+                        self._stop_waiting_locked(identity)
+                        waiting = False
+                        if self._active != identity:
+                            # Under the lock so no other thread signs mid-switch
+                            _apply_signing_context(context)
+                            self._active = identity
+                            self._turn_ticket = next(self._tickets)
+                            self.switches += 1
+                        self._in_flight += 1
+                        return
+                    waiter = loop.create_future()
+                    self._waiters.append((loop, waiter))
+                await waiter
+        finally:
+            if waiting:
+                with self._lock:
+                    self._stop_waiting_locked(identity)
+
+    def release(self):
+        with self._lock:
+            self._in_flight -= 1
+            self._wake_locked()
+
+    @contextlib.asynccontextmanager
+    async def use(self, context: Optional[SigningContext]):
+        if context is None:
+            # No credentials loaded: nothing to apply
+            yield
+            return
+        await self.acquire(context)
+        try:
+            yield
+        finally:
+            self.release()
+
+    def _admits(self, identity: Tuple[str, str, str, str], ticket: int) -> bool:
+        if self._active == identity:
+            return ticket < self._turn_ticket or all(other == identity for other in self._waiting)
+        return self._in_flight == 0
+
+    def _stop_waiting_locked(self, identity: Tuple[str, str, str, str]):
+        self._waiting[identity] -= 1
+        if not self._waiting[identity]:
+            del self._waiting[identity]
+        self._wake_locked()
+
+    def _wake_locked(self):
+        waiters, self._waiters = self._waiters, []
+        for loop, waiter in waiters:
+            try:
+                loop.call_soon_threadsafe(_set_future_result_if_pending, waiter, None)
+            except RuntimeError:
+                pass  # Its event loop is closed
+
+
+_SIGNING_GATE = _SigningIdentityGate()
+
+
+# ==================================================================================
+# VERIFIED TOKEN CACHE - REPEAT JWT VERIFICATIONS FROM MEMORY
+# ==================================================================================
+
+def _jwt_expiry(jwt: str) -> Optional[float]:
+    """The exp claim (epoch seconds) of a signed JWT, read without verifying; None if unavailable."""
+    parts = jwt.split(".")
+    if len(parts) != 3:
+        return None  # encrypted (JWE) or malformed: the claims are not readable
+    try:
+        payload = parts[1] + "=" * (-len(parts[1]) % 4)
+        exp = json.loads(base64.urlsafe_b64decode(payload)).get("exp")
+        return float(exp) if exp is not None else None
+    except (ValueError, TypeError, AttributeError):
+        return None
+
+
+def _verification_cache_key(jwt: str, original_message: str, expected_sender_email: Optional[str],
+                            is_file_path: bool) -> Optional[Tuple]:
+    """Key identifying a verification; files are identified by their content digest, None if unreadable."""
+    jwt_digest = hashlib.sha256(jwt.encode("utf-8")).hexdigest()
+    if is_file_path:
+        try:
+            content = _FILE_FINGERPRINTS.digest(original_message)
+        except (OSError, ValueError):
+            return None
+    else:
+        content = hashlib.sha256(original_message.encode("utf-8")).hexdigest()
+    return (jwt_digest, content, expected_sender_email or "", is_file_path)
+
+
+class _VerifiedTokenCache:
+    """
+    LRU of successful JWT verification results.
+
+    An entry lives until the token's exp claim or ttl_seconds, whichever comes
+    first. Files are keyed by their SHA-256 (see _FileFingerprintCache), so a
+    changed file misses while an unchanged one costs a stat and a lookup. A
+    cached result is not re-checked against the sender's current status, so a
+    token from a sender revoked meanwhile keeps verifying until its entry expires.
+    """
+
+    def __init__(self, max_entries: int = 4096, ttl_seconds: float = 300.0):
+        self._max_entries = max_entries
+        self._ttl = ttl_seconds
+        self._lock = threading.Lock()
+        self._entries: "collections.OrderedDict[Tuple, Tuple[float, Dict[str, Any]]]" = collections.OrderedDict()
+        self._stats = {"hits": 0, "misses": 0, "expired": 0, "evictions": 0}
+
+    def get(self, key: Tuple) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+            if entry[0] <= time.time():
+                del self._entries[key]
+                self._stats["expired"] += 1
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return dict(entry[1])
+
+    def put(self, key: Tuple, jwt: str, result: Dict[str, Any]):
+        if not result.get("verified"):
+            return
+        expires_at = time.time() + self._ttl
+        token_expiry = _jwt_expiry(jwt)
+        if token_expiry is not None:
+            expires_at = min(expires_at, token_expiry)
+        if expires_at <= time.time():
+            return
+        with self._lock:
+            self._entries[key] = (expires_at, dict(result))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def statistics(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats, entries=len(self._entries))
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_ratio"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
+
+
+# ==================================================================================
+# STREAMING SOURCES - FEED PYTHON BYTE SOURCES TO THE CLR IN CHUNKS
+# ==================================================================================
+
+_STREAM_CHUNK_SIZE = 1 << 20
+
+
+def _is_path_source(source: Any) -> bool:
+    return isinstance(source, (str, os.PathLike))
+
+
+async def _iter_source_chunks(source: Any, chunk_size: int) -> AsyncGenerator[bytes, None]:
+    """Yield a byte source in chunks of at most chunk_size bytes, never holding more than one chunk."""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        view = memoryview(source).cast("B")
+        for offset in range(0, len(view), chunk_size):
+            yield view[offset:offset + chunk_size]
+    elif hasattr(source, "__aiter__"):
+        # Before read: async file objects (aiofiles) have both, and their read is a coroutine
+        async for chunk in source:
+            if isinstance(chunk, str):
+                chunk = chunk.encode("utf-8")
+            view = memoryview(chunk).cast("B")
+            for offset in range(0, len(view), chunk_size):
+                yield view[offset:offset + chunk_size]
+    elif hasattr(source, "read"):
+        loop = asyncio.get_running_loop()
+        while True:
+            chunk = await loop.run_in_executor(None, source.read, chunk_size)
+            if not chunk:
+                break
+            if isinstance(chunk, str):
+                chunk = chunk.encode("utf-8")
+            yield chunk
+    else:
+        raise TypeError(f"Unsupported stream source: {type(source).__name__}")
+
+
+async def _spool_source(source: Any, chunk_size: int) -> Tuple[str, int]:
+    """Write a byte source to a temporary file chunk by chunk; returns (path, size). Caller deletes the file."""
+    loop = asyncio.get_running_loop()
+    handle = tempfile.NamedTemporaryFile(prefix="hexaeight-stream-", delete=False)
+    size = 0
+    try:
+        async for chunk in _iter_source_chunks(source, chunk_size):
+            await loop.run_in_executor(None, handle.write, chunk)
+            size += len(chunk)
+    except BaseException:
+        handle.close()
+        os.unlink(handle.name)
+        raise
+    handle.close()
+    return handle.name, size
+
+
+@contextlib.asynccontextmanager
+async def _source_as_path(source: Any, chunk_size: int):
+    """Yield (path, size) for a stream source; non-path sources are spooled to a temporary file (verification only)."""
+    if _is_path_source(source):
+        path = os.fspath(source)
+        yield path, os.path.getsize(path)
+        return
+    path, size = await _spool_source(source, chunk_size)
+    try:
+        yield path, size
+    finally:
+        os.unlink(path)
+
+
+def _source_size(source: Any) -> Optional[int]:
+    """Bytes left in a non-path source, if that can be told without reading it."""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return memoryview(source).nbytes
+    try:
+        return os.fstat(source.fileno()).st_size - source.tell()
+    except (AttributeError, OSError, ValueError, TypeError):
+        return None
+
+
+class _ClrChunkPipe:
+    """
+    A System.IO.Stream the CLR reads while a Python byte source is written into it.
+
+    Backed by an anonymous pipe, so at most the pipe buffer and one chunk are in
+    flight; nothing is spooled to disk or held in memory in full.
+    """
+
+    def __init__(self):
+        self.reader = AnonymousPipeServerStream(PipeDirection.In)
+        self._writer = AnonymousPipeClientStream(PipeDirection.Out, self.reader.ClientSafePipeHandle)
+        self.size = 0
+
+    async def feed(self, source: Any, chunk_size: int) -> int:
+        """Write source into the pipe chunk by chunk, then close it so the reader sees the end."""
+        loop = asyncio.get_running_loop()
+        try:
+            async for chunk in _iter_source_chunks(source, chunk_size):
+                data = bytes(chunk)
+                # Blocks while the reader is behind, so it runs off the event loop
+                await loop.run_in_executor(None, self._writer.Write, data, 0, len(data))
+                self.size += len(data)
+        except BaseException:
+            # Fail the reader first so a broken source never looks like a short one
+            self.reader.Dispose()
+            raise
+        finally:
+            self._writer.Dispose()
+        return self.size
+
+    def close(self):
+        self._writer.Dispose()
+        self.reader.Dispose()
+
+
+def _throughput_mb_s(size: int, elapsed: float) -> float:
+    return round(size / (1 << 20) / elapsed, 2) if elapsed > 0 else 0.0
+
+
 # ==================================================================================
 # ENVIRONMENT MANAGER (KEEP AS-IS)
 # ==================================================================================
@@ -628,7 +2280,7 @@ class HexaEightEnvironmentManager:
                 py_license = os.environ.get(HexaEightEnvironmentManager.LICENSECODE_KEY)
                 
                 if py_resource or py_token:
-                    if DOTNET_AVAILABLE:
+                    if _DOTNET_AVAILABLE:
                         try:
                             if py_resource:
                                 Environment.SetEnvironmentVariable(HexaEightEnvironmentManager.RESOURCENAME_KEY, py_resource)
@@ -700,7 +2352,7 @@ class HexaEightEnvironmentManager:
                     if key == HexaEightEnvironmentManager.RESOURCENAME_KEY:
                         os.environ[HexaEightEnvironmentManager.RESOURCENAME_KEY2] = value
                     
-                    if DOTNET_AVAILABLE:
+                    if _DOTNET_AVAILABLE:
                         try:
                             Environment.SetEnvironmentVariable(key, value)
                             if key == HexaEightEnvironmentManager.RESOURCENAME_KEY:
@@ -732,7 +2384,7 @@ class HexaEightEnvironmentManager:
             
             result = CSharpEnvironmentManager.SetResourceName(resource_name)
             
-            if DOTNET_AVAILABLE:
+            if _DOTNET_AVAILABLE:
                 try:
                     Environment.SetEnvironmentVariable(HexaEightEnvironmentManager.RESOURCENAME_KEY, resource_name)
                     Environment.SetEnvironmentVariable(HexaEightEnvironmentManager.RESOURCENAME_KEY2, resource_name)
@@ -752,6 +2404,240 @@ class HexaEightEnvironmentManager:
             return "Ok"
 
 
+# ==================================================================================
+# PUBSUB SESSION - CONNECTION STATE BOUND TO ONE SERVER
+# ==================================================================================
+
+_UNHEALTHY_STATUS_WORDS = ("unhealthy", "degraded", "down", "fail", "error")
+
+
+def _health_payload_ok(payload: Any) -> bool:
+    """
+    Interpret a server health response.
+
+    JSON objects are checked for a boolean "healthy" field or a "status" field
+    (keys are case-insensitive). Plain text is taken as the status. A status
+    containing unhealthy/degraded/down/fail/error is unhealthy; anything else,
+    including a payload without a recognizable status, counts as healthy.
+    """
+    status = payload
+    try:
+        data = json.loads(payload)
+    except (TypeError, ValueError):
+        data = None
+    if isinstance(data, dict):
+        fields_by_name = {str(key).lower(): value for key, value in data.items()}
+        if isinstance(fields_by_name.get("healthy"), bool):
+            return fields_by_name["healthy"]
+        status = fields_by_name.get("status", "")
+    elif data is not None:
+        status = data
+    status = str(status or "").strip().lower()
+    return not any(word in status for word in _UNHEALTHY_STATUS_WORDS)
+
+
+class PubSubSession:
+    """
+    A PubSub server connection owned by a HexaEightAgent.
+
+    Returned by HexaEightAgent.open_session(). The session binds the server
+    URL, so publish, lock and task calls do not repeat it. It also tracks
+    connection health and per-operation statistics for that server. One agent can
+    hold sessions to several servers. HexaEightAgent.session_for(key) routes a
+    shard key to one of them.
+
+    The session is truthy only while it is connected.
+    """
+
+    # Consecutive failed operations after which the session reports unhealthy
+    UNHEALTHY_AFTER_FAILURES = 3
+
+    def __init__(self, agent: "HexaEightAgent", pubsub_server_url: str, agent_type: str = "child"):
+        self._agent = agent
+        self.pubsub_server_url = pubsub_server_url
+        self.agent_type = agent_type
+        self.connected = False
+        self.connected_at: Optional[datetime] = None
+        self.last_success_at: Optional[datetime] = None
+        self.last_failure_at: Optional[datetime] = None
+        self.last_error: Optional[str] = None
+        self.consecutive_failures = 0
+        self._operation_stats: Dict[str, Dict[str, float]] = {}
+
+    def __bool__(self) -> bool:
+        return self.connected
+
+    def __repr__(self) -> str:
+        state = "healthy" if self.healthy else ("connected" if self.connected else "disconnected")
+        return f"PubSubSession({self.pubsub_server_url!r}, {state})"
+
+    @property
+    def healthy(self) -> bool:
+        """Connected and not failing repeatedly."""
+        return self.connected and self.consecutive_failures < self.UNHEALTHY_AFTER_FAILURES
+
+    def _record(self, operation: str, success: bool, elapsed_ms: float, error: Optional[str] = None):
+        stats = self._operation_stats.get(operation)
+        if stats is None:
+            stats = {"calls": 0, "failures": 0, "total_ms": 0.0}
+            self._operation_stats[operation] = stats
+        stats["calls"] += 1
+        stats["total_ms"] += elapsed_ms
+        if success:
+            self.consecutive_failures = 0
+            self.last_success_at = datetime.utcnow()
+        else:
+            stats["failures"] += 1
+            self.consecutive_failures += 1
+            self.last_failure_at = datetime.utcnow()
+            self.last_error = error or f"{operation} failed"
+
+    def _mark_connected(self, connected: bool, error: Optional[str] = None):
+        self.connected = connected
+        if connected:
+            self.connected_at = datetime.utcnow()
+            self.consecutive_failures = 0
+            self.last_success_at = self.connected_at
+        elif error:
+            self.last_failure_at = datetime.utcnow()
+            self.last_error = error
+
+    async def _invoke(self, operation: str, *args, method: Optional[str] = None):
+        """
+        Call the agent method (operation, or method if given) with this session's URL
+        and record the outcome under operation.
+        """
+        started = time.perf_counter()
+        try:
+            result = await getattr(self._agent, method or operation)(self.pubsub_server_url, *args)
+        except Exception as e:
+            self._record(operation, False, (time.perf_counter() - started) * 1000, str(e))
+            raise
+        if isinstance(result, list) and result and isinstance(result[0], dict):
+            success = all(item.get("success") for item in result)
+        elif isinstance(result, str):
+            success = True  # String results come from methods that raise on failure
+        else:
+            success = bool(result)
+        self._record(operation, success, (time.perf_counter() - started) * 1000)
+        return result
+
+    # Publishing
+    async def publish_to_self(self, message: str) -> bool:
+        return await self._invoke("publish_to_self", message)
+
+    async def publish_to_agent(self, target_agent_name: str, message: str) -> bool:
+        return await self._invoke("publish_to_agent", target_agent_name, message)
+
+    async def publish_to_internal_id(self, target_internal_id: str, message: str) -> bool:
+        return await self._invoke("publish_to_internal_id", target_internal_id, message)
+
+    async def publish_broadcast(self, message: str) -> bool:
+        return await self._invoke("publish_broadcast", message)
+
+    async def publish_many(self, messages: List[Tuple[str, str]], concurrency: int = 32,
+                           target_type: str = "agent_name") -> List[Dict[str, Any]]:
+        return await self._invoke("publish_many", messages, concurrency, target_type)
+
+    # Message locking
+    async def lock_message(self, message_id: str) -> bool:
+        return await self._invoke("lock_message", message_id)
+
+    async def release_lock(self, message_id: str) -> bool:
+        return await self._invoke("release_lock", message_id)
+
+    async def send_lock_heartbeat(self, message_id: str) -> bool:
+        return await self._invoke("send_lock_heartbeat", message_id)
+
+    # Tasks
+    async def publish_task(self, task_message: TaskInfo) -> bool:
+        return await self._invoke("publish_task", task_message)
+
+    async def publish_tasks(self, tasks: List[Union[TaskInfo, Tuple[str, str, List[str]]]],
+                            concurrency: int = 32) -> List[Dict[str, Any]]:
+        return await self._invoke("publish_tasks", tasks, concurrency)
+
+    async def create_and_lock_task(self, title: str, description: str, step_descriptions: List[str]) -> Optional[TaskHandle]:
+        return await self._invoke("create_and_lock_task", title, description, step_descriptions)
+
+    async def update_task_step_completion(self, parent_task_id: str, step_number: int, result: Any) -> bool:
+        return await self._invoke("update_task_step_completion", parent_task_id, step_number, result)
+
+    async def complete_task(self, task_id: str, message_id: str) -> bool:
+        return await self._invoke("complete_task", task_id, message_id)
+
+    # Scheduling
+    async def schedule_message(self, scheduled_for: datetime, target_type: str, target_value: str,
+                               message: str, message_type: str = "message", durable: bool = False) -> bool:
+        return await self._invoke("schedule_message", scheduled_for, target_type, target_value, message,
+                                  message_type, durable)
+
+    async def schedule_many(self, items: List[Union[Dict[str, Any], Tuple]],
+                            concurrency: int = 32) -> List[Dict[str, Any]]:
+        return await self._invoke("schedule_many", items, concurrency)
+
+    # LLM gateway
+    async def send_llm_request(self, llm_request: LLMRequest) -> bool:
+        return await self._invoke("send_llm_request", llm_request)
+
+    async def get_available_providers(self) -> List[str]:
+        return await self._invoke("get_available_providers")
+
+    # Health and stats (raise HexaEightAgentError instead of returning an error string)
+    async def get_server_health(self) -> str:
+        return await self._invoke("get_server_health", method="_fetch_server_health")
+
+    async def get_server_stats(self) -> str:
+        return await self._invoke("get_server_stats", method="_fetch_server_stats")
+
+    async def check_health(self) -> bool:
+        """
+        Query the server health endpoint and update this session's health state.
+
+        A failed request or a payload reporting an unhealthy status counts as a
+        failed operation.
+        """
+        started = time.perf_counter()
+        try:
+            payload = await self._agent._fetch_server_health(self.pubsub_server_url)
+        except Exception as e:
+            self._record("check_health", False, (time.perf_counter() - started) * 1000, str(e))
+            return False
+        ok = _health_payload_ok(payload)
+        self._record("check_health", ok, (time.perf_counter() - started) * 1000,
+                     None if ok else f"Server reported unhealthy: {str(payload)[:200]}")
+        return ok and self.healthy
+
+    def close(self):
+        """
+        Stop routing to this session. The CLR connection is shared by the whole
+        agent; use HexaEightAgent.disconnect_from_pubsub() to disconnect it.
+        """
+        self._agent.close_session(self.pubsub_server_url)
+
+    def statistics(self) -> Dict[str, Any]:
+        """Connection health and per-operation call/failure counts and latency."""
+        operations = {}
+        for operation, stats in self._operation_stats.items():
+            operations[operation] = {
+                "calls": int(stats["calls"]),
+                "failures": int(stats["failures"]),
+                "avg_ms": stats["total_ms"] / stats["calls"] if stats["calls"] else 0.0,
+            }
+        return {
+            "pubsub_server_url": self.pubsub_server_url,
+            "agent_type": self.agent_type,
+            "connected": self.connected,
+            "healthy": self.healthy,
+            "connected_at": self.connected_at,
+            "last_success_at": self.last_success_at,
+            "last_failure_at": self.last_failure_at,
+            "last_error": self.last_error,
+            "consecutive_failures": self.consecutive_failures,
+            "operations": operations,
+        }
+
+
 # ==================================================================================
 # CLEAN HANDOVER AGENT CLASS
 # ==================================================================================
@@ -759,12 +2645,26 @@ class HexaEightEnvironmentManager:
 class HexaEightAgent:
     """Agent with clean message handover - no content pre-processing."""
     
-    def __init__(self, debug_mode: bool = False):
+    def __init__(self, debug_mode: bool = False, event_queue_size: Optional[int] = None,
+                 overflow_policy: Union[OverflowPolicy, str] = OverflowPolicy.DROP_OLDEST,
+                 spill_directory: Optional[str] = None, auto_heartbeat_locks: bool = False,
+                 lock_heartbeat_interval: float = 20.0):
         """
         Initialize HexaEight Agent.
         
         Args:
             debug_mode: If True, enables debug logging. Default is False.
+            event_queue_size: Maximum number of events buffered in memory. None
+                (default) buffers without limit, so no event is ever dropped.
+            overflow_policy: What to do when a bounded buffer is full - "block",
+                "drop_oldest" (default), "drop_newest" or "spill_to_disk".
+                Dropped events are logged as warnings.
+            spill_directory: Directory for the spill file (system temp dir if None).
+            auto_heartbeat_locks: If True, locks taken with lock_message or
+                create_and_lock_task are heartbeated in the background until released.
+                Off by default, so a lock that is never released still expires on the
+                server. locked() and keep_lock_alive() heartbeat regardless.
+            lock_heartbeat_interval: Seconds between heartbeats of a held lock.
         """
         _ensure_agent_available()
         self._clr_agent_config = CSharpAgentConfig()
@@ -772,11 +2672,41 @@ class HexaEightAgent:
         
         self._ensure_environment_loaded()
         
-        # Event handling
-        self._event_queue = asyncio.Queue()
+        # Event handling - CLR callbacks feed a bounded, thread-safe buffer
+        self._event_ingress = _EventIngress(event_queue_size, overflow_policy, spill_directory)
+        self._dropped_events = 0
         self._event_handlers = {}
+        # Called on the CLR thread with each received message before it is queued;
+        # returning True consumes the message
+        self._message_interceptors: List[Callable[[MessageReceivedEvent], bool]] = []
         self._running_event_loop = False
         
+        # PubSub sessions by server URL
+        self._sessions: Dict[str, PubSubSession] = {}
+        
+        # Held locks, heartbeated from one timer wheel
+        self._lock_heartbeats = _LockHeartbeatScheduler(self, lock_heartbeat_interval)
+        self._auto_heartbeat_locks = auto_heartbeat_locks
+        self._release_handler_locks = False
+        self._lock_index = _LockIndex(self)
+        self._internal_identity: Optional[str] = None  # cached; reset when an identity is loaded
+        # CLR TaskMessages built for TaskInfo objects, by id(): (weakref, content key, message)
+        self._clr_task_messages: Dict[int, Tuple[Any, Tuple[str, str, Tuple[str, ...]], Any]] = {}
+        
+        # Messages scheduled through this agent that are still due, by schedule ID
+        self._schedules: Dict[str, ScheduledMessage] = {}
+        self._local_scheduler: Optional[_LocalScheduler] = None
+        
+        self._signing_queue_started = False
+        self._signing_context: Optional[SigningContext] = None
+        # Queued signings holding the signing gate until their result is collected, by request ID
+        self._signing_leases: Dict[str, asyncio.TimerHandle] = {}
+        self._verified_tokens = _VerifiedTokenCache()
+        self._lock_acquired_at: Dict[Tuple[str, str], float] = {}
+        self._releasing_locks: set = set()
+        self._lock_hold_stats = {"released": 0, "lost": 0, "total_seconds": 0.0, "max_seconds": 0.0}
+        self._lock_loop: Optional[asyncio.AbstractEventLoop] = None
+        
         # Setup C# event handlers
         self._setup_csharp_event_handlers()
     
@@ -831,7 +2761,7 @@ class HexaEightAgent:
             for key, value in env_vars_to_set.items():
                 if value:
                     os.environ[key] = value
-                    if DOTNET_AVAILABLE:
+                    if _DOTNET_AVAILABLE:
                         try:
                             Environment.SetEnvironmentVariable(key, value)
                         except Exception:
@@ -859,61 +2789,59 @@ class HexaEightAgent:
         except Exception as e:
             self._log_error(f"Error setting up event handlers: {e}")
     
+    def _enqueue_event(self, event_type: str, event: Any):
+        """Hand an event from a CLR callback thread to the event buffer."""
+        if not self._event_ingress.put(event_type, event):
+            self._dropped_events += 1
+            # Warn on the first drop and then periodically, without flooding the CLR thread
+            if self._dropped_events == 1 or self._dropped_events % 1000 == 0:
+                self._log_warning(f"Event buffer full, dropped {event_type} event "
+                                  f"({self._dropped_events} dropped so far)")
+    
     def _on_message_received_clean(self, sender, e):
         """CLEAN: Pass raw decrypted content to demo handlers."""
         try:
-            self.debug_log("=== CLEAN MESSAGE RECEIVED ===")
-            self.debug_log(f"Message ID: {e.MessageId}")
-            self.debug_log(f"Sender: {e.Sender}")
-            self.debug_log(f"Is Task Message: {e.IsTaskMessage}")
-            self.debug_log(f"Is From Self: {e.IsFromSelf}")
-            self.debug_log(f"Raw Content: {e.DecryptedContent[:200]}...")
+            if self.debug_mode:
+                self.debug_log("=== CLEAN MESSAGE RECEIVED ===")
+                self.debug_log(f"Message ID: {e.MessageId}")
+                self.debug_log(f"Sender: {e.Sender}")
+                self.debug_log(f"Is Task Message: {e.IsTaskMessage}")
+                self.debug_log(f"Is From Self: {e.IsFromSelf}")
+                self.debug_log(f"Raw Content: {(e.DecryptedContent or '')[:200]}...")
             
-            event = MessageReceivedEvent(
-                topic=e.Topic or "",
-                sender=e.Sender or "",
-                sender_internal_id=e.SenderInternalId or "",
-                decrypted_content=e.DecryptedContent or "",  # RAW content - no processing
-                timestamp=e.Timestamp.ToDateTime() if hasattr(e.Timestamp, 'ToDateTime') else datetime.utcnow(),
-                message_id=e.MessageId or "",
-                is_task_message=e.IsTaskMessage,
-                is_from_self=e.IsFromSelf,
-                is_schedule_notification=e.IsScheduleNotification,
-                is_lock_expired=e.IsLockExpired
-            )
+            # RAW content - fields are marshalled from the CLR only when read
+            event = _LazyMessageReceivedEvent(e)
+            
+            # Interceptors (e.g. LLMClient response correlation) may consume the message
+            if self._message_interceptors and self._intercept_message(event):
+                return
             
             # Queue event for demo handlers
-            try:
-                self._event_queue.put_nowait(('message_received', event))
-            except:
-                self.debug_log("Event queue full, skipping message event")
+            self._enqueue_event('message_received', event)
                 
         except Exception as ex:
             self.debug_log(f"Error in clean message handler: {ex}")
             self._log_error(f"Error in clean message handler: {ex}")
     
+    def _intercept_message(self, event: MessageReceivedEvent) -> bool:
+        """Offer a received message to the interceptors; True if one consumed it."""
+        for interceptor in list(self._message_interceptors):
+            try:
+                if interceptor(event):
+                    return True
+            except Exception as ex:
+                self._log_error(f"Error in message interceptor: {ex}")
+        return False
+    
     def _on_task_received_clean(self, sender, e):
         """CLEAN: Pass task data to demo handlers."""
         try:
-            self.debug_log("=== CLEAN TASK RECEIVED ===")
-            self.debug_log(f"Task ID: {e.TaskId}")
-            self.debug_log(f"Title: {e.Title}")
-            
-            event = TaskReceivedEvent(
-                task_id=e.TaskId or "",
-                title=e.Title or "",
-                description=e.Description or "",
-                total_steps=e.TotalSteps,
-                status=e.Status or "",
-                created_by=e.CreatedBy or "",
-                created_at=e.CreatedAt.ToDateTime() if hasattr(e.CreatedAt, 'ToDateTime') else datetime.utcnow(),
-                message_id=e.MessageId or ""
-            )
+            if self.debug_mode:
+                self.debug_log("=== CLEAN TASK RECEIVED ===")
+                self.debug_log(f"Task ID: {e.TaskId}")
+                self.debug_log(f"Title: {e.Title}")
             
-            try:
-                self._event_queue.put_nowait(('task_received', event))
-            except:
-                self.debug_log("Event queue full, skipping task event")
+            self._enqueue_event('task_received', _LazyTaskReceivedEvent(e))
                 
         except Exception as ex:
             self.debug_log(f"Error in clean task handler: {ex}")
@@ -922,9 +2850,10 @@ class HexaEightAgent:
     def _on_task_step_received_clean(self, sender, e):
         """CLEAN: Pass task step data to demo handlers."""
         try:
-            self.debug_log("=== CLEAN TASK STEP RECEIVED ===")
-            self.debug_log(f"Parent Task ID: {e.ParentTaskId}")
-            self.debug_log(f"Step Number: {e.StepNumber}")
+            if self.debug_mode:
+                self.debug_log("=== CLEAN TASK STEP RECEIVED ===")
+                self.debug_log(f"Parent Task ID: {e.ParentTaskId}")
+                self.debug_log(f"Step Number: {e.StepNumber}")
 
             if hasattr(self, '_agent_type') and self._agent_type == "parent":
                 self.debug_log("Note: Parent agents should not process task steps - only monitor and coordinate")
@@ -933,19 +2862,7 @@ class HexaEightAgent:
                 print(f"   This ensures separation of duties and prevents self-completion fraud")
                 return  # Don't pass the event to demo handlers
             
-            event = TaskStepEvent(
-                parent_task_id=e.ParentTaskId or "",
-                step_number=e.StepNumber,
-                description=e.Description or "",
-                status=e.Status or "",
-                message_id=e.MessageId or "",
-                sender=""
-            )
-            
-            try:
-                self._event_queue.put_nowait(('task_step_received', event))
-            except:
-                self.debug_log("Event queue full, skipping task step event")
+            self._enqueue_event('task_step_received', _LazyTaskStepEvent(e))
                 
         except Exception as ex:
             self.debug_log(f"Error in clean task step handler: {ex}")
@@ -954,23 +2871,12 @@ class HexaEightAgent:
     def _on_task_step_updated_clean(self, sender, e):
         """CLEAN: Pass task step update data to demo handlers."""
         try:
-            self.debug_log("=== CLEAN TASK STEP UPDATED ===")
-            self.debug_log(f"Parent Task ID: {e.ParentTaskId}")
-            self.debug_log(f"Step Number: {e.StepNumber}")
-            
-            event = TaskStepUpdateEvent(
-                parent_task_id=e.ParentTaskId or "",
-                step_number=e.StepNumber,
-                status=e.Status or "",
-                completed_by=e.CompletedBy or "",
-                completed_at=e.CompletedAt.ToDateTime() if hasattr(e.CompletedAt, 'ToDateTime') else datetime.utcnow(),
-                result=e.Result
-            )
+            if self.debug_mode:
+                self.debug_log("=== CLEAN TASK STEP UPDATED ===")
+                self.debug_log(f"Parent Task ID: {e.ParentTaskId}")
+                self.debug_log(f"Step Number: {e.StepNumber}")
             
-            try:
-                self._event_queue.put_nowait(('task_step_updated', event))
-            except:
-                self.debug_log("Event queue full, skipping task step update event")
+            self._enqueue_event('task_step_updated', _LazyTaskStepUpdateEvent(e))
                 
         except Exception as ex:
             self.debug_log(f"Error in clean task step update handler: {ex}")
@@ -979,19 +2885,11 @@ class HexaEightAgent:
     def _on_task_completed_clean(self, sender, e):
         """CLEAN: Pass task completion data to demo handlers."""
         try:
-            self.debug_log("=== CLEAN TASK COMPLETED ===")
-            self.debug_log(f"Task ID: {e.TaskId}")
+            if self.debug_mode:
+                self.debug_log("=== CLEAN TASK COMPLETED ===")
+                self.debug_log(f"Task ID: {e.TaskId}")
             
-            event = TaskCompleteEvent(
-                task_id=e.TaskId or "",
-                completed_by=e.CompletedBy or "",
-                completed_at=e.CompletedAt.ToDateTime() if hasattr(e.CompletedAt, 'ToDateTime') else datetime.utcnow()
-            )
-            
-            try:
-                self._event_queue.put_nowait(('task_completed', event))
-            except:
-                self.debug_log("Event queue full, skipping task completed event")
+            self._enqueue_event('task_completed', _LazyTaskCompleteEvent(e))
                 
         except Exception as ex:
             self.debug_log(f"Error in clean task completed handler: {ex}")
@@ -1000,23 +2898,20 @@ class HexaEightAgent:
     def _on_lock_expired_clean(self, sender, e):
         """CLEAN: Pass lock expiration data to demo handlers."""
         try:
-            self.debug_log("=== CLEAN LOCK EXPIRED ===")
-            self.debug_log(f"Message ID: {e.MessageId}")
-            
-            event = MessageReceivedEvent(
-                topic="",
-                sender="SYSTEM",
-                sender_internal_id="",
-                decrypted_content="",
-                timestamp=e.Timestamp.ToDateTime() if hasattr(e.Timestamp, 'ToDateTime') else datetime.utcnow(),
-                message_id=e.MessageId or "",
-                is_lock_expired=True
-            )
+            if self.debug_mode:
+                self.debug_log("=== CLEAN LOCK EXPIRED ===")
+                self.debug_log(f"Message ID: {e.MessageId}")
             
-            try:
-                self._event_queue.put_nowait(('lock_expired', event))
-            except:
-                self.debug_log("Event queue full, skipping lock expired event")
+            message_id = e.MessageId or ""
+            self._lock_index.expired(message_id)
+            # Hold and heartbeat bookkeeping belongs to the event loop; this runs on a CLR thread
+            loop = self._lock_loop
+            if loop is not None and not loop.is_closed():
+                try:
+                    loop.call_soon_threadsafe(self._on_lock_expired, message_id)
+                except RuntimeError:
+                    pass  # Loop closed meanwhile
+            self._enqueue_event('lock_expired', _LazyLockExpiredEvent(e))
                 
         except Exception as ex:
             self.debug_log(f"Error in clean lock expired handler: {ex}")
@@ -1025,31 +2920,13 @@ class HexaEightAgent:
     def _on_scheduled_task_creation_clean(self, sender, e):
         """CLEAN: Pass scheduled task creation data to demo handlers."""
         try:
-            self.debug_log("=== CLEAN SCHEDULED TASK CREATION ===")
-            self.debug_log(f"Task ID: {e.TaskId}")
-            self.debug_log(f"Title: {e.Title}")
-            self.debug_log(f"Scheduled By: {e.ScheduledBy}")
+            if self.debug_mode:
+                self.debug_log("=== CLEAN SCHEDULED TASK CREATION ===")
+                self.debug_log(f"Task ID: {e.TaskId}")
+                self.debug_log(f"Title: {e.Title}")
+                self.debug_log(f"Scheduled By: {e.ScheduledBy}")
             
-            # Convert C# List<string> to Python list
-            steps = []
-            if hasattr(e, 'Steps') and e.Steps:
-                for step in e.Steps:
-                    steps.append(str(step))
-            
-            event = ScheduledTaskCreationEvent(
-                task_id=e.TaskId or "",
-                title=e.Title or "",
-                description=e.Description or "",
-                steps=steps,
-                scheduled_by=e.ScheduledBy or "",
-                scheduled_by_internal_id=e.ScheduledByInternalId or "",
-                original_schedule_time=e.OriginalScheduleTime.ToDateTime() if hasattr(e.OriginalScheduleTime, 'ToDateTime') else datetime.utcnow()
-            )
-            
-            try:
-                self._event_queue.put_nowait(('scheduled_task_creation', event))
-            except:
-                self.debug_log("Event queue full, skipping scheduled task creation event")
+            self._enqueue_event('scheduled_task_creation', _LazyScheduledTaskCreationEvent(e))
                 
         except Exception as ex:
             self.debug_log(f"Error in clean scheduled task creation handler: {ex}")
@@ -1096,6 +2973,7 @@ class HexaEightAgent:
         self.debug_log(f"Loading AI parent agent from file: {filename}")
         self._ensure_environment_loaded()
         result = self._clr_agent_config.LoadAIParentAgent(filename, loadenv, client_id, token_server_url, logging)
+        self._internal_identity = None
         if result:
             self._log_success(f"AI parent agent loaded from {filename}")
         else:
@@ -1109,6 +2987,7 @@ class HexaEightAgent:
         self.debug_log(f"Creating AI child agent with file: {filename}")
         self._ensure_environment_loaded()
         result = self._clr_agent_config.CreateAIChildAgent(agent_complex_password, filename, loadenv, client_id, token_server_url, logging)
+        self._internal_identity = None
         if result:
             self._log_success(f"AI child agent created and saved to {filename}")
         else:
@@ -1122,6 +3001,7 @@ class HexaEightAgent:
         self.debug_log(f"Loading AI child agent from file: {filename}")
         self._ensure_environment_loaded()
         result = self._clr_agent_config.LoadAIChildAgent(agent_password, filename, loadenv, client_id, token_server_url, logging)
+        self._internal_identity = None
         if result:
             self._log_success(f"AI child agent loaded from {filename}")
         else:
@@ -1132,10 +3012,7 @@ class HexaEightAgent:
         """Get agent name asynchronously."""
         try:
             task = self._clr_agent_config.GetAgentname()
-            if hasattr(task, 'IsCompleted') and task.IsCompleted:
-                result = task.Result or ""
-            else:
-                result = await asyncio.get_event_loop().run_in_executor(None, lambda: task.Result)
+            result = await _await_clr_task(task) or ""
             
             self.debug_log(f"Agent name: {result}")
             return result
@@ -1146,16 +3023,44 @@ class HexaEightAgent:
     def get_internal_identity(self) -> str:
         """Get agent's internal identity."""
         identity = self._clr_agent_config.GetInternalIdentity() or ""
+        self._internal_identity = identity
         self.debug_log(f"Internal identity: {identity[:8]}...")
         return identity
     
+    def _cached_internal_identity(self) -> str:
+        """The internal identity, fetched from the CLR once per loaded identity."""
+        if self._internal_identity is None:
+            try:
+                self._internal_identity = self._clr_agent_config.GetInternalIdentity() or ""
+            except Exception:
+                return ""
+        return self._internal_identity
+    
     # ==================================================================================
     # PUBSUB METHODS (unchanged)
     # ==================================================================================
     
     async def connect_to_pubsub(self, pubsub_server_url: str, agent_type: str = "child", max_attempts: int = 5) -> bool:
         """Connect to PubSub server asynchronously with retry logic."""
+        return (await self.open_session(pubsub_server_url, agent_type, max_attempts)).connected
+    
+    async def open_session(self, pubsub_server_url: str, agent_type: str = "child",
+                           max_attempts: int = 5) -> PubSubSession:
+        """
+        Connect to a PubSub server (with the same retries as connect_to_pubsub) and
+        return its PubSubSession.
+        
+        Returns:
+            The session for this server; check session.connected (or its truth
+            value) to see whether the connection succeeded.
+        """
+        session = self._sessions.get(pubsub_server_url)
+        if session is None:
+            session = PubSubSession(self, pubsub_server_url, agent_type)
+            self._sessions[pubsub_server_url] = session
+        session.agent_type = agent_type
 
+        last_error = None
         for attempt in range(max_attempts):
             try:
                 if attempt > 0:
@@ -1164,15 +3069,18 @@ class HexaEightAgent:
                     self.debug_log(f"🔄 Connecting to PubSub server: {pubsub_server_url}")
 
                 task = self._clr_agent_config.ConnectToPubSubAsync(pubsub_server_url, agent_type)
-                result = await asyncio.get_event_loop().run_in_executor(None, lambda: task.Result)
+                result = await _await_clr_task(task)
 
                 if result:
                     self._log_success(f"✅ Connected to PubSub server: {pubsub_server_url}")
-                    return True
+                    session._mark_connected(True)
+                    return session
                 else:
+                    last_error = f"Connection attempt {attempt + 1} failed"
                     self._log_error(f"❌ Connection attempt {attempt + 1} failed")
 
             except Exception as e:
+                last_error = str(e)
                 self._log_error(f"❌ Connection attempt {attempt + 1} error: {e}")
 
             # Don't sleep after the last attempt
@@ -1182,7 +3090,47 @@ class HexaEightAgent:
                 await asyncio.sleep(delay)
 
         self._log_error(f"❌ Failed to connect to PubSub server after {max_attempts} attempts")
-        return False
+        session._mark_connected(False, last_error)
+        return session
+
+    def get_session(self, pubsub_server_url: str) -> Optional[PubSubSession]:
+        """Get the session for a PubSub server URL, if one was opened (or connected) for it."""
+        return self._sessions.get(pubsub_server_url)
+    
+    def close_session(self, pubsub_server_url: str) -> bool:
+        """
+        Stop routing to a server's session and forget it. The CLR connection is shared
+        by the whole agent and stays open. Returns False if there was no session.
+        """
+        session = self._sessions.pop(pubsub_server_url, None)
+        if session is None:
+            return False
+        session._mark_connected(False)
+        return True
+
+    @property
+    def sessions(self) -> List[PubSubSession]:
+        """All PubSub sessions of this agent."""
+        return list(self._sessions.values())
+
+    def session_for(self, shard_key: str) -> PubSubSession:
+        """
+        Route a shard key (task ID, tenant, agent name...) to one of the connected sessions.
+        
+        Uses rendezvous hashing, so a key keeps its server as long as that server
+        stays connected. Only keys of a server that goes away are moved. Healthy
+        sessions are preferred.
+        """
+        candidates = [session for session in self._sessions.values() if session.healthy]
+        if not candidates:
+            candidates = [session for session in self._sessions.values() if session.connected]
+        if not candidates:
+            raise HexaEightAgentError("No connected PubSub sessions to route to")
+
+        def _weight(session: PubSubSession) -> bytes:
+            return hashlib.sha1(f"{session.pubsub_server_url}\0{shard_key}".encode('utf-8')).digest()
+
+        return max(candidates, key=_weight)
 
 
     async def connect_to_pubsub2(self, pubsub_server_url: str, agent_type: str = "child") -> bool:
@@ -1190,7 +3138,7 @@ class HexaEightAgent:
         try:
             self.debug_log(f"Connecting to PubSub server: {pubsub_server_url}")
             task = self._clr_agent_config.ConnectToPubSubAsync(pubsub_server_url, agent_type)
-            result = await asyncio.get_event_loop().run_in_executor(None, lambda: task.Result)
+            result = await _await_clr_task(task)
             
             if result:
                 self._log_success(f"Connected to PubSub server: {pubsub_server_url}")
@@ -1212,6 +3160,9 @@ class HexaEightAgent:
         """Disconnect from PubSub server."""
         self.debug_log("Disconnecting from PubSub server")
         self._clr_agent_config.DisconnectFromPubSub()
+        for session in self._sessions.values():
+            session._mark_connected(False)
+        self._forget_all_locks()
         self._log_info("Disconnected from PubSub server")
     
     async def publish_to_self(self, pubsub_server_url: str, message: str) -> bool:
@@ -1219,7 +3170,7 @@ class HexaEightAgent:
         try:
             self.debug_log(f"Publishing to self: {message[:50]}...")
             task = self._clr_agent_config.PublishToSelfAsync(pubsub_server_url, message)
-            result = await asyncio.get_event_loop().run_in_executor(None, lambda: task.Result)
+            result = await _await_clr_task(task)
             
             if result:
                 self.debug_log("Message published to self successfully")
@@ -1236,7 +3187,7 @@ class HexaEightAgent:
         try:
             self.debug_log(f"Publishing to agent {target_agent_name}: {message[:50]}...")
             task = self._clr_agent_config.PublishToAgentAsync(pubsub_server_url, target_agent_name, message)
-            result = await asyncio.get_event_loop().run_in_executor(None, lambda: task.Result)
+            result = await _await_clr_task(task)
             
             if result:
                 self.debug_log(f"Message published to {target_agent_name} successfully")
@@ -1253,7 +3204,7 @@ class HexaEightAgent:
         try:
             self.debug_log(f"Publishing to internal ID {target_internal_id[:8]}...: {message[:50]}...")
             task = self._clr_agent_config.PublishToInternalIdAsync(pubsub_server_url, target_internal_id, message)
-            result = await asyncio.get_event_loop().run_in_executor(None, lambda: task.Result)
+            result = await _await_clr_task(task)
             
             if result:
                 self.debug_log("Message published to internal ID successfully")
@@ -1270,7 +3221,7 @@ class HexaEightAgent:
         try:
             self.debug_log(f"Broadcasting message: {message[:50]}...")
             task = self._clr_agent_config.PublishBroadcastAsync(pubsub_server_url, message)
-            result = await asyncio.get_event_loop().run_in_executor(None, lambda: task.Result)
+            result = await _await_clr_task(task)
             
             if result:
                 self.debug_log("Broadcast message sent successfully")
@@ -1282,6 +3233,55 @@ class HexaEightAgent:
             self._log_error(f"Error broadcasting: {e}")
             return False
     
+    async def publish_many(self, pubsub_server_url: str, messages: List[Tuple[str, str]],
+                           concurrency: int = 32, target_type: str = "agent_name") -> List[Dict[str, Any]]:
+        """
+        Publish many messages, pipelining the requests with a cap on how many are in flight.
+        
+        Fan-out latency is bounded by the slowest target rather than the sum of all targets.
+        
+        Args:
+            pubsub_server_url: PubSub server URL
+            messages: (target, message) pairs
+            concurrency: Maximum number of publish requests in flight
+            target_type: "agent_name" (targets are agent names) or "internal_id"
+        
+        Returns:
+            One dict per pair, in input order, with target, success, error and elapsed_ms
+        """
+        if target_type == "agent_name":
+            publish = self._clr_agent_config.PublishToAgentAsync
+        elif target_type == "internal_id":
+            publish = self._clr_agent_config.PublishToInternalIdAsync
+        else:
+            raise ValueError(f"Unsupported target_type for publish_many: {target_type}")
+        
+        self.debug_log(f"Publishing {len(messages)} messages (concurrency {concurrency})")
+        
+        async def _publish_one(item: Tuple[str, str]) -> Dict[str, Any]:
+            target, message = item
+            started = time.perf_counter()
+            try:
+                success = bool(await _await_clr_task(publish(pubsub_server_url, target, message)))
+                error = None if success else "Publish was not accepted"
+            except Exception as e:
+                success, error = False, str(e)
+            return {
+                "target": target,
+                "success": success,
+                "error": error,
+                "elapsed_ms": (time.perf_counter() - started) * 1000
+            }
+        
+        results = await _map_bounded(_publish_one, list(messages), concurrency)
+        
+        failed = sum(1 for result in results if not result["success"])
+        if failed:
+            self._log_warning(f"publish_many: {failed}/{len(results)} messages failed")
+        else:
+            self.debug_log(f"All {len(results)} messages published successfully")
+        return results
+    
     # ==================================================================================
     # MESSAGE LOCKING METHODS (unchanged)
     # ==================================================================================
@@ -1291,10 +3291,11 @@ class HexaEightAgent:
         try:
             self.debug_log(f"Locking message: {message_id}")
             task = self._clr_agent_config.LockMessageAsync(pubsub_server_url, message_id)
-            result = await asyncio.get_event_loop().run_in_executor(None, lambda: task.Result)
+            result = await _await_clr_task(task)
             
             if result:
                 self.debug_log(f"Message {message_id} locked successfully")
+                self._on_lock_acquired(pubsub_server_url, message_id)
             else:
                 self.debug_log(f"Failed to lock message {message_id}")
             
@@ -1304,14 +3305,17 @@ class HexaEightAgent:
             return False
     
     async def release_lock(self, pubsub_server_url: str, message_id: str) -> bool:
-        """Release a message lock."""
+        """Release a message lock. A lock that fails to release stays tracked (and heartbeated)."""
+        key = (pubsub_server_url, message_id)
+        self._releasing_locks.add(key)
         try:
             self.debug_log(f"Releasing lock for message: {message_id}")
             task = self._clr_agent_config.ReleaseLockAsync(pubsub_server_url, message_id)
-            result = await asyncio.get_event_loop().run_in_executor(None, lambda: task.Result)
+            result = await _await_clr_task(task)
             
             if result:
                 self.debug_log(f"Lock released for message {message_id}")
+                self._on_lock_released(pubsub_server_url, message_id)
             else:
                 self.debug_log(f"Failed to release lock for message {message_id}")
             
@@ -1319,15 +3323,19 @@ class HexaEightAgent:
         except Exception as e:
             self._log_error(f"Error releasing lock: {e}")
             return False
+        finally:
+            self._releasing_locks.discard(key)
     
     async def send_lock_heartbeat(self, pubsub_server_url: str, message_id: str) -> bool:
         """Send heartbeat to maintain message lock."""
         try:
             self.debug_log(f"Sending heartbeat for message: {message_id}")
             task = self._clr_agent_config.SendLockHeartbeatAsync(pubsub_server_url, message_id)
-            result = await asyncio.get_event_loop().run_in_executor(None, lambda: task.Result)
+            result = await _await_clr_task(task)
             
-            if not result:
+            if result:
+                self._lock_index.renewed(pubsub_server_url, message_id)
+            else:
                 self.debug_log(f"Failed to send heartbeat for message {message_id}")
             
             return result
@@ -1336,7 +3344,12 @@ class HexaEightAgent:
             return False
     
     def get_active_locks(self) -> List[MessageLock]:
-        """Get list of active message locks."""
+        """
+        Get list of active message locks from the CLR and reconcile the local lock index.
+        
+        For frequent checks prefer is_locked() and get_locks_by_expiry(), which read
+        the local index without crossing into the CLR.
+        """
         try:
             csharp_locks = self._clr_agent_config.GetActiveLocks()
             locks = []
@@ -1349,12 +3362,166 @@ class HexaEightAgent:
                     expires_at=lock.ExpiresAt.ToDateTime() if hasattr(lock.ExpiresAt, 'ToDateTime') else datetime.utcnow()
                 ))
             
+            self._lock_index.reconcile(locks)
             self.debug_log(f"Active locks: {len(locks)}")
             return locks
         except Exception as e:
             self._log_error(f"Error getting active locks: {e}")
             return []
     
+    def is_locked(self, message_id: str, pubsub_server_url: Optional[str] = None) -> bool:
+        """
+        Whether this agent holds an unexpired lock on message_id (local index, no CLR call),
+        on pubsub_server_url or, if it is None, on any server.
+        """
+        return self._lock_index.is_locked(message_id, pubsub_server_url)
+    
+    def get_locked_message_ids(self) -> set:
+        """IDs of all messages this agent holds an unexpired lock on (local index, no CLR call)."""
+        return self._lock_index.message_ids()
+    
+    def get_locks_by_expiry(self) -> List[MessageLock]:
+        """Locks in the local index, soonest expiry first."""
+        return self._lock_index.by_expiry()
+    
+    def register_lock_listener(self, callback: Callable[[str, MessageLock], Any]):
+        """
+        Register callback(change, lock) for lock index changes.
+        
+        change is "acquired", "renewed", "released" or "expired". Expirations are
+        reported from the CLR callback thread, so callbacks must be thread-safe.
+        """
+        self._lock_index.add_listener(callback)
+    
+    def unregister_lock_listener(self, callback: Callable[[str, MessageLock], Any]):
+        """Unregister a lock listener."""
+        self._lock_index.remove_listener(callback)
+    
+    def _on_lock_acquired(self, pubsub_server_url: str, message_id: str):
+        """Start heartbeating a newly held lock and tie it to the running handler, if any."""
+        self._lock_loop = asyncio.get_running_loop()
+        self._lock_acquired_at.setdefault((pubsub_server_url, message_id), time.monotonic())
+        self._lock_index.acquired(
+            pubsub_server_url, message_id, locked_by_internal_id=self._cached_internal_identity()
+        )
+        if self._auto_heartbeat_locks:
+            self._lock_heartbeats.track(pubsub_server_url, message_id)
+        scope = _HANDLER_LOCK_SCOPE.get()
+        if scope is not None:
+            scope.add((pubsub_server_url, message_id))
+    
+    def _on_lock_released(self, pubsub_server_url: str, message_id: str):
+        """Stop heartbeating a lock that is being released and record how long it was held."""
+        acquired_at = self._lock_acquired_at.pop((pubsub_server_url, message_id), None)
+        if acquired_at is not None:
+            held = time.monotonic() - acquired_at
+            self._lock_hold_stats["released"] += 1
+            self._lock_hold_stats["total_seconds"] += held
+            self._lock_hold_stats["max_seconds"] = max(self._lock_hold_stats["max_seconds"], held)
+        self._lock_heartbeats.untrack(pubsub_server_url, message_id)
+        self._lock_index.released(pubsub_server_url, message_id)
+        scope = _HANDLER_LOCK_SCOPE.get()
+        if scope is not None:
+            scope.discard((pubsub_server_url, message_id))
+    
+    def _on_lock_lost(self, pubsub_server_url: str, message_id: str) -> bool:
+        """
+        Forget a lock that ended without release_lock (its heartbeat was rejected).
+        Returns False if a release of the lock was in flight, i.e. the loss is expected.
+        """
+        self._forget_lock_hold((pubsub_server_url, message_id))
+        self._lock_heartbeats.untrack(pubsub_server_url, message_id)
+        self._lock_index.released(pubsub_server_url, message_id, change="expired")
+        return (pubsub_server_url, message_id) not in self._releasing_locks
+    
+    def _forget_lock_hold(self, key: Tuple[str, str]):
+        """Drop the hold timestamp of a lock that ended without release_lock."""
+        if self._lock_acquired_at.pop(key, None) is not None:
+            self._lock_hold_stats["lost"] += 1
+    
+    def _on_lock_expired(self, message_id: str):
+        """Forget an expired lock on whichever server held it. Runs on the event loop."""
+        for key in self._held_lock_keys():
+            if key[1] == message_id:
+                self._forget_lock_hold(key)
+                self._lock_heartbeats.untrack(*key)
+    
+    def _forget_all_locks(self):
+        """Drop every local record of held locks (the connection that held them is gone)."""
+        for key in list(self._lock_acquired_at):
+            self._forget_lock_hold(key)
+        self._lock_heartbeats.close()
+        self._lock_index.reconcile([])
+    
+    def keep_lock_alive(self, pubsub_server_url: str, message_id: str):
+        """Heartbeat a lock in the background until it is released (for locks taken elsewhere)."""
+        self._lock_heartbeats.track(pubsub_server_url, message_id)
+    
+    def get_held_locks(self) -> List[Tuple[str, str]]:
+        """(pubsub_server_url, message_id) of every lock this agent is heartbeating."""
+        return self._lock_heartbeats.held_locks()
+    
+    def get_lock_heartbeat_statistics(self) -> Dict[str, Any]:
+        """Get heartbeat rounds, heartbeats sent and failed, and the number of held locks."""
+        return self._lock_heartbeats.statistics()
+    
+    @contextlib.asynccontextmanager
+    async def locked(self, pubsub_server_url: str, message_id: str) -> AsyncGenerator[MessageLockScope, None]:
+        """
+        Hold a message lock for the duration of an async with block.
+        
+        The lock is heartbeated in the background while held and released when the
+        block exits - normally, on error or on cancellation - unless detach() was
+        called on the yielded scope (see MessageLockScope.detach for heartbeats).
+        
+        Usage:
+            async with agent.locked(url, message_id) as lock:
+                await process(message_id)
+        
+        Raises:
+            HexaEightAgentError: If the lock could not be acquired.
+        """
+        if not await self.lock_message(pubsub_server_url, message_id):
+            raise HexaEightAgentError(f"Could not lock message {message_id}")
+        scope = MessageLockScope(pubsub_server_url, message_id)
+        self._lock_heartbeats.track(pubsub_server_url, message_id)
+        try:
+            yield scope
+        finally:
+            if not scope.detached:
+                # Shielded so a cancelled caller still releases the lock
+                await asyncio.shield(self.release_lock(pubsub_server_url, message_id))
+            elif not scope.keep_alive:
+                self._lock_heartbeats.untrack(pubsub_server_url, message_id)
+    
+    def get_lock_hold_statistics(self) -> Dict[str, Any]:
+        """
+        Get how long locks were held: released count, mean/max/total seconds, locks still
+        held, and locks lost without a release (expired, heartbeat rejected, disconnected).
+        """
+        now = time.monotonic()
+        released = self._lock_hold_stats["released"]
+        held_ages = [now - acquired_at for acquired_at in self._lock_acquired_at.values()]
+        return {
+            "released": released,
+            "lost": self._lock_hold_stats["lost"],
+            "total_seconds": self._lock_hold_stats["total_seconds"],
+            "mean_seconds": self._lock_hold_stats["total_seconds"] / released if released else 0.0,
+            "max_seconds": self._lock_hold_stats["max_seconds"],
+            "currently_held": len(held_ages),
+            "oldest_held_seconds": max(held_ages, default=0.0),
+        }
+    
+    def _held_lock_keys(self) -> List[Tuple[str, str]]:
+        """(url, message_id) of locks acquired through this agent or heartbeated by it."""
+        return list(dict.fromkeys(list(self._lock_acquired_at) + self._lock_heartbeats.held_locks()))
+    
+    async def release_all_locks(self) -> int:
+        """Release every lock this agent acquired or is heartbeating. Returns the number released."""
+        held = self._held_lock_keys()
+        results = await asyncio.gather(*(self.release_lock(url, message_id) for url, message_id in held))
+        return sum(1 for result in results if result)
+    
     # ==================================================================================
     # TASK MANAGEMENT METHODS (unchanged)
     # ==================================================================================
@@ -1362,45 +3529,65 @@ class HexaEightAgent:
     def create_task_message(self, title: str, description: str, step_descriptions: List[str]) -> TaskInfo:
         """Create a task message."""
         try:
-            self.debug_log(f"Creating task message: {title}")
-            csharp_list = CSharpList[str]()
-            for step in step_descriptions:
-                csharp_list.Add(step)
-            
-            task_msg = self._clr_agent_config.CreateTaskMessage(title, description, csharp_list)
-            
-            steps = []
-            for i, desc in enumerate(step_descriptions):
-                steps.append(TaskStep(
-                    step_number=i + 1,
-                    description=desc
-                ))
-            
-            return TaskInfo(
-                task_id=task_msg.TaskId or "",
-                title=task_msg.Title or "",
-                description=task_msg.Description or "",
-                steps=steps,
-                created_by=task_msg.CreatedBy or "",
-                created_by_internal_id=task_msg.CreatedByInternalId or ""
-            )
+            return self._build_task_message(title, description, step_descriptions)
         except Exception as e:
             self._log_error(f"Error creating task message: {e}")
             return TaskInfo(task_id="", title="", description="")
     
+    def _build_task_message(self, title: str, description: str, step_descriptions: List[str]) -> TaskInfo:
+        """create_task_message without the error handling."""
+        self.debug_log(f"Creating task message: {title}")
+        task_msg = self._clr_agent_config.CreateTaskMessage(
+            title, description, _to_clr_string_list(step_descriptions)
+        )
+        
+        steps = []
+        for i, desc in enumerate(step_descriptions):
+            steps.append(TaskStep(
+                step_number=i + 1,
+                description=desc
+            ))
+        
+        task_info = TaskInfo(
+            task_id=task_msg.TaskId or "",
+            title=task_msg.Title or "",
+            description=task_msg.Description or "",
+            steps=steps,
+            created_by=task_msg.CreatedBy or "",
+            created_by_internal_id=task_msg.CreatedByInternalId or ""
+        )
+        self._remember_clr_task(task_info, (title, description, tuple(step_descriptions)), task_msg)
+        return task_info
+    
+    def _remember_clr_task(self, task_info: TaskInfo, content_key: Tuple[str, str, Tuple[str, ...]], task_msg):
+        """Keep task_msg for reuse by publish_task until task_info is garbage collected."""
+        key = id(task_info)
+        entries = self._clr_task_messages
+        ref = weakref.ref(task_info, lambda _, key=key: entries.pop(key, None))
+        entries[key] = (ref, content_key, task_msg)
+    
+    def _clr_task_for(self, task_message: TaskInfo):
+        """The CLR TaskMessage for task_message, reusing the one create_task_message built."""
+        if not task_message.task_id and not task_message.title:
+            raise HexaEightAgentError("Task message was not created")
+        content_key = task_message._content_key()
+        cached = self._clr_task_messages.get(id(task_message))
+        if cached is not None and cached[0]() is task_message and cached[1] == content_key:
+            return cached[2]
+        # Built by hand or edited since creation: convert it now
+        title, description, steps = content_key
+        csharp_task = self._clr_agent_config.CreateTaskMessage(title, description, _to_clr_string_list(steps))
+        self._remember_clr_task(task_message, content_key, csharp_task)
+        return csharp_task
+    
     async def publish_task(self, pubsub_server_url: str, task_message: TaskInfo) -> bool:
         """Publish a task message."""
         try:
             self.debug_log(f"Publishing task: {task_message.title}")
-            # Convert Python TaskInfo to C# TaskMessage
-            csharp_task = self._clr_agent_config.CreateTaskMessage(
-                task_message.title, 
-                task_message.description, 
-                CSharpList[str]([step.description for step in task_message.steps])
-            )
+            csharp_task = self._clr_task_for(task_message)
             
             task = self._clr_agent_config.PublishTaskAsync(pubsub_server_url, csharp_task)
-            result = await asyncio.get_event_loop().run_in_executor(None, lambda: task.Result)
+            result = await _await_clr_task(task)
             
             if result:
                 self.debug_log(f"Task {task_message.title} published successfully")
@@ -1412,47 +3599,84 @@ class HexaEightAgent:
             self._log_error(f"Error publishing task: {e}")
             return False
     
+    async def publish_tasks(self, pubsub_server_url: str,
+                            tasks: List[Union[TaskInfo, Tuple[str, str, List[str]]]],
+                            concurrency: int = 32) -> List[Dict[str, Any]]:
+        """
+        Create and publish many tasks with bounded concurrency.
+        
+        Args:
+            pubsub_server_url: PubSub server URL
+            tasks: TaskInfo objects, or (title, description, step_descriptions) tuples
+            concurrency: Maximum number of publish requests in flight
+        
+        Returns:
+            One dict per task, in input order, with task_id, title, success, error and elapsed_ms.
+            Tasks whose message could not be created are reported as failed, not published.
+        """
+        self.debug_log(f"Publishing {len(tasks)} tasks (concurrency {concurrency})")
+        
+        async def _publish_one(item: Union[TaskInfo, Tuple[str, str, List[str]]]) -> Dict[str, Any]:
+            started = time.perf_counter()
+            task_id, title = "", ""
+            try:
+                task_info = item if isinstance(item, TaskInfo) else self._build_task_message(*item)
+                task_id, title = task_info.task_id, task_info.title
+                csharp_task = self._clr_task_for(task_info)
+                success = bool(await _await_clr_task(
+                    self._clr_agent_config.PublishTaskAsync(pubsub_server_url, csharp_task)
+                ))
+                error = None if success else "Publish was not accepted"
+            except Exception as e:
+                success, error = False, str(e)
+            return {
+                "task_id": task_id,
+                "title": title,
+                "success": success,
+                "error": error,
+                "elapsed_ms": (time.perf_counter() - started) * 1000
+            }
+        
+        results = await _map_bounded(_publish_one, list(tasks), concurrency)
+        
+        failed = sum(1 for result in results if not result["success"])
+        if failed:
+            self._log_warning(f"publish_tasks: {failed}/{len(results)} tasks failed")
+        else:
+            self.debug_log(f"All {len(results)} tasks published successfully")
+        return results
+    
     async def create_and_lock_task(self, pubsub_server_url: str, title: str,
-                                  description: str, step_descriptions: List[str]) -> Optional[Tuple[str, str]]:
-        """Create and lock a task for monitoring."""
+                                  description: str, step_descriptions: List[str]) -> Optional[TaskHandle]:
+        """
+        Create and lock a task for monitoring.
+        
+        Returns a TaskHandle (which still unpacks as task_id, message_id), or None on failure.
+        """
         try:
             self.debug_log(f"Creating and locking task: {title}")
-            csharp_list = CSharpList[str]()
-            for step in step_descriptions:
-                csharp_list.Add(step)
-
-            task = self._clr_agent_config.CreateAndLockTaskAsync(pubsub_server_url, title, description, csharp_list)
-            result = await asyncio.get_event_loop().run_in_executor(None, lambda: task.Result)
-
-            if result is not None:
-                # Handle ValueTuple access robustly for Python.NET
-                try:
-                    # Try different access methods
-                    if hasattr(result, 'Item1') and hasattr(result, 'Item2'):
-                        task_result = (result.Item1, result.Item2)
-                    elif hasattr(result, '__getitem__'):
-                        task_result = (result[0], result[1])
-                    else:
-                        # Parse from string representation as fallback
-                        result_str = str(result)
-                        if '(' in result_str and ')' in result_str:
-                            parts = result_str.strip('()').split(',')
-                            if len(parts) >= 2:
-                                task_result = (parts[0].strip(), parts[1].strip())
-                            else:
-                                task_result = None
-                        else:
-                            task_result = None
-                    
-                    if task_result:
-                        self.debug_log(f"Task created and locked: {task_result[0]}")
-                    
-                    return task_result
-                except Exception as e:
-                    self.debug_log(f"Error accessing ValueTuple: {e}")
-
-            self.debug_log("Failed to create and lock task")
-            return None
+            task = self._clr_agent_config.CreateAndLockTaskAsync(
+                pubsub_server_url, title, description, _to_clr_string_list(step_descriptions)
+            )
+            result = await _await_clr_task(task)
+            
+            # The CLR returns a (TaskId, MessageId) ValueTuple
+            task_id = (result.Item1 or "") if result is not None else ""
+            message_id = (result.Item2 or "") if result is not None else ""
+            if not task_id or not message_id:
+                self.debug_log("Failed to create and lock task")
+                return None
+            
+            self.debug_log(f"Task created and locked: {task_id}")
+            self._on_lock_acquired(pubsub_server_url, message_id)
+            lock = self._lock_index.get(message_id, pubsub_server_url)
+            return TaskHandle(
+                task_id=task_id,
+                message_id=message_id,
+                pubsub_server_url=pubsub_server_url,
+                created_by_internal_id=lock.locked_by_internal_id if lock is not None else "",
+                _agent=self
+            )
         except Exception as e:
             self._log_error(f"Error creating and locking task: {e}")
             return None
@@ -1476,7 +3700,7 @@ class HexaEightAgent:
                 result_json = json.dumps(result, default=str, ensure_ascii=False)
 
             task = self._clr_agent_config.UpdateTaskStepCompletionAsync(pubsub_server_url, parent_task_id, step_number, result_json)
-            completion_result = await asyncio.get_event_loop().run_in_executor(None, lambda: task.Result)
+            completion_result = await _await_clr_task(task)
 
             if completion_result:
                 self.debug_log(f"Task step {step_number} completion updated successfully")
@@ -1493,10 +3717,11 @@ class HexaEightAgent:
         try:
             self.debug_log(f"Completing task: {task_id}")
             task = self._clr_agent_config.CompleteTaskAsync(pubsub_server_url, task_id, message_id)
-            result = await asyncio.get_event_loop().run_in_executor(None, lambda: task.Result)
+            result = await _await_clr_task(task)
             
             if result:
                 self.debug_log(f"Task {task_id} completed successfully")
+                self._on_lock_released(pubsub_server_url, message_id)
             else:
                 self.debug_log(f"Failed to complete task {task_id}")
             
@@ -1511,31 +3736,182 @@ class HexaEightAgent:
     
     async def schedule_message(self, pubsub_server_url: str, scheduled_for: datetime, 
                               target_type: str, target_value: str, message: str, 
-                              message_type: str = "message") -> bool:
-        """Schedule a message for future delivery."""
+                              message_type: str = "message", durable: bool = False) -> bool:
+        """
+        Schedule a message for future delivery.
+        
+        scheduled_for keeps its sub-second part. Timezone-aware values are converted to
+        UTC; naive values are local time, as from datetime.now(). With the local
+        scheduler configured, plain messages due within its horizon are delivered
+        from this process unless durable is True; those already in the past are
+        rejected. Everything else goes to the server as before.
+        """
+        entry = self._track_schedule(pubsub_server_url, scheduled_for, target_type,
+                                     target_value, message, message_type, durable)
+        return await self._submit_schedule(entry)
+    
+    async def schedule_many(self, pubsub_server_url: str, items: List[Union[Dict[str, Any], Tuple]],
+                            concurrency: int = 32) -> List[Dict[str, Any]]:
+        """
+        Schedule many messages with bounded concurrency.
+        
+        Args:
+            pubsub_server_url: PubSub server URL
+            items: Dicts with scheduled_for, target_type, target_value, message and
+                optional message_type and durable, or tuples in that order
+            concurrency: Maximum number of schedule requests in flight
+        
+        Returns:
+            One dict per item, in input order, with schedule_id, scheduled_for,
+            target_value, success, error and elapsed_ms. Items still waiting for a
+            free slot can be withdrawn with cancel_schedule(schedule_id).
+        """
+        entries = []
+        for item in items:
+            if isinstance(item, dict):
+                entries.append(self._track_schedule(pubsub_server_url, **item))
+            else:
+                entries.append(self._track_schedule(pubsub_server_url, *item))
+        self.debug_log(f"Scheduling {len(entries)} messages (concurrency {concurrency})")
+        
+        async def _schedule_one(entry: ScheduledMessage) -> Dict[str, Any]:
+            started = time.perf_counter()
+            success = await self._submit_schedule(entry)
+            return {
+                "schedule_id": entry.schedule_id,
+                "scheduled_for": entry.scheduled_for,
+                "target_value": entry.target_value,
+                "success": success,
+                "error": entry.error,
+                "elapsed_ms": (time.perf_counter() - started) * 1000
+            }
+        
+        results = await _map_bounded(_schedule_one, entries, concurrency)
+        
+        failed = sum(1 for result in results if not result["success"])
+        if failed:
+            self._log_warning(f"schedule_many: {failed}/{len(results)} messages not scheduled")
+        else:
+            self.debug_log(f"All {len(results)} messages scheduled successfully")
+        return results
+    
+    def _track_schedule(self, pubsub_server_url: str, scheduled_for: datetime, target_type: str,
+                        target_value: str, message: str, message_type: str = "message",
+                        durable: bool = False) -> ScheduledMessage:
+        """Add a schedule to the local index before it is submitted."""
+        self._prune_schedules()
+        entry = ScheduledMessage(
+            schedule_id=str(uuid.uuid4()),
+            scheduled_for=scheduled_for,
+            target_type=target_type,
+            target_value=target_value,
+            message=message,
+            message_type=message_type,
+            pubsub_server_url=pubsub_server_url,
+            durable=durable
+        )
+        self._schedules[entry.schedule_id] = entry
+        return entry
+    
+    async def _submit_schedule(self, entry: ScheduledMessage) -> bool:
+        """Send a tracked schedule to the server unless it was cancelled first."""
+        if entry.status == "cancelled":
+            return False
+        delay = (_as_utc_naive(entry.scheduled_for) - datetime.utcnow()).total_seconds()
+        if self._local_scheduler is not None and not entry.durable:
+            if self._local_scheduler.accepts(entry, delay):
+                if delay < 0:
+                    # The server decides what a past time means; only local delivery refuses it
+                    entry.status, entry.error = "failed", "Scheduled time is in the past"
+                    self._log_error(f"Cannot schedule message for {entry.scheduled_for}: the time has passed")
+                    return False
+                entry.status = "local"
+                self._local_scheduler.add(entry, delay)
+                self.debug_log(f"Scheduled message locally, due in {delay:.3f}s")
+                return True
+        entry.status = "submitting"
         try:
-            self.debug_log(f"Scheduling message for {scheduled_for}: {message[:50]}...")
-            # Convert Python datetime to C# DateTime
-            csharp_datetime = DateTime(
-                scheduled_for.year, scheduled_for.month, scheduled_for.day,
-                scheduled_for.hour, scheduled_for.minute, scheduled_for.second
-            )
-            
+            self.debug_log(f"Scheduling message for {entry.scheduled_for}: {entry.message[:50]}...")
             task = self._clr_agent_config.ScheduleMessageAsync(
-                pubsub_server_url, csharp_datetime, target_type, target_value, message, message_type
+                entry.pubsub_server_url, _to_clr_datetime(entry.scheduled_for), entry.target_type,
+                entry.target_value, entry.message, entry.message_type
             )
-            result = await asyncio.get_event_loop().run_in_executor(None, lambda: task.Result)
+            result = await _await_clr_task(task)
             
             if result:
+                entry.status = "submitted"
                 self.debug_log("Message scheduled successfully")
             else:
+                entry.status, entry.error = "failed", "Schedule was not accepted"
                 self.debug_log("Failed to schedule message")
             
             return result
         except Exception as e:
+            entry.status, entry.error = "failed", str(e)
             self._log_error(f"Error scheduling message: {e}")
             return False
     
+    def _prune_schedules(self):
+        """Drop index entries whose delivery time has passed or that never reached the server."""
+        now = datetime.utcnow()
+        for schedule_id, entry in list(self._schedules.items()):
+            if entry.status == "local":
+                continue  # removed by the local scheduler once delivered
+            if entry.status in ("failed", "cancelled") or _as_utc_naive(entry.scheduled_for) <= now:
+                del self._schedules[schedule_id]
+    
+    def configure_local_scheduler(self, horizon_seconds: float):
+        """
+        Deliver near-term scheduled messages from this process instead of the server.
+        
+        Plain messages (message_type "message") to an agent name, internal ID or
+        broadcast that are due within horizon_seconds are kept in a local heap and
+        published when due. Later schedules, scheduled tasks, other target types and
+        schedules made with durable=True still go to the server. Locally held
+        schedules do not survive a restart. A horizon of 0 stops local scheduling;
+        schedules already held locally are still delivered.
+        """
+        if self._local_scheduler is None:
+            if horizon_seconds <= 0:
+                return
+            self._local_scheduler = _LocalScheduler(self, horizon_seconds)
+        else:
+            self._local_scheduler.horizon_seconds = max(0.0, horizon_seconds)
+        self.debug_log(f"Local scheduler horizon: {horizon_seconds}s")
+    
+    def get_local_scheduler_statistics(self) -> Dict[str, Any]:
+        """Get counts of locally scheduled, delivered, failed and pending messages."""
+        if self._local_scheduler is None:
+            return {"scheduled": 0, "delivered": 0, "failed": 0, "pending": 0, "horizon_seconds": 0.0}
+        return self._local_scheduler.statistics()
+    
+    def _close_local_scheduler(self):
+        if self._local_scheduler is not None:
+            dropped = self._local_scheduler.close()
+            self._local_scheduler = None
+            if dropped:
+                self._log_warning(f"Dropped {dropped} locally held scheduled messages")
+    
+    def list_pending_schedules(self) -> List[ScheduledMessage]:
+        """Schedules made through this agent that are still due, soonest first (no server call)."""
+        self._prune_schedules()
+        return sorted(self._schedules.values(), key=lambda entry: _as_utc_naive(entry.scheduled_for))
+    
+    def cancel_schedule(self, schedule_id: str) -> bool:
+        """
+        Cancel a schedule held by the local scheduler or not yet sent to the server.
+        
+        The server has no cancel operation, so schedules it already accepted are
+        delivered regardless; for those this returns False.
+        """
+        entry = self._schedules.get(schedule_id)
+        if entry is None or entry.status not in ("queued", "local"):
+            return False
+        entry.status, entry.error = "cancelled", "Cancelled before submission"
+        del self._schedules[schedule_id]
+        self.debug_log(f"Cancelled schedule {schedule_id}")
+        return True
+    
     # ==================================================================================
     # LLM GATEWAY METHODS (unchanged)
     # ==================================================================================
@@ -1561,7 +3937,7 @@ class HexaEightAgent:
                 pubsub_server_url, llm_request.provider, llm_request.model, 
                 json.dumps(request_dict), llm_request.max_tokens
             )
-            result = await asyncio.get_event_loop().run_in_executor(None, lambda: task.Result)
+            result = await _await_clr_task(task)
             
             if result:
                 self.debug_log("LLM request sent successfully")
@@ -1578,7 +3954,7 @@ class HexaEightAgent:
         try:
             self.debug_log("Getting available providers")
             task = self._clr_agent_config.GetAvailableProvidersAsync(pubsub_server_url)
-            providers = await asyncio.get_event_loop().run_in_executor(None, lambda: task.Result)
+            providers = await _await_clr_task(task)
             provider_list = list(providers) if providers else []
             
             self.debug_log(f"Available providers: {provider_list}")
@@ -1594,10 +3970,7 @@ class HexaEightAgent:
     async def get_server_health(self, pubsub_server_url: str) -> str:
         """Get server health status."""
         try:
-            self.debug_log(f"Getting server health from {pubsub_server_url}")
-            task = self._clr_agent_config.GetServerHealthAsync(pubsub_server_url)
-            result = await asyncio.get_event_loop().run_in_executor(None, lambda: task.Result)
-            return result
+            return await self._fetch_server_health(pubsub_server_url)
         except Exception as e:
             error_msg = f"Error getting health: {e}"
             self._log_error(error_msg)
@@ -1606,15 +3979,20 @@ class HexaEightAgent:
     async def get_server_stats(self, pubsub_server_url: str) -> str:
         """Get server statistics."""
         try:
-            self.debug_log(f"Getting server stats from {pubsub_server_url}")
-            task = self._clr_agent_config.GetServerStatsAsync(pubsub_server_url)
-            result = await asyncio.get_event_loop().run_in_executor(None, lambda: task.Result)
-            return result
+            return await self._fetch_server_stats(pubsub_server_url)
         except Exception as e:
             error_msg = f"Error getting stats: {e}"
             self._log_error(error_msg)
             return error_msg
     
+    async def _fetch_server_health(self, pubsub_server_url: str) -> str:
+        self.debug_log(f"Getting server health from {pubsub_server_url}")
+        return await _await_clr_task(self._clr_agent_config.GetServerHealthAsync(pubsub_server_url))
+    
+    async def _fetch_server_stats(self, pubsub_server_url: str) -> str:
+        self.debug_log(f"Getting server stats from {pubsub_server_url}")
+        return await _await_clr_task(self._clr_agent_config.GetServerStatsAsync(pubsub_server_url))
+    
     # ==================================================================================
     # EVENT HANDLING METHODS - CLEAN HANDOVER
     # ==================================================================================
@@ -1634,9 +4012,12 @@ class HexaEightAgent:
         """
         while True:
             try:
-                event_type, event_data = await self._event_queue.get()
+                event_type, event_data = await self._event_ingress.get()
                 self.debug_log(f"Event yielded: {event_type}")
                 yield event_type, event_data
+            except _EventIngressClosed:
+                self.debug_log("Event buffer closed")
+                break
             except asyncio.CancelledError:
                 self.debug_log("Event loop cancelled")
                 break
@@ -1644,6 +4025,38 @@ class HexaEightAgent:
                 self._log_error(f"Error in event loop: {e}")
                 await asyncio.sleep(0.1)
     
+    async def event_batches(self, max_batch: int = 100,
+                            max_wait_ms: float = 50) -> AsyncGenerator[List[Tuple[str, Any]], None]:
+        """
+        Async generator that yields events in batches.
+        
+        Each batch holds between 1 and max_batch (event_type, event_data) tuples in
+        arrival order. A batch is yielded as soon as it is full, or max_wait_ms after
+        its first event arrived.
+        
+        Usage:
+            async for batch in agent.event_batches(max_batch=500, max_wait_ms=20):
+                messages = [data for kind, data in batch if kind == 'message_received']
+                await store_messages(messages)
+        """
+        if max_batch <= 0:
+            raise ValueError("max_batch must be positive")
+        
+        while True:
+            try:
+                batch = await self._event_ingress.get_batch(max_batch, max_wait_ms / 1000.0)
+                self.debug_log(f"Event batch yielded: {len(batch)} events")
+                yield batch
+            except _EventIngressClosed:
+                self.debug_log("Event buffer closed")
+                break
+            except asyncio.CancelledError:
+                self.debug_log("Event loop cancelled")
+                break
+            except Exception as e:
+                self._log_error(f"Error in event batch loop: {e}")
+                await asyncio.sleep(0.1)
+    
     def register_event_handler(self, event_type: str, handler: Callable):
         """Register a callback handler for specific event types."""
         if event_type not in self._event_handlers:
@@ -1660,34 +4073,108 @@ class HexaEightAgent:
             except ValueError:
                 self.debug_log(f"Handler not found for {event_type}")
     
-    async def start_event_processing(self):
-        """Start processing events with registered handlers."""
+    async def start_event_processing(self, batch_mode: bool = False, max_batch: int = 100,
+                                     max_wait_ms: float = 50, concurrency: int = 1,
+                                     ordering_key: Optional[Callable[[str, Any], Any]] = None,
+                                     event_type_limits: Optional[Dict[str, int]] = None,
+                                     offload_sync_handlers: bool = False,
+                                     release_handler_locks: bool = False):
+        """
+        Start processing events with registered handlers.
+        
+        Args:
+            batch_mode: If True, events are drained in batches and each handler is
+                called once per batch with a list of all event data of its type,
+                so handlers can do bulk writes or bulk lock calls.
+            max_batch: Maximum events per batch (batch mode only).
+            max_wait_ms: Maximum time to wait for a batch to fill (batch mode only).
+            concurrency: Number of events handled in parallel. Events with the same
+                ordering key are always handled in order. Default 1 (serial).
+            ordering_key: Function (event_type, event_data) -> key. Defaults to the
+                sender for messages, the task ID for task events and the message ID
+                for lock expirations. In batch mode the key is the event type.
+            event_type_limits: Optional per-event-type cap on concurrently running
+                handlers, e.g. {'message_received': 4}.
+            offload_sync_handlers: Run non-async handlers in a thread pool so
+                blocking handlers do not freeze the event loop.
+            release_handler_locks: Release locks a handler acquired (and did not
+                release itself) when the handler returns or raises.
+        """
         if self._running_event_loop:
             self.debug_log("Event processing already running")
             return
         
         self._running_event_loop = True
-        self.debug_log("Starting event processing")
+        self._release_handler_locks = release_handler_locks
+        self.debug_log(f"Starting event processing{' (batch mode)' if batch_mode else ''}")
         
-        async for event_type, event_data in self.events():
-            if not self._running_event_loop:
-                break
-            
-            if event_type in self._event_handlers:
-                for handler in self._event_handlers[event_type]:
-                    try:
-                        if asyncio.iscoroutinefunction(handler):
-                            await handler(event_data)
+        dispatcher = None
+        if concurrency > 1 or event_type_limits or offload_sync_handlers:
+            dispatcher = _EventDispatcher(self, concurrency, event_type_limits, offload_sync_handlers)
+        key_func = ordering_key or _default_event_ordering_key
+        
+        try:
+            if batch_mode:
+                async for batch in self.event_batches(max_batch, max_wait_ms):
+                    if not self._running_event_loop:
+                        break
+                    
+                    # Group by event type, keeping arrival order within each type
+                    grouped: Dict[str, List[Any]] = {}
+                    for event_type, event_data in batch:
+                        grouped.setdefault(event_type, []).append(event_data)
+                    
+                    for event_type, event_data_list in grouped.items():
+                        if dispatcher is None:
+                            await self._dispatch_event(event_type, event_data_list)
                         else:
-                            handler(event_data)
-                    except Exception as e:
-                        self._log_error(f"Error in event handler: {e}")
+                            await dispatcher.submit(event_type, event_type, event_data_list)
+            else:
+                async for event_type, event_data in self.events():
+                    if not self._running_event_loop:
+                        break
+                    
+                    if dispatcher is None:
+                        await self._dispatch_event(event_type, event_data)
+                    else:
+                        await dispatcher.submit(key_func(event_type, event_data), event_type, event_data)
+        finally:
+            if dispatcher is not None:
+                # Finish in-flight events on a clean stop; abandon them on cancellation
+                await dispatcher.close(drain=not self._running_event_loop)
+            self._running_event_loop = False
+    
+    async def _dispatch_event(self, event_type: str, payload: Any,
+                              executor: Optional[ThreadPoolExecutor] = None):
+        """Call every handler registered for event_type with payload."""
+        for handler in list(self._event_handlers.get(event_type, ())):
+            scope_token = _HANDLER_LOCK_SCOPE.set(set()) if self._release_handler_locks else None
+            try:
+                if asyncio.iscoroutinefunction(handler):
+                    await handler(payload)
+                elif executor is not None:
+                    await asyncio.get_running_loop().run_in_executor(executor, handler, payload)
+                else:
+                    handler(payload)
+            except Exception as e:
+                self._log_error(f"Error in event handler: {e}")
+            finally:
+                if scope_token is not None:
+                    leftover = _HANDLER_LOCK_SCOPE.get()
+                    _HANDLER_LOCK_SCOPE.reset(scope_token)
+                    for url, message_id in list(leftover):
+                        self.debug_log(f"Releasing lock left by {event_type} handler: {message_id}")
+                        await self.release_lock(url, message_id)
     
     def stop_event_processing(self):
         """Stop event processing."""
         self._running_event_loop = False
         self.debug_log("Event processing stopped")
     
+    def get_event_queue_statistics(self) -> Dict[str, Any]:
+        """Get event buffer depth, high watermark and per-event-type received/dropped counters."""
+        return self._event_ingress.statistics()
+    
     # ==================================================================================
     # CONTEXT MANAGER SUPPORT (unchanged)
     # ==================================================================================
@@ -1698,6 +4185,9 @@ class HexaEightAgent:
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         """Async context manager exit."""
+        await self.release_all_locks()
+        self._lock_heartbeats.close()
+        self._close_local_scheduler()
         self.disconnect_from_pubsub()
         self.stop_event_processing()
     
@@ -1705,12 +4195,16 @@ class HexaEightAgent:
     # JWT SIGNING AND VERIFICATION (Direct DLL Integration)
     # ==================================================================================
 
-    def set_signing_folder(self, folder_path: str):
+    def set_signing_folder(self, folder_path: str) -> SigningContext:
         """
         Set signing folder containing JWT signing credentials.
 
         Args:
             folder_path: Path to folder with .h8, .ask, .license files
+
+        Returns:
+            The SigningContext used by this agent's signing calls. Pass it as
+            signing_context to sign with this identity from another agent.
         """
         self.debug_log(f"Setting signing folder: {folder_path}")
         self._clr_agent_config.SetSigningFolder(folder_path, False)
@@ -1723,16 +4217,71 @@ class HexaEightAgent:
                 value = str(key_value.Value)
                 Environment.SetEnvironmentVariable(key, value)
                 self.debug_log(f"✅ Set {key}")
+        _SIGNING_GATE.invalidate()
 
+        self._signing_context = None
+        context = self._get_signing_context(folder_path)
         self._log_success("Signing environment loaded")
+        return context
 
     def load_signing_environment(self):
         """Load JWT signing environment from configured folder."""
         self.debug_log("Loading signing environment...")
         self._clr_agent_config.LoadSigningEnvironment()
+        _SIGNING_GATE.invalidate()
+        self._signing_context = None
         self._log_success("Signing environment loaded")
 
-    async def sign_message_async(self, sender_email: str, message: str, max_retries: int = 3) -> Dict[str, Any]:
+    def _get_signing_context(self, folder_path: str = "") -> Optional[SigningContext]:
+        """This agent's signing credentials, read from the CLR on first use (None if not loaded)."""
+        if self._signing_context is None:
+            signing_vars = self._clr_agent_config.GetSigningEnvironmentVariables()
+            if not signing_vars:
+                return None
+            self._signing_context = SigningContext(
+                folder_path=folder_path,
+                resource_name=str(signing_vars.Item1 or ""),
+                machine_token=str(signing_vars.Item2 or ""),
+                secret=str(signing_vars.Item3 or ""),
+                license_code=str(signing_vars.Item4 or "")
+            )
+            self.debug_log("✅ Signing context created")
+        return self._signing_context
+
+    def _signing_identity(self, signing_context: Optional[SigningContext] = None):
+        """Async context manager that makes the given (or this agent's) identity the applied one."""
+        return _SIGNING_GATE.use(signing_context or self._get_signing_context())
+
+    async def _queue_signing(self, queue_request: Callable[[], Any], timeout_ms: int) -> str:
+        """
+        Queue a signing with this agent's identity applied and return its request ID.
+
+        The queue reads the credentials when it gets to the request, so the identity
+        stays applied until wait_for_queue_result_async collects the result, or
+        until timeout_ms passes if nobody does.
+        """
+        context = self._get_signing_context()
+        if context is None:
+            return str(await _await_clr_task(queue_request()))
+        await _SIGNING_GATE.acquire(context)
+        try:
+            request_id = str(await _await_clr_task(queue_request()))
+        except BaseException:
+            _SIGNING_GATE.release()
+            raise
+        self._signing_leases[request_id] = asyncio.get_running_loop().call_later(
+            timeout_ms / 1000.0, self._end_signing_lease, request_id
+        )
+        return request_id
+
+    def _end_signing_lease(self, request_id: str):
+        timer = self._signing_leases.pop(request_id, None)
+        if timer is not None:
+            timer.cancel()
+            _SIGNING_GATE.release()
+
+    async def sign_message_async(self, sender_email: str, message: str, max_retries: int = 3,
+                                 signing_context: Optional[SigningContext] = None) -> Dict[str, Any]:
         """
         Sign a message using JWT (direct C# DLL call).
 
@@ -1740,6 +4289,7 @@ class HexaEightAgent:
             sender_email: Email of the sender
             message: Message content to sign
             max_retries: Maximum retry attempts
+            signing_context: Identity to sign with (defaults to this agent's)
 
         Returns:
             Dictionary with signing result containing jwt, message_id, success, etc.
@@ -1747,18 +4297,10 @@ class HexaEightAgent:
         self.debug_log(f"Signing message from: {sender_email}")
 
         try:
-            # Get signing credentials and copy to regular env vars for CLR persistence
-            signing_vars = self._clr_agent_config.GetSigningEnvironmentVariables()
-            if signing_vars:
-                Environment.SetEnvironmentVariable("HEXAEIGHT_RESOURCENAME", signing_vars.Item1)
-                Environment.SetEnvironmentVariable("HEXAEIGHT_MACHINETOKEN", signing_vars.Item2)
-                Environment.SetEnvironmentVariable("HEXAEIGHT_SECRET", signing_vars.Item3)
-                Environment.SetEnvironmentVariable("HEXAEIGHT_LICENSECODE", signing_vars.Item4)
-                self.debug_log("✅ Copied signing credentials to regular env vars")
-
-            result = await asyncio.to_thread(
-                lambda: self._clr_agent_config.SignMessageAsync(sender_email, message, max_retries).Result
-            )
+            async with self._signing_identity(signing_context):
+                result = await _await_clr_task(
+                    self._clr_agent_config.SignMessageAsync(sender_email, message, max_retries)
+                )
 
             if result.Success:
                 self.debug_log(f"✅ Signing successful - JWT length: {len(result.Jwt)}")
@@ -1788,7 +4330,62 @@ class HexaEightAgent:
                 "error": str(e)
             }
 
-    async def verify_jwt_async(self, jwt: str, original_message: str, expected_sender_email: str = None, is_file_path: bool = False) -> Dict[str, Any]:
+    async def sign_messages_async(self, messages: List[Tuple[str, str]], max_retries: int = 3,
+                                  timeout_ms: int = 30000, concurrency: int = 256,
+                                  signing_context: Optional[SigningContext] = None) -> List[Dict[str, Any]]:
+        """
+        Sign many messages through the signing queue.
+
+        The queue is started if needed and up to `concurrency` requests are kept in it
+        at once. The signing environment is applied only when the identity changes;
+        each message holds it until its result arrives, so signings for other
+        identities take turns with the batch instead of waiting for all of it.
+
+        Args:
+            messages: (sender_email, message) pairs
+            max_retries: Maximum retry attempts per message
+            timeout_ms: Per-message timeout for queueing and for the result
+            concurrency: Maximum signing requests in the queue at once
+            signing_context: Identity to sign with (defaults to this agent's)
+
+        Returns:
+            One dict per pair, in input order, with the same keys as sign_message_async
+            plus elapsed_ms (queue to result, as seen by the caller)
+        """
+        self.debug_log(f"Signing batch of {len(messages)} messages")
+        if not self._signing_queue_started:
+            self.start_signing_queue()
+
+        context = signing_context or self._get_signing_context()
+
+        async def _sign_one(item: Tuple[str, str]) -> Dict[str, Any]:
+            sender_email, message = item
+            started = time.perf_counter()
+            try:
+                # Per message, so other identities get their turn during a long batch
+                async with _SIGNING_GATE.use(context):
+                    request_id = await _await_clr_task(
+                        self._clr_agent_config.QueueJwtSigningAsync(sender_email, message, max_retries, timeout_ms)
+                    )
+                    result = await self.wait_for_queue_result_async(str(request_id), timeout_ms)
+            except Exception as e:
+                result = {"success": False, "jwt": None, "message_id": None,
+                          "generation_time_ms": 0, "error": str(e)}
+            result["elapsed_ms"] = (time.perf_counter() - started) * 1000
+            return result
+
+        batch_started = time.perf_counter()
+        results = await _map_bounded(_sign_one, list(messages), concurrency)
+
+        failed = sum(1 for result in results if not result["success"])
+        elapsed = time.perf_counter() - batch_started
+        if failed:
+            self._log_warning(f"sign_messages_async: {failed}/{len(results)} messages failed")
+        self.debug_log(f"Signed {len(results) - failed} messages in {elapsed:.2f}s")
+        return results
+
+    async def verify_jwt_async(self, jwt: str, original_message: str, expected_sender_email: str = None,
+                               is_file_path: bool = False, use_cache: bool = False) -> Dict[str, Any]:
         """
         Verify JWT signature (direct C# DLL call - NO signing environment needed).
 
@@ -1797,15 +4394,101 @@ class HexaEightAgent:
             original_message: Original message content or file path
             expected_sender_email: Optional email to verify sender identity
             is_file_path: True if original_message is a file path, False for text content
+            use_cache: Answer from (and record in) the verified-token cache. Successful
+                results are kept until the token expires or the cache TTL (300s)
+                passes, so a sender revoked meanwhile can still verify from the
+                cache until then; pass False where that matters, or call
+                clear_verification_cache() after a revocation. File paths are
+                hashed to look them up, which only pays off when the same file
+                is verified repeatedly; an unchanged (size, mtime) reuses the
+                earlier hash.
 
         Returns:
-            Dictionary with verification result
+            Dictionary with verification result (plus "cached": True for cache hits)
         """
         self.debug_log(f"Verifying JWT (length: {len(jwt)} chars)")
 
+        cache_key = None
+        if use_cache:
+            if is_file_path:
+                # Hashing a large file must not stall the event loop
+                cache_key = await asyncio.get_running_loop().run_in_executor(
+                    None, _verification_cache_key, jwt, original_message, expected_sender_email, is_file_path)
+            else:
+                cache_key = _verification_cache_key(jwt, original_message, expected_sender_email, is_file_path)
+            cached = self._verified_tokens.get(cache_key) if cache_key is not None else None
+            if cached is not None:
+                self.debug_log("✅ Verification answered from cache")
+                cached["cached"] = True
+                return cached
+
+        result = await self._verify_jwt_uncached(jwt, original_message, expected_sender_email, is_file_path)
+        if cache_key is not None:
+            self._verified_tokens.put(cache_key, jwt, result)
+        return result
+
+    async def verify_many_async(self, items: List[Union[Tuple, Dict[str, Any]]], concurrency: int = 16,
+                                use_cache: bool = False) -> List[Dict[str, Any]]:
+        """
+        Verify many JWTs in parallel.
+
+        Args:
+            items: (jwt, original_message[, expected_sender_email[, is_file_path]]) tuples,
+                or dicts with those keys
+            concurrency: Maximum verifications running at once
+            use_cache: Use the verified-token cache, off by default as in
+                verify_jwt_async (cached results can outlive a sender's
+                revocation by up to the cache TTL)
+
+        Returns:
+            One verification result per item, in input order. Identical items in the
+            batch are verified once.
+
+        Raises:
+            ValueError: If an item is not a 2 to 4 element tuple or a dict with jwt
+                and original_message; nothing is verified in that case
+        """
+        requests = [self._verification_request(index, item) for index, item in enumerate(items)]
+        unique = list(dict.fromkeys(requests))
+        self.debug_log(f"Verifying {len(requests)} JWTs ({len(unique)} distinct, concurrency {concurrency})")
+
+        async def _verify_one(request: Tuple) -> Dict[str, Any]:
+            jwt, original_message, expected_sender_email, is_file_path = request
+            return await self.verify_jwt_async(jwt, original_message, expected_sender_email,
+                                               is_file_path, use_cache=use_cache)
+
+        results = dict(zip(unique, await _map_bounded(_verify_one, unique, concurrency)))
+        return [dict(results[request]) for request in requests]
+
+    @staticmethod
+    def _verification_request(index: int, item: Union[Tuple, Dict[str, Any]]) -> Tuple:
+        """Normalize one verify_many_async item to (jwt, original_message, expected_sender_email, is_file_path)."""
+        if isinstance(item, dict):
+            if "jwt" not in item or "original_message" not in item:
+                raise ValueError(f"Item {index}: jwt and original_message are required")
+            return (item["jwt"], item["original_message"], item.get("expected_sender_email"),
+                    item.get("is_file_path", False))
+        item = tuple(item)
+        if not 2 <= len(item) <= 4:
+            raise ValueError(f"Item {index}: expected 2 to 4 fields, got {len(item)}")
+        return item + (None, False)[len(item) - 2:]
+
+    def clear_verification_cache(self):
+        """Forget cached verification results, e.g. after a sender was revoked."""
+        self._verified_tokens.clear()
+        self.debug_log("Verification cache cleared")
+
+    def get_verification_cache_statistics(self) -> Dict[str, Any]:
+        """Get verified-token cache hits, misses, hit ratio, expirations and size, plus file hashing counters."""
+        stats = self._verified_tokens.statistics()
+        stats["file_fingerprints"] = _FILE_FINGERPRINTS.statistics()
+        return stats
+
+    async def _verify_jwt_uncached(self, jwt: str, original_message: str, expected_sender_email: Optional[str],
+                                   is_file_path: bool) -> Dict[str, Any]:
         try:
-            result = await asyncio.to_thread(
-                lambda: self._clr_agent_config.VerifyJwtAsync(jwt, original_message, expected_sender_email, is_file_path).Result
+            result = await _await_clr_task(
+                self._clr_agent_config.VerifyJwtAsync(jwt, original_message, expected_sender_email, is_file_path)
             )
 
             if result.Success:
@@ -1858,9 +4541,10 @@ class HexaEightAgent:
         self.debug_log(f"Creating JWT message JSON for: {sender_email}")
 
         try:
-            jwt_json = await asyncio.to_thread(
-                lambda: self._clr_agent_config.CreateJwtMessageAsync(sender_email, message).Result
-            )
+            async with self._signing_identity():
+                jwt_json = await _await_clr_task(
+                    self._clr_agent_config.CreateJwtMessageAsync(sender_email, message)
+                )
 
             if jwt_json:
                 self.debug_log(f"✅ JWT message created - JSON length: {len(jwt_json)}")
@@ -1901,8 +4585,8 @@ class HexaEightAgent:
         self.debug_log("Verifying JWT message JSON")
 
         try:
-            result = await asyncio.to_thread(
-                lambda: self._clr_agent_config.VerifyJwtMessageAsync(jwt_message_json, expected_sender_email).Result
+            result = await _await_clr_task(
+                self._clr_agent_config.VerifyJwtMessageAsync(jwt_message_json, expected_sender_email)
             )
 
             if result.Success:
@@ -1937,12 +4621,14 @@ class HexaEightAgent:
         """Start JWT signing queue system for async processing."""
         self.debug_log("Starting JWT signing queue...")
         self._clr_agent_config.StartJwtSigningQueue()
+        self._signing_queue_started = True
         self._log_success("Signing queue started")
 
     async def stop_signing_queue_async(self):
         """Stop JWT signing queue system."""
         self.debug_log("Stopping JWT signing queue...")
-        await asyncio.to_thread(lambda: self._clr_agent_config.StopJwtSigningQueueAsync().Result)
+        await _await_clr_task(self._clr_agent_config.StopJwtSigningQueueAsync())
+        self._signing_queue_started = False
         self._log_success("Signing queue stopped")
 
     async def queue_signing_async(self, sender_email: str, message: str, max_retries: int = 3, timeout_ms: int = 4000) -> str:
@@ -1955,11 +4641,12 @@ class HexaEightAgent:
             Request ID for tracking
         """
         self.debug_log(f"Queuing signing (message size: {len(message)} bytes)")
-        request_id = await asyncio.to_thread(
-            lambda: self._clr_agent_config.QueueJwtSigningAsync(sender_email, message, max_retries, timeout_ms).Result
+        request_id = await self._queue_signing(
+            lambda: self._clr_agent_config.QueueJwtSigningAsync(sender_email, message, max_retries, timeout_ms),
+            timeout_ms
         )
         self.debug_log(f"Request queued: {request_id}")
-        return str(request_id)
+        return request_id
 
     async def queue_signing_from_file_async(self, sender_email: str, file_path: str, max_retries: int = 3, timeout_ms: int = 10000) -> str:
         """
@@ -1975,11 +4662,12 @@ class HexaEightAgent:
             Request ID for tracking
         """
         self.debug_log(f"Queuing file signing: {file_path}")
-        request_id = await asyncio.to_thread(
-            lambda: self._clr_agent_config.QueueJwtSigningFromFileAsync(sender_email, file_path, max_retries, timeout_ms).Result
+        request_id = await self._queue_signing(
+            lambda: self._clr_agent_config.QueueJwtSigningFromFileAsync(sender_email, file_path, max_retries, timeout_ms),
+            timeout_ms
         )
         self.debug_log(f"File signing request queued: {request_id}")
-        return str(request_id)
+        return request_id
 
     async def queue_signing_from_stream_async(self, sender_email: str, content_stream, expected_size: int, max_retries: int = 3, timeout_ms: int = 15000) -> str:
         """
@@ -1996,11 +4684,14 @@ class HexaEightAgent:
             Request ID for tracking
         """
         self.debug_log(f"Queuing stream signing (size: {expected_size} bytes)")
-        request_id = await asyncio.to_thread(
-            lambda: self._clr_agent_config.QueueJwtSigningFromStreamAsync(sender_email, content_stream, expected_size, max_retries, timeout_ms).Result
+        request_id = await self._queue_signing(
+            lambda: self._clr_agent_config.QueueJwtSigningFromStreamAsync(
+                sender_email, content_stream, expected_size, max_retries, timeout_ms
+            ),
+            timeout_ms
         )
         self.debug_log(f"Stream signing request queued: {request_id}")
-        return str(request_id)
+        return request_id
 
     async def wait_for_queue_result_async(self, request_id: str, timeout_ms: int = 30000) -> Dict[str, Any]:
         """
@@ -2010,9 +4701,12 @@ class HexaEightAgent:
             Dictionary with signing result
         """
         self.debug_log(f"Waiting for queue result: {request_id}")
-        result = await asyncio.to_thread(
-            lambda: self._clr_agent_config.WaitForQueuedJwtResultAsync(request_id, timeout_ms).Result
-        )
+        try:
+            result = await _await_clr_task(
+                self._clr_agent_config.WaitForQueuedJwtResultAsync(request_id, timeout_ms)
+            )
+        finally:
+            self._end_signing_lease(request_id)
 
         return {
             "success": bool(result.Success),
@@ -2027,21 +4721,922 @@ class HexaEightAgent:
         stats = self._clr_agent_config.GetQueueStatistics()
         return {str(key): value for key, value in stats.items()}
 
+    async def sign_stream_async(self, sender_email: str, source: Any, chunk_size: int = _STREAM_CHUNK_SIZE,
+                                max_retries: int = 3, timeout_ms: int = 300000,
+                                signing_context: Optional[SigningContext] = None,
+                                size: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Sign large content without loading it into memory.
+
+        Args:
+            sender_email: Email of the sender
+            source: File path, binary file object, async iterator of bytes, or memoryview/bytes
+            chunk_size: Bytes handed to the DLL per write for non-path sources
+            max_retries: Maximum retry attempts
+            timeout_ms: Timeout for the queued signing in milliseconds
+            signing_context: Credentials to sign with (see set_signing_folder)
+            size: Content length in bytes. Required for async iterators and other
+                sources that cannot be measured; bytes-like objects and real files
+                are measured when it is omitted
+
+        Paths are handed to the DLL's file-mode signer directly; other sources are
+        piped to its stream signer in chunk_size pieces, so memory use stays at one
+        chunk regardless of content size and nothing is written to disk.
+
+        Returns:
+            Dictionary with signing result plus bytes, elapsed_ms and throughput_mb_s
+
+        Raises:
+            ValueError: If size is omitted for a source that cannot be measured
+        """
+        started = time.perf_counter()
+        if size is None and not _is_path_source(source):
+            size = _source_size(source)
+            if size is None:
+                # The DLL checks the content against the size it is given up front
+                raise ValueError(f"size is required for {type(source).__name__} sources")
+        pipe = None if _is_path_source(source) else _ClrChunkPipe()
+        try:
+            async with self._signing_identity(signing_context):
+                if not self._signing_queue_started:
+                    self.start_signing_queue()
+                if pipe is None:
+                    path = os.fspath(source)
+                    size = os.path.getsize(path)
+                    self.debug_log(f"Streaming signature over {size} bytes")
+                    request_id = str(await _await_clr_task(
+                        self._clr_agent_config.QueueJwtSigningFromFileAsync(sender_email, path, max_retries, timeout_ms)
+                    ))
+                else:
+                    request_id, size = await self._queue_signing_from_pipe(
+                        pipe, sender_email, source, chunk_size, size, max_retries, timeout_ms
+                    )
+                result = await self.wait_for_queue_result_async(request_id, timeout_ms)
+        finally:
+            # The queue may read the stream only when it gets to the request
+            if pipe is not None:
+                pipe.close()
+        elapsed = time.perf_counter() - started
+        result.update(bytes=size, elapsed_ms=elapsed * 1000, throughput_mb_s=_throughput_mb_s(size, elapsed))
+        self.debug_log(f"Stream signed: {size} bytes at {result['throughput_mb_s']} MB/s")
+        return result
+
+    async def _queue_signing_from_pipe(self, pipe: "_ClrChunkPipe", sender_email: str, source: Any,
+                                       chunk_size: int, size: int, max_retries: int,
+                                       timeout_ms: int) -> Tuple[str, int]:
+        """Queue a stream signing over pipe while source is fed into it; returns (request ID, bytes fed)."""
+        self.debug_log(f"Streaming signature over {size} bytes")
+        loop = asyncio.get_running_loop()
+        feeding = asyncio.ensure_future(pipe.feed(source, chunk_size))
+        try:
+            # The DLL may read the stream before returning its task, so call it off the loop
+            queued = await loop.run_in_executor(
+                None, self._clr_agent_config.QueueJwtSigningFromStreamAsync,
+                sender_email, pipe.reader, size, max_retries, timeout_ms
+            )
+            request_id = str(await _await_clr_task(queued))
+            return request_id, await feeding
+        except BaseException:
+            pipe.close()
+            if feeding.done() and not feeding.cancelled() and feeding.exception() is not None:
+                # The source failing is the cause; the DLL only saw its pipe close
+                raise feeding.exception()
+            feeding.cancel()
+            raise
+
+    async def verify_stream_async(self, jwt: str, source: Any, expected_sender_email: str = None,
+                                  chunk_size: int = _STREAM_CHUNK_SIZE, use_cache: bool = False) -> Dict[str, Any]:
+        """
+        Verify a JWT against large content without loading it into memory.
+
+        Accepts the same sources as sign_stream_async. The DLL verifies files only,
+        so non-path sources are spooled to a temporary file chunk by chunk. use_cache
+        applies to path sources only; spooled content is never cached.
+
+        Returns:
+            Dictionary with verification result plus bytes, elapsed_ms and throughput_mb_s
+        """
+        started = time.perf_counter()
+        async with _source_as_path(source, chunk_size) as (path, size):
+            result = await self.verify_jwt_async(jwt, path, expected_sender_email, is_file_path=True,
+                                                 use_cache=use_cache and _is_path_source(source))
+        elapsed = time.perf_counter() - started
+        result.update(bytes=size, elapsed_ms=elapsed * 1000, throughput_mb_s=_throughput_mb_s(size, elapsed))
+        return result
+
     @staticmethod
     def hash_email(email: str) -> str:
         """Hash email using SHA-512 (matches C# implementation)."""
         import hashlib
         return hashlib.sha512(email.encode('utf-8')).hexdigest().lower()
 
+    def _release_held_locks_sync(self, timeout_ms: int = 5000):
+        """Release held locks without an event loop (used by dispose)."""
+        held = self._held_lock_keys()
+        self._lock_heartbeats.close()
+        if not held:
+            return
+        pending = []
+        for url, message_id in held:
+            try:
+                pending.append((url, message_id, self._clr_agent_config.ReleaseLockAsync(url, message_id)))
+            except Exception as e:
+                self.debug_log(f"Could not release lock {message_id}: {e}")
+        released = 0
+        for url, message_id, clr_task in pending:
+            try:
+                if clr_task.Wait(timeout_ms) and clr_task.Result:
+                    self._on_lock_released(url, message_id)
+                    released += 1
+            except Exception as e:
+                self.debug_log(f"Could not release lock {message_id}: {e}")
+        self.debug_log(f"Released {released}/{len(held)} held locks")
+    
     def dispose(self):
         """Dispose of resources."""
         self.debug_log("Disposing agent resources")
+        self._release_held_locks_sync()
+        self._close_local_scheduler()
         self.disconnect_from_pubsub()
         self.stop_event_processing()
+        self._event_ingress.close()
         if hasattr(self._clr_agent_config, 'Dispose'):
             self._clr_agent_config.Dispose()
 
 
+# ==================================================================================
+# LLM CLIENT - REQUEST/RESPONSE CORRELATION FOR THE LLM GATEWAY
+# ==================================================================================
+
+def _llm_request_cache_key(llm_request: LLMRequest) -> str:
+    """Canonical hash of the request content (everything except the request and requester IDs)."""
+    canonical = json.dumps({
+        "provider": llm_request.provider,
+        "model": llm_request.model,
+        "messages": [[msg.role, msg.content] for msg in llm_request.messages],
+        "max_tokens": llm_request.max_tokens,
+        "temperature": llm_request.temperature,
+    }, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def _parse_llm_response(content: str) -> Optional[LLMResponse]:
+    """Parse a gateway response message (possibly wrapped one level deep); None if it is not one."""
+    try:
+        data = json.loads(content)
+    except (ValueError, TypeError):
+        return None
+    if not isinstance(data, dict):
+        return None
+    candidates = [data] + [value for value in data.values() if isinstance(value, dict)]
+    for candidate in candidates:
+        fields_by_name = {key.lower(): value for key, value in candidate.items()}
+        if "requestid" not in fields_by_name or "success" not in fields_by_name:
+            continue
+        timestamp = fields_by_name.get("timestamp")
+        try:
+            timestamp = datetime.fromisoformat(str(timestamp).replace("Z", "+00:00")) if timestamp else datetime.utcnow()
+        except ValueError:
+            timestamp = datetime.utcnow()
+        return LLMResponse(
+            request_id=str(fields_by_name.get("requestid") or ""),
+            original_request_message_id=str(fields_by_name.get("originalrequestmessageid") or ""),
+            success=bool(fields_by_name.get("success")),
+            content=fields_by_name.get("content") or "",
+            error_message=fields_by_name.get("errormessage") or "",
+            tokens_used=int(fields_by_name.get("tokensused") or 0),
+            cost=float(fields_by_name.get("cost") or 0.0),
+            provider=fields_by_name.get("provider") or "",
+            model=fields_by_name.get("model") or "",
+            timestamp=timestamp
+        )
+    return None
+
+
+class _TokenBucket:
+    """Token-rate limiter: capacity tokens_per_minute, refilled continuously."""
+
+    def __init__(self, tokens_per_minute: int):
+        self.capacity = float(tokens_per_minute)
+        self._rate = tokens_per_minute / 60.0
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock: Optional[asyncio.Lock] = None  # created on first use, inside the running loop
+
+    async def acquire(self, tokens: float):
+        tokens = min(tokens, self.capacity)
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self._rate)
+                self._updated = now
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                await asyncio.sleep((tokens - self._tokens) / self._rate)
+
+
+class LLMResponseCache:
+    """
+    Cache of successful LLM responses keyed on the canonical request hash.
+    
+    An in-memory LRU answers repeated requests without touching the gateway; an
+    optional SQLite file adds a larger tier that survives restarts and is shared by
+    agents on the same host. Entries expire after ttl_seconds, and the least
+    recently used entries are evicted when either tier exceeds its size limits.
+    
+    All SQLite work runs on one background thread: put() queues its write and
+    returns, and async code should look entries up with get_async(). Writes and
+    access-time updates are committed in batches.
+    
+    Usage:
+        cache = LLMResponseCache(ttl_seconds=3600, sqlite_path="llm-cache.db")
+        client = LLMClient(agent, url, cache=cache)
+    """
+    
+    # Access-time updates buffered before the disk thread writes them out
+    _ACCESS_BATCH = 64
+    
+    def __init__(self, max_entries: int = 1024, max_bytes: int = 64 * 1024 * 1024,
+                 ttl_seconds: Optional[float] = 3600, sqlite_path: Optional[str] = None,
+                 max_disk_bytes: int = 512 * 1024 * 1024):
+        """
+        Args:
+            max_entries: Maximum responses kept in memory
+            max_bytes: Maximum serialized size of the responses kept in memory
+            ttl_seconds: Lifetime of an entry in both tiers (None for no expiry)
+            sqlite_path: SQLite database file for the disk tier (disabled if None)
+            max_disk_bytes: Maximum serialized size of the disk tier
+        """
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        self._ttl = ttl_seconds
+        self._max_disk_bytes = max_disk_bytes
+        self._lock = threading.Lock()
+        # key -> (expires_at, size, response)
+        self._memory: "collections.OrderedDict[str, Tuple[float, int, LLMResponse]]" = collections.OrderedDict()
+        self._memory_bytes = 0
+        self._stats = {"hits": 0, "memory_hits": 0, "disk_hits": 0, "misses": 0,
+                       "evictions": 0, "expirations": 0, "cost_saved": 0.0, "tokens_saved": 0}
+        # Disk tier state below is only touched on the disk thread, except the
+        # pending buffers, which are guarded by _lock
+        self._db: Optional[sqlite3.Connection] = None
+        self._disk: Optional[ThreadPoolExecutor] = None
+        self._disk_entries = 0
+        self._disk_bytes = 0
+        self._pending_writes: Dict[str, Tuple[str, int, float, float]] = {}  # key -> (payload, size, expires_at, now)
+        self._pending_access: Dict[str, float] = {}  # key -> last access time
+        self._flush_scheduled = False
+        if sqlite_path:
+            self._disk = ThreadPoolExecutor(max_workers=1, thread_name_prefix="hexaeight-llm-cache")
+            self._disk.submit(self._open_disk, sqlite_path).result()
+    
+    def get(self, key: str) -> Optional[LLMResponse]:
+        """Return the cached response for key, or None. Waits for the disk tier; prefer get_async() on a loop."""
+        response = self._get_memory(key)
+        if response is None and self._disk is not None:
+            response = self._disk.submit(self._get_disk, key).result()
+        if response is None:
+            self._record_miss()
+        return response
+    
+    async def get_async(self, key: str) -> Optional[LLMResponse]:
+        """get() that awaits the disk tier instead of blocking the event loop."""
+        response = self._get_memory(key)
+        if response is None and self._disk is not None:
+            response = await asyncio.wrap_future(self._disk.submit(self._get_disk, key))
+        if response is None:
+            self._record_miss()
+        return response
+    
+    def put(self, key: str, response: LLMResponse):
+        """Cache a successful response (the disk write happens in the background); failed responses are ignored."""
+        if not response.success:
+            return
+        payload = self._serialize(response)
+        size = len(payload.encode("utf-8"))
+        now = time.time()
+        expires_at = now + self._ttl if self._ttl is not None else float("inf")
+        with self._lock:
+            self._store_memory(key, expires_at, size, response)
+            if self._disk is None:
+                return
+            self._pending_writes[key] = (payload, size, expires_at, now)
+            if self._flush_scheduled:
+                return
+            self._flush_scheduled = True
+        self._disk.submit(self._flush_pending)
+    
+    def clear(self):
+        """Remove every entry from both tiers."""
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+            self._pending_writes.clear()
+            self._pending_access.clear()
+        if self._disk is not None:
+            self._disk.submit(self._clear_disk).result()
+    
+    def statistics(self) -> Dict[str, Any]:
+        """Hits (memory/disk), misses, hit ratio, evictions, bytes held and cost saved."""
+        with self._lock:
+            stats = dict(self._stats, entries=len(self._memory), bytes=self._memory_bytes)
+        if self._disk is not None:
+            stats.update(disk_entries=self._disk_entries, disk_bytes=self._disk_bytes)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_ratio"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
+    
+    def close(self):
+        """Write out buffered changes and close the disk tier."""
+        disk, self._disk = self._disk, None
+        if disk is not None:
+            disk.submit(self._close_disk).result()
+            disk.shutdown()
+    
+    def _get_memory(self, key: str) -> Optional[LLMResponse]:
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                return None
+            if entry[0] > now:
+                self._memory.move_to_end(key)
+                self._record_hit("memory_hits", entry[2])
+                return entry[2]
+            self._drop_memory(key)
+            self._stats["expirations"] += 1
+            return None
+    
+    def _record_hit(self, tier: str, response: LLMResponse):
+        self._stats["hits"] += 1
+        self._stats[tier] += 1
+        self._stats["cost_saved"] += response.cost
+        self._stats["tokens_saved"] += response.tokens_used
+    
+    def _record_miss(self):
+        with self._lock:
+            self._stats["misses"] += 1
+    
+    def _store_memory(self, key: str, expires_at: float, size: int, response: LLMResponse):
+        if key in self._memory:
+            self._drop_memory(key)
+        self._memory[key] = (expires_at, size, response)
+        self._memory_bytes += size
+        while self._memory and (len(self._memory) > self._max_entries or self._memory_bytes > self._max_bytes):
+            _, (_, evicted_size, _) = self._memory.popitem(last=False)
+            self._memory_bytes -= evicted_size
+            self._stats["evictions"] += 1
+    
+    def _drop_memory(self, key: str):
+        _, size, _ = self._memory.pop(key)
+        self._memory_bytes -= size
+    
+    # Disk thread only
+    
+    def _open_disk(self, sqlite_path: str):
+        self._db = sqlite3.connect(sqlite_path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS llm_responses ("
+            "key TEXT PRIMARY KEY, response TEXT NOT NULL, size INTEGER NOT NULL, "
+            "expires_at REAL NOT NULL, last_access REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS llm_responses_expires_at ON llm_responses (expires_at)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS llm_responses_last_access ON llm_responses (last_access)")
+        self._db.commit()
+        # The one full scan; the totals are kept up to date from here on
+        self._disk_entries, self._disk_bytes = self._db.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_responses"
+        ).fetchone()
+    
+    def _get_disk(self, key: str) -> Optional[LLMResponse]:
+        if self._db is None:
+            return None
+        self._flush_pending()
+        now = time.time()
+        row = self._db.execute(
+            "SELECT response, size, expires_at FROM llm_responses WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        if row[2] <= now:
+            self._delete_disk(key, row[1])
+            self._db.commit()
+            with self._lock:
+                self._stats["expirations"] += 1
+            return None
+        response = self._deserialize(row[0])
+        with self._lock:
+            self._pending_access[key] = now
+            flush = len(self._pending_access) >= self._ACCESS_BATCH
+            self._store_memory(key, row[2], row[1], response)
+            self._record_hit("disk_hits", response)
+        if flush:
+            self._flush_pending()
+        return response
+    
+    def _flush_pending(self):
+        """Write queued responses and access times in one transaction."""
+        with self._lock:
+            writes, self._pending_writes = self._pending_writes, {}
+            accesses, self._pending_access = self._pending_access, {}
+            self._flush_scheduled = False
+        if self._db is None or not (writes or accesses):
+            return
+        for key, (payload, size, expires_at, now) in writes.items():
+            previous = self._db.execute("SELECT size FROM llm_responses WHERE key = ?", (key,)).fetchone()
+            if previous is not None:
+                self._disk_entries -= 1
+                self._disk_bytes -= previous[0]
+            self._db.execute(
+                "INSERT OR REPLACE INTO llm_responses (key, response, size, expires_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?)", (key, payload, size, expires_at, now)
+            )
+            self._disk_entries += 1
+            self._disk_bytes += size
+        if accesses:
+            self._db.executemany("UPDATE llm_responses SET last_access = ? WHERE key = ?",
+                                 [(accessed, key) for key, accessed in accesses.items()])
+        if writes:
+            self._evict_disk(time.time())
+        self._db.commit()
+    
+    def _delete_disk(self, key: str, size: int):
+        self._db.execute("DELETE FROM llm_responses WHERE key = ?", (key,))
+        self._disk_entries -= 1
+        self._disk_bytes -= size
+    
+    def _evict_disk(self, now: float):
+        for key, size in self._db.execute(
+            "SELECT key, size FROM llm_responses WHERE expires_at <= ?", (now,)
+        ).fetchall():
+            self._delete_disk(key, size)
+        if self._disk_bytes <= self._max_disk_bytes:
+            return
+        evicted = 0
+        for key, size in self._db.execute(
+            "SELECT key, size FROM llm_responses ORDER BY last_access"
+        ).fetchall():
+            if self._disk_bytes <= self._max_disk_bytes:
+                break
+            self._delete_disk(key, size)
+            evicted += 1
+        with self._lock:
+            self._stats["evictions"] += evicted
+    
+    def _clear_disk(self):
+        if self._db is not None:
+            self._db.execute("DELETE FROM llm_responses")
+            self._db.commit()
+            self._disk_entries = self._disk_bytes = 0
+    
+    def _close_disk(self):
+        if self._db is not None:
+            self._flush_pending()
+            self._db.close()
+            self._db = None
+    
+    @staticmethod
+    def _serialize(response: LLMResponse) -> str:
+        data = asdict(response)
+        data["timestamp"] = response.timestamp.isoformat()
+        return json.dumps(data, ensure_ascii=False)
+    
+    @staticmethod
+    def _deserialize(payload: str) -> LLMResponse:
+        data = json.loads(payload)
+        data["timestamp"] = datetime.fromisoformat(data["timestamp"])
+        return LLMResponse(**data)
+
+
+class LLMClient:
+    """
+    Sends LLM requests through an agent and resolves each one to its LLMResponse.
+    
+    Responses are matched to requests by request ID as they arrive (and by default
+    are not passed on as message_received events). Per-provider limits cap how many
+    requests are in flight at the gateway and how many tokens are spent per minute,
+    and identical requests already in flight share one gateway call. With a cache,
+    repeated requests are answered from it without a gateway call.
+    
+    Usage:
+        client = LLMClient(agent, url, provider_concurrency={"openai": 8},
+                           tokens_per_minute={"openai": 90000})
+        response = await client.request(LLMRequest(model="gpt-4o", messages=[...]))
+        print(response.content)
+    """
+    
+    def __init__(self, agent: "HexaEightAgent", pubsub_server_url: str,
+                 provider_concurrency: Optional[Dict[str, int]] = None, default_concurrency: int = 4,
+                 tokens_per_minute: Optional[Dict[str, int]] = None, timeout: float = 120.0,
+                 consume_responses: bool = True, cache: Optional[LLMResponseCache] = None,
+                 cache_nonzero_temperature: bool = False):
+        """
+        Args:
+            agent: Connected HexaEightAgent
+            pubsub_server_url: PubSub server URL the gateway is reached through
+            provider_concurrency: Maximum in-flight requests per provider
+            default_concurrency: Limit for providers not in provider_concurrency
+            tokens_per_minute: Optional token budget per provider; a request costs its
+                max_tokens plus an estimate of its prompt tokens
+            timeout: Seconds to wait for a response before failing the request
+            consume_responses: Keep correlated responses out of the agent's events
+            cache: Optional LLMResponseCache for successful responses
+            cache_nonzero_temperature: Also cache requests with temperature > 0,
+                whose answers are not deterministic (off by default)
+        """
+        self._agent = agent
+        self._url = pubsub_server_url
+        self._provider_concurrency = dict(provider_concurrency or {})
+        self._default_concurrency = default_concurrency
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._buckets = {provider: _TokenBucket(tpm) for provider, tpm in (tokens_per_minute or {}).items()}
+        self._timeout = timeout
+        self._consume_responses = consume_responses
+        self._cache = cache
+        self._cache_nonzero_temperature = cache_nonzero_temperature
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._pending: Dict[str, asyncio.Future] = {}  # request_id -> response future
+        self._inflight: Dict[str, asyncio.Future] = {}  # content key -> caller future
+        self._stats = {"requests": 0, "sent": 0, "deduplicated": 0, "responses": 0,
+                       "failures": 0, "timeouts": 0}
+        agent._message_interceptors.append(self._intercept)
+    
+    def submit(self, llm_request: LLMRequest) -> "asyncio.Future[LLMResponse]":
+        """Queue a request; the returned future resolves to its LLMResponse (never raises)."""
+        loop = asyncio.get_running_loop()
+        self._loop = loop
+        self._stats["requests"] += 1
+        key = _llm_request_cache_key(llm_request)
+        
+        cacheable = self._is_cacheable(llm_request)
+        if cacheable:
+            # Memory tier only here; the disk tier is checked off the loop in _run
+            cached = self._cache._get_memory(key)
+            if cached is not None:
+                future = loop.create_future()
+                future.set_result(replace(cached, request_id=llm_request.request_id))
+                return future
+        
+        existing = self._inflight.get(key)
+        if existing is not None and not existing.done():
+            self._stats["deduplicated"] += 1
+            return self._follow(existing, llm_request.request_id)
+        
+        future = loop.create_future()
+        self._inflight[key] = future
+        future.add_done_callback(lambda done: self._inflight.pop(key, None) if self._inflight.get(key) is done else None)
+        loop.create_task(self._run(llm_request, future, key if cacheable else None))
+        return future
+    
+    async def request(self, llm_request: LLMRequest) -> LLMResponse:
+        """Send a request and wait for its response."""
+        # Shielded: the future may be shared with identical requests from other callers
+        return await asyncio.shield(self.submit(llm_request))
+    
+    async def request_many(self, llm_requests: List[LLMRequest]) -> List[LLMResponse]:
+        """Send many requests (subject to the limits) and return their responses in order."""
+        return list(await asyncio.gather(*(self.request(llm_request) for llm_request in llm_requests)))
+    
+    def statistics(self) -> Dict[str, Any]:
+        stats = dict(self._stats, pending=len(self._pending), in_flight=len(self._inflight))
+        if self._cache is not None:
+            stats["cache"] = self._cache.statistics()
+        return stats
+    
+    def close(self):
+        """Stop correlating responses and fail requests still waiting for one."""
+        try:
+            self._agent._message_interceptors.remove(self._intercept)
+        except ValueError:
+            pass
+        for request_id, future in list(self._pending.items()):
+            _set_future_result_if_pending(future, self._failure(request_id, "LLM client closed"))
+    
+    def _follow(self, source: asyncio.Future, request_id: str) -> "asyncio.Future[LLMResponse]":
+        """A future that resolves to source's response, carrying this caller's request_id."""
+        future = source.get_loop().create_future()
+        
+        def _copy(done: asyncio.Future):
+            if done.cancelled():
+                response = self._failure(request_id, "LLM request was cancelled")
+            else:
+                response = replace(done.result(), request_id=request_id)
+            _set_future_result_if_pending(future, response)
+        
+        source.add_done_callback(_copy)
+        return future
+    
+    def _semaphore(self, provider: str) -> asyncio.Semaphore:
+        semaphore = self._semaphores.get(provider)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self._provider_concurrency.get(provider, self._default_concurrency))
+            self._semaphores[provider] = semaphore
+        return semaphore
+    
+    @staticmethod
+    def _estimated_tokens(llm_request: LLMRequest) -> int:
+        # Roughly four characters per token for the prompt, plus the completion budget
+        return llm_request.max_tokens + sum(len(msg.content) for msg in llm_request.messages) // 4
+    
+    @staticmethod
+    def _failure(request_id: str, error: str) -> LLMResponse:
+        return LLMResponse(request_id=request_id, original_request_message_id="", success=False,
+                           error_message=error)
+    
+    def _is_cacheable(self, llm_request: LLMRequest) -> bool:
+        return self._cache is not None and (self._cache_nonzero_temperature or llm_request.temperature == 0)
+    
+    async def _run(self, llm_request: LLMRequest, future: asyncio.Future, cache_key: Optional[str] = None):
+        if cache_key is not None:
+            cached = await self._cache.get_async(cache_key)
+            if cached is not None:
+                _set_future_result_if_pending(future, replace(cached, request_id=llm_request.request_id))
+                return
+        response = await self._send_and_wait(llm_request)
+        if not response.success:
+            self._stats["failures"] += 1
+        elif cache_key is not None:
+            self._cache.put(cache_key, response)
+        _set_future_result_if_pending(future, response)
+    
+    async def _send_and_wait(self, llm_request: LLMRequest) -> LLMResponse:
+        request_id = llm_request.request_id
+        async with self._semaphore(llm_request.provider):
+            bucket = self._buckets.get(llm_request.provider)
+            if bucket is not None:
+                await bucket.acquire(self._estimated_tokens(llm_request))
+            
+            response_future = asyncio.get_running_loop().create_future()
+            self._pending[request_id] = response_future
+            try:
+                if not await self._agent.send_llm_request(self._url, llm_request):
+                    return self._failure(request_id, "LLM request could not be sent")
+                self._stats["sent"] += 1
+                try:
+                    return await asyncio.wait_for(response_future, self._timeout)
+                except asyncio.TimeoutError:
+                    self._stats["timeouts"] += 1
+                    return self._failure(request_id, f"No response within {self._timeout}s")
+            finally:
+                self._pending.pop(request_id, None)
+    
+    def _intercept(self, event: MessageReceivedEvent) -> bool:
+        """
+        Runs on the CLR callback thread for every received message.
+        
+        Cheap flags are checked first, and the content is only read while requests
+        are pending. Only a message that is the response to a pending request is
+        taken; everything else goes on as an ordinary message_received event right
+        away, in arrival order. The waiting request is resolved on the event loop.
+        """
+        loop = self._loop
+        pending = tuple(self._pending)
+        if not pending or loop is None:
+            return False
+        if event.is_task_message or event.is_from_self or event.is_schedule_notification or event.is_lock_expired:
+            return False
+        content = event.decrypted_content
+        if not any(request_id and request_id in content for request_id in pending):
+            return False
+        response = _parse_llm_response(content)
+        if response is None or response.request_id not in pending:
+            return False
+        try:
+            loop.call_soon_threadsafe(self._resolve, response)
+        except RuntimeError:
+            return False  # Loop closed
+        return self._consume_responses
+    
+    def _resolve(self, response: LLMResponse):
+        """Hand a response to the request waiting for it. Runs on the event loop."""
+        future = self._pending.get(response.request_id)
+        if future is not None:
+            self._stats["responses"] += 1
+            _set_future_result_if_pending(future, response)
+
+
+# ==================================================================================
+# WORKER POOL - MANY AGENT PROCESSES FROM ONE SUPERVISOR
+# ==================================================================================
+
+@dataclass
+class AgentWorkerConfig:
+    """Configuration for one agent worker process."""
+    config_file: str
+    agent_type: str = "child"  # "parent" or "child"
+    agent_password: str = ""   # Required for child agents
+    client_id: str = ""
+    token_server_url: str = ""
+    loadenv: bool = False
+    logging: bool = False
+    debug_mode: bool = False
+    name: str = ""
+
+
+def _apply_worker_fast_import(fast_import: Optional[bool]):
+    """Set fast import mode in a worker; None keeps whatever the supervisor's environment says."""
+    if fast_import is not None:
+        os.environ[FAST_IMPORT_ENV] = "1" if fast_import else "0"
+
+
+def _prewarm_worker_runtime(fast_import: Optional[bool] = None):
+    """Worker-pool helper: run the .NET bootstrap once so the DLL integrity cache is filled."""
+    _apply_worker_fast_import(fast_import)
+    warmup()
+
+
+def _run_agent_worker(worker_main: Callable, config: AgentWorkerConfig, fast_import: Optional[bool] = None):
+    """Worker-pool entry point: create and load the agent, then run worker_main(agent, config)."""
+    _apply_worker_fast_import(fast_import)
+    warmup()
+
+    agent = HexaEightAgent(debug_mode=config.debug_mode)
+    try:
+        if config.agent_type == "parent":
+            loaded = agent.load_ai_parent_agent(
+                config.config_file, config.loadenv, config.client_id,
+                config.token_server_url, config.logging
+            )
+        else:
+            loaded = agent.load_ai_child_agent(
+                config.agent_password, config.config_file, config.loadenv,
+                config.client_id, config.token_server_url, config.logging
+            )
+        if not loaded:
+            raise HexaEightAgentError(f"Failed to load {config.agent_type} agent from {config.config_file}")
+
+        result = worker_main(agent, config)
+        if asyncio.iscoroutine(result):
+            asyncio.run(result)
+    finally:
+        agent.dispose()
+
+
+class HexaEightWorkerPool:
+    """
+    Supervisor that runs one HexaEightAgent per worker process.
+
+    A loaded .NET runtime cannot survive fork(), so the supervisor never loads it.
+    Instead it pays the shared start-up costs once and lets workers reuse them:
+
+    1. With fast import mode (HEXAEIGHT_FAST_IMPORT=1 in the supervisor's
+       environment, or fast_import=True), DLL integrity is verified once in a
+       short-lived process that fills the integrity cache, and workers skip
+       JWT verification. Otherwise every worker verifies the DLLs in full.
+    2. Workers are started from a forkserver that has already imported this
+       library, so the pure-Python pages are shared copy-on-write. Platforms
+       without forkserver fall back to spawn.
+    3. Each worker loads coreclr itself, loads its agent from its
+       AgentWorkerConfig and runs worker_main(agent, config).
+
+    worker_main must be a module-level function (sync or async) so it can be
+    sent to the workers.
+
+    Usage:
+        async def serve(agent, config):
+            await agent.connect_to_pubsub(PUBSUB_URL)
+            await agent.start_event_processing(concurrency=8)
+
+        pool = HexaEightWorkerPool(serve, [
+            AgentWorkerConfig("child_01.json", agent_password="..."),
+            AgentWorkerConfig("child_02.json", agent_password="..."),
+        ])
+        pool.start()
+        pool.join()
+    """
+
+    def __init__(self, worker_main: Callable, worker_configs: List[AgentWorkerConfig],
+                 start_method: Optional[str] = None, restart_on_failure: bool = False,
+                 max_restarts: int = 3, fast_import: Optional[bool] = None):
+        if not worker_configs:
+            raise ValueError("At least one worker configuration is required")
+        self._worker_main = worker_main
+        self._configs = list(worker_configs)
+        self._restart_on_failure = restart_on_failure
+        self._max_restarts = max_restarts
+        self._fast_import = fast_import
+        self._restarts = [0] * len(self._configs)
+        self._processes: List[Optional[multiprocessing.process.BaseProcess]] = [None] * len(self._configs)
+
+        if start_method is None:
+            start_method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        self._context = multiprocessing.get_context(start_method)
+        if start_method == "forkserver":
+            self._context.set_forkserver_preload([__name__])
+
+        self.startup_time_ms: Optional[float] = None
+
+    @property
+    def processes(self) -> List[Optional[multiprocessing.process.BaseProcess]]:
+        return list(self._processes)
+
+    def _start_worker(self, index: int):
+        config = self._configs[index]
+        process = self._context.Process(
+            target=_run_agent_worker,
+            args=(self._worker_main, config, self._fast_import),
+            name=config.name or f"hexaeight-agent-{index}",
+            daemon=False,
+        )
+        process.start()
+        self._processes[index] = process
+
+    def start(self):
+        """Verify DLL integrity once (fast import mode only), then start all workers."""
+        started = time.perf_counter()
+
+        fast_import = self._fast_import if self._fast_import is not None else _fast_import_enabled()
+        if fast_import:
+            prewarm = self._context.Process(target=_prewarm_worker_runtime, args=(self._fast_import,),
+                                            name="hexaeight-prewarm")
+            prewarm.start()
+            prewarm.join()
+            if prewarm.exitcode != 0:
+                raise HexaEightAgentError(f"Runtime prewarm failed with exit code {prewarm.exitcode}")
+
+        for index in range(len(self._configs)):
+            self._start_worker(index)
+
+        self.startup_time_ms = (time.perf_counter() - started) * 1000
+        _library_debug_log(f"Started {len(self._configs)} agent workers in {self.startup_time_ms:.1f}ms")
+
+    def join(self, timeout: Optional[float] = None, poll_interval: float = 0.5) -> bool:
+        """
+        Wait for all workers to exit, restarting failed ones if configured.
+
+        Returns:
+            True if every worker has exited, False if the timeout expired first
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            running = False
+            for index, process in enumerate(self._processes):
+                if process is None:
+                    continue
+                if process.exitcode is None:
+                    running = True
+                elif (process.exitcode != 0 and self._restart_on_failure
+                      and self._restarts[index] < self._max_restarts):
+                    self._restarts[index] += 1
+                    _library_debug_log(
+                        f"Restarting worker {process.name} (exit code {process.exitcode}, "
+                        f"restart {self._restarts[index]}/{self._max_restarts})"
+                    )
+                    self._start_worker(index)
+                    running = True
+            if not running:
+                return True
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(poll_interval)
+
+    def stop(self, timeout: float = 10.0):
+        """Terminate all workers, killing any that do not exit within timeout seconds."""
+        self._restart_on_failure = False
+        for process in self._processes:
+            if process is not None and process.is_alive():
+                process.terminate()
+        deadline = time.monotonic() + timeout
+        for process in self._processes:
+            if process is None:
+                continue
+            process.join(max(0.0, deadline - time.monotonic()))
+            if process.is_alive():
+                process.kill()
+                process.join()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+
+def run_agent_workers(worker_main: Callable, worker_configs: List[AgentWorkerConfig],
+                      start_method: Optional[str] = None, restart_on_failure: bool = False,
+                      fast_import: Optional[bool] = None) -> List[Optional[int]]:
+    """
+    Supervisor entry point: start one agent worker per config and wait for them.
+
+    fast_import is passed to HexaEightWorkerPool; None follows HEXAEIGHT_FAST_IMPORT.
+
+    Returns:
+        Exit code of each worker, in config order
+    """
+    pool = HexaEightWorkerPool(worker_main, worker_configs, start_method, restart_on_failure,
+                               fast_import=fast_import)
+    pool.start()
+    try:
+        pool.join()
+    except KeyboardInterrupt:
+        pool.stop()
+    return [process.exitcode if process is not None else None for process in pool.processes]
+
+
 # ==================================================================================
 # CONVENIENCE ALIASES AND BACKWARDS COMPATIBILITY
 # ==================================================================================
@@ -2092,6 +5687,14 @@ def is_library_debug_enabled() -> bool:
     """Check if library debug mode is enabled."""
     return LIBRARY_DEBUG
 
+def get_import_metrics() -> Dict[str, Any]:
+    """
+    Get timings of the .NET bootstrap in milliseconds: clr_load_ms,
+    assembly_load_ms, integrity_check_ms and total_ms, plus
+    integrity_cache_hits (DLLs skipped in fast import mode).
+    """
+    return dict(_IMPORT_METRICS)
+
 # ==================================================================================
 # EXAMPLE FILES ACCESS HELPER
 # ==================================================================================
@@ -206,6 +206,103 @@ async def test_queue_based_signing():
     return success_count == len(results)
 
 
+async def test_batch_signing():
+    """Test 5: Batch signing through the signing queue."""
+    print_separator("TEST 5: Batch Signing")
+
+    agent = HexaEightAgent(debug_mode=False)
+    agent.set_signing_folder(SIGNING_FOLDER)
+
+    batch = [(f"batch{i}@test.com", f"Batch message #{i} - timestamp: {time.time()}") for i in range(50)]
+
+    print(f"\n📤 Signing batch of {len(batch)} messages...")
+    started = time.perf_counter()
+    results = await agent.sign_messages_async(batch)
+    elapsed = time.perf_counter() - started
+    print(f"⏱️  Batch completed in {elapsed:.2f}s ({len(batch) / elapsed:.1f} messages/s)")
+
+    # Results come back in input order; spot-check by verifying a few of them
+    for (email, message), result in list(zip(batch, results))[:3]:
+        if not result["success"]:
+            print(f"❌ Signing failed for {email}: {result.get('error')}")
+            return False
+        verify_result = await agent.verify_jwt_async(result["jwt"], message, email)
+        if not verify_result["verified"]:
+            print(f"❌ Verification failed for {email}: {verify_result.get('error')}")
+            return False
+        print(f"   ✅ {email} signed in {result['elapsed_ms']:.1f}ms and verified")
+
+    await agent.stop_signing_queue_async()
+
+    success_count = sum(1 for r in results if r["success"])
+    print(f"\n📊 {success_count}/{len(results)} messages signed")
+    return success_count == len(results)
+
+
+async def test_batch_verification():
+    """Test 6: Parallel batch verification with the verified-token cache."""
+    print_separator("TEST 6: Batch Verification")
+
+    agent = HexaEightAgent(debug_mode=False)
+    agent.set_signing_folder(SIGNING_FOLDER)
+
+    email = "verify@test.com"
+    batch = [(email, f"Verify message #{i} - timestamp: {time.time()}") for i in range(20)]
+    signed = await agent.sign_messages_async(batch)
+    await agent.stop_signing_queue_async()
+    items = [(result["jwt"], message, email) for (_, message), result in zip(batch, signed)]
+
+    print(f"\n🔍 Verifying batch of {len(items)} JWTs (cold cache)...")
+    started = time.perf_counter()
+    cold = await agent.verify_many_async(items, use_cache=True)
+    print(f"⏱️  Cold batch completed in {time.perf_counter() - started:.2f}s")
+
+    print("🔍 Verifying the same batch again (warm cache)...")
+    started = time.perf_counter()
+    warm = await agent.verify_many_async(items, use_cache=True)
+    print(f"⏱️  Warm batch completed in {(time.perf_counter() - started) * 1000:.1f}ms")
+
+    stats = agent.get_verification_cache_statistics()
+    print(f"📊 Cache: {stats['hits']} hits, {stats['misses']} misses, hit ratio {stats['hit_ratio']:.0%}")
+
+    # A tampered message must not be answered from the cache
+    tampered = await agent.verify_many_async([(items[0][0], items[0][1] + " (tampered)", email)], use_cache=True)
+    if tampered[0]["verified"]:
+        print("❌ Tampered message verified")
+        return False
+
+    return (all(r["verified"] for r in cold)
+            and all(r["verified"] and r.get("cached") for r in warm))
+
+
+async def test_streaming_signing():
+    """Test 7: Streaming signing and verification of large content."""
+    print_separator("TEST 7: Streaming Signing")
+
+    agent = HexaEightAgent(debug_mode=False)
+    agent.set_signing_folder(SIGNING_FOLDER)
+
+    email = "stream@test.com"
+    chunk = os.urandom(1 << 20)
+
+    async def content():
+        for _ in range(64):
+            yield chunk
+
+    print("\n📤 Signing 64 MB from an async iterator...")
+    signed = await agent.sign_stream_async(email, content(), size=64 * len(chunk))
+    await agent.stop_signing_queue_async()
+    if not signed["success"]:
+        print(f"❌ Streaming signing failed: {signed.get('error')}")
+        return False
+    print(f"   ✅ Signed {signed['bytes']} bytes at {signed['throughput_mb_s']} MB/s")
+
+    print("🔍 Verifying against the same content...")
+    verified = await agent.verify_stream_async(signed["jwt"], content(), email)
+    print(f"   {'✅' if verified['verified'] else '❌'} Verified at {verified['throughput_mb_s']} MB/s")
+    return verified["verified"]
+
+
 async def run_all_tests():
     """Run all integration tests."""
     print("\n" + "=" * 80)
@@ -218,6 +315,9 @@ async def run_all_tests():
         ("Complete JWT Message JSON", test_jwt_message_json),
         ("Verification Without Signing Env", test_verification_without_signing_env),
         ("Queue-Based Signing", test_queue_based_signing),
+        ("Batch Signing", test_batch_signing),
+        ("Batch Verification", test_batch_verification),
+        ("Streaming Signing", test_streaming_signing),
     ]
 
     results = []
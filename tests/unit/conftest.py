@@ -0,0 +1,48 @@
+"""Fixtures for unit tests that exercise the pure-Python layer without the .NET runtime."""
+
+import pytest
+
+import hexaeight_agent.hexaeight_agent as agent_module
+from hexaeight_agent.hexaeight_agent import HexaEightAgent
+
+
+class CompletedTask:
+    """Stands in for an already completed System.Threading.Tasks.Task."""
+    IsCompleted = True
+    IsCanceled = False
+    IsFaulted = False
+
+    def __init__(self, result=None):
+        self.Result = result
+
+
+class _EventSlot:
+    """Accepts `config.Event += handler` like a .NET event."""
+
+    def __init__(self):
+        self.handlers = []
+
+    def __iadd__(self, handler):
+        self.handlers.append(handler)
+        return self
+
+
+class FakeAgentConfig:
+    """Minimal stand-in for the CLR AgentConfig; tests add the methods they need."""
+
+    def __init__(self):
+        for name in ("MessageReceived", "TaskReceived", "TaskStepReceived", "TaskStepUpdated",
+                     "TaskCompleted", "LockExpiredNotification", "ScheduledTaskCreationReceived"):
+            setattr(self, name, _EventSlot())
+
+
+@pytest.fixture
+def make_agent(monkeypatch):
+    """Build a HexaEightAgent whose CLR AgentConfig is the given fake."""
+    monkeypatch.setattr(agent_module, "_ensure_agent_available", lambda: None)
+
+    def factory(config=None, **kwargs):
+        monkeypatch.setattr(agent_module, "CSharpAgentConfig", lambda: config or FakeAgentConfig())
+        return HexaEightAgent(**kwargs)
+
+    return factory
@@ -0,0 +1,35 @@
+"""Unit tests for batched event delivery."""
+
+import asyncio
+
+
+def test_event_batches_yield_in_arrival_order(make_agent):
+    agent = make_agent()
+    for i in range(7):
+        agent._event_ingress.put("message_received", i)
+
+    async def scenario():
+        batches = []
+        async for batch in agent.event_batches(max_batch=3, max_wait_ms=5):
+            batches.append([data for _, data in batch])
+            if sum(map(len, batches)) == 7:
+                break
+        return batches
+
+    assert asyncio.run(scenario()) == [[0, 1, 2], [3, 4, 5], [6]]
+
+
+def test_batch_mode_calls_handlers_once_per_type_per_batch(make_agent):
+    agent = make_agent()
+    calls = []
+    agent.register_event_handler("message_received", lambda items: calls.append(("m", items)))
+    agent.register_event_handler("task_received", lambda items: calls.append(("t", items)))
+    for event_type, data in [("message_received", 1), ("task_received", "a"),
+                             ("message_received", 2), ("message_received", 3)]:
+        agent._event_ingress.put(event_type, data)
+    agent._event_ingress.close()
+
+    asyncio.run(agent.start_event_processing(batch_mode=True, max_batch=10, max_wait_ms=5))
+
+    assert calls == [("m", [1, 2, 3]), ("t", ["a"])]
+    assert not agent._running_event_loop
@@ -0,0 +1,65 @@
+"""Unit tests for concurrent handler dispatch with per-key ordering."""
+
+import asyncio
+
+from hexaeight_agent.hexaeight_agent import _EventDispatcher, _default_event_ordering_key
+
+
+class RecordingAgent:
+    def __init__(self, delays=None):
+        self.seen = []
+        self.active = 0
+        self.max_active = 0
+        self._delays = delays or {}
+
+    async def _dispatch_event(self, event_type, payload, executor=None):
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        await asyncio.sleep(self._delays.get(payload, 0.001))
+        self.seen.append(payload)
+        self.active -= 1
+
+
+def test_same_key_events_keep_arrival_order():
+    # Integer keys hash to themselves, so keys 0 and 1 always land on different workers
+    agent = RecordingAgent(delays={("a", 0): 0.02})
+
+    async def scenario():
+        dispatcher = _EventDispatcher(agent, concurrency=4)
+        for i in range(5):
+            await dispatcher.submit(0, "message_received", ("a", i))
+            await dispatcher.submit(1, "message_received", ("b", i))
+        await dispatcher.close()
+
+    asyncio.run(scenario())
+    assert [i for key, i in agent.seen if key == "a"] == list(range(5))
+    assert [i for key, i in agent.seen if key == "b"] == list(range(5))
+    # "b" events are not held up behind the slow first "a" event
+    assert agent.seen.index(("b", 0)) < agent.seen.index(("a", 0))
+
+
+def test_event_type_limit_caps_running_handlers():
+    agent = RecordingAgent()
+
+    async def scenario():
+        dispatcher = _EventDispatcher(agent, concurrency=8, event_type_limits={"message_received": 2})
+        for i in range(16):
+            await dispatcher.submit(i, "message_received", i)
+        await dispatcher.close()
+
+    asyncio.run(scenario())
+    assert sorted(agent.seen) == list(range(16))
+    assert agent.max_active == 2
+
+
+def test_default_ordering_keys():
+    class Message:
+        sender_internal_id = "internal-1"
+        sender = "sender@example.com"
+
+    class Step:
+        parent_task_id = "task-1"
+
+    assert _default_event_ordering_key("message_received", Message()) == "internal-1"
+    assert _default_event_ordering_key("task_step_updated", Step()) == "task-1"
+    assert _default_event_ordering_key("custom", object()) == "custom"
@@ -0,0 +1,101 @@
+"""Unit tests for the CLR-to-asyncio event buffer (no .NET runtime required)."""
+
+import asyncio
+import threading
+
+import pytest
+
+from hexaeight_agent.hexaeight_agent import OverflowPolicy, _EventIngress, _EventIngressClosed
+
+
+def drain(ingress):
+    items = []
+    while True:
+        item = ingress.get_nowait()
+        if item is None:
+            return items
+        items.append(item)
+
+
+def test_unbounded_by_default_never_drops():
+    ingress = _EventIngress()
+    for i in range(20000):
+        assert ingress.put("message_received", i)
+    assert [data for _, data in drain(ingress)] == list(range(20000))
+    assert ingress.statistics()["event_types"]["message_received"]["dropped"] == 0
+
+
+def test_drop_oldest_evicts_oldest_and_counts_per_type():
+    ingress = _EventIngress(3, OverflowPolicy.DROP_OLDEST)
+    ingress.put("a", 1)
+    ingress.put("b", 2)
+    ingress.put("a", 3)
+    assert ingress.put("b", 4)
+    assert [data for _, data in drain(ingress)] == [2, 3, 4]
+    counters = ingress.statistics()["event_types"]
+    assert counters["a"]["dropped"] == 1
+    assert counters["b"]["dropped"] == 0
+
+
+def test_drop_newest_rejects_incoming_event():
+    ingress = _EventIngress(2, "drop_newest")
+    ingress.put("a", 1)
+    ingress.put("a", 2)
+    assert not ingress.put("a", 3)
+    assert [data for _, data in drain(ingress)] == [1, 2]
+
+
+def test_spill_to_disk_preserves_order(tmp_path):
+    ingress = _EventIngress(2, OverflowPolicy.SPILL_TO_DISK, str(tmp_path))
+    for i in range(10):
+        assert ingress.put("a", {"n": i})
+    stats = ingress.statistics()
+    assert stats["memory_depth"] == 2 and stats["spilled_depth"] == 8
+    assert [data["n"] for _, data in drain(ingress)] == list(range(10))
+    assert ingress.statistics()["event_types"]["a"]["spilled"] == 8
+
+
+def test_block_waits_for_consumer():
+    ingress = _EventIngress(1, OverflowPolicy.BLOCK)
+    ingress.put("a", 1)
+    producer = threading.Thread(target=ingress.put, args=("a", 2))
+    producer.start()
+    producer.join(0.1)
+    assert producer.is_alive()
+    assert ingress.get_nowait() == ("a", 1)
+    producer.join(1)
+    assert not producer.is_alive()
+    assert ingress.get_nowait() == ("a", 2)
+
+
+def test_get_wakes_on_put_from_foreign_thread():
+    async def scenario():
+        ingress = _EventIngress()
+        threading.Timer(0.05, ingress.put, args=("a", 1)).start()
+        return await asyncio.wait_for(ingress.get(), 1)
+
+    assert asyncio.run(scenario()) == ("a", 1)
+
+
+def test_get_batch_collects_up_to_max_batch():
+    async def scenario():
+        ingress = _EventIngress()
+        for i in range(5):
+            ingress.put("a", i)
+        return await ingress.get_batch(3, 0.01), await ingress.get_batch(10, 0.01)
+
+    first, second = asyncio.run(scenario())
+    assert [data for _, data in first] == [0, 1, 2]
+    assert [data for _, data in second] == [3, 4]
+
+
+def test_get_drains_then_raises_library_error_after_close():
+    async def scenario():
+        ingress = _EventIngress()
+        ingress.put("a", 1)
+        ingress.close()
+        assert await ingress.get() == ("a", 1)
+        with pytest.raises(_EventIngressClosed):
+            await ingress.get()
+
+    asyncio.run(scenario())
@@ -0,0 +1,66 @@
+"""Unit tests for the fast-import DLL integrity cache file handling."""
+
+import hashlib
+import os
+
+import pytest
+
+from hexaeight_agent.hexaeight_agent import (
+    INTEGRITY_CACHE_ENV,
+    _load_integrity_cache,
+    _save_integrity_cache,
+    _sha256_file,
+)
+
+pytestmark = pytest.mark.skipif(os.name == "nt", reason="POSIX ownership checks")
+
+ENTRY = {"HexaEightAgent.dll": {"sha256": "abc", "size": 1}}
+
+
+@pytest.fixture
+def cache_path(tmp_path, monkeypatch):
+    path = tmp_path / "cache" / "dll-integrity.json"
+    monkeypatch.setenv(INTEGRITY_CACHE_ENV, str(path))
+    return path
+
+
+def test_round_trip_writes_owner_only_file(cache_path):
+    _save_integrity_cache(ENTRY)
+    assert _load_integrity_cache() == ENTRY
+    assert cache_path.stat().st_mode & 0o077 == 0
+    assert cache_path.parent.stat().st_mode & 0o077 == 0
+
+
+def test_group_or_world_writable_cache_is_ignored(cache_path):
+    _save_integrity_cache(ENTRY)
+    os.chmod(cache_path, 0o666)
+    assert _load_integrity_cache() == {}
+
+
+def test_writable_cache_directory_is_ignored(cache_path):
+    _save_integrity_cache(ENTRY)
+    os.chmod(cache_path.parent, 0o777)
+    assert _load_integrity_cache() == {}
+
+
+def test_symlinked_cache_is_ignored(cache_path, tmp_path):
+    _save_integrity_cache(ENTRY)
+    target = tmp_path / "elsewhere.json"
+    os.replace(cache_path, target)
+    os.symlink(target, cache_path)
+    assert _load_integrity_cache() == {}
+
+
+def test_missing_cache_is_empty(cache_path):
+    assert _load_integrity_cache() == {}
+
+
+def test_file_digest_sees_same_size_rewrites_with_restored_mtime(tmp_path):
+    path = tmp_path / "HexaEightAgent.dll"
+    path.write_bytes(b"original")
+    before = os.stat(path)
+    assert _sha256_file(str(path)) == hashlib.sha256(b"original").hexdigest()
+
+    path.write_bytes(b"tampered")
+    os.utime(path, ns=(before.st_atime_ns, before.st_mtime_ns))
+    assert _sha256_file(str(path)) == hashlib.sha256(b"tampered").hexdigest()
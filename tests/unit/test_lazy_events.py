@@ -0,0 +1,74 @@
+"""Unit tests for lazily marshalled CLR events."""
+
+import dataclasses
+import pickle
+from datetime import datetime
+
+from hexaeight_agent.hexaeight_agent import (
+    MessageReceivedEvent,
+    OverflowPolicy,
+    _EventIngress,
+    _LazyMessageReceivedEvent,
+)
+
+
+class CountingArgs:
+    """CLR event args stand-in that counts property reads."""
+
+    def __init__(self, **values):
+        self._values = values
+        self.reads = []
+
+    def __getattr__(self, name):
+        self.reads.append(name)
+        return self._values.get(name)
+
+
+def message_args(**overrides):
+    values = dict(Topic="topic", Sender="alice", SenderInternalId="internal-1",
+                  DecryptedContent="x" * 1000, Timestamp=None, MessageId="m-1",
+                  IsTaskMessage=False, IsFromSelf=False, IsScheduleNotification=False,
+                  IsLockExpired=False)
+    values.update(overrides)
+    return CountingArgs(**values)
+
+
+def test_fields_are_read_once_on_first_access():
+    args = message_args()
+    event = _LazyMessageReceivedEvent(args)
+    assert args.reads == []
+    assert event.message_id == "m-1"
+    assert event.message_id == "m-1"
+    assert args.reads == ["MessageId"]
+    assert "DecryptedContent" not in args.reads
+
+
+def test_missing_timestamp_falls_back_to_receive_time():
+    event = _LazyMessageReceivedEvent(message_args())
+    assert isinstance(event.timestamp, datetime)
+
+
+def test_pickle_materializes_plain_dataclass():
+    event = _LazyMessageReceivedEvent(message_args())
+    restored = pickle.loads(pickle.dumps(event))
+    assert type(restored) is MessageReceivedEvent
+    assert restored == event
+    assert restored.decrypted_content == "x" * 1000
+
+
+def test_lazy_events_survive_spill_to_disk(tmp_path):
+    ingress = _EventIngress(1, OverflowPolicy.SPILL_TO_DISK, str(tmp_path))
+    for i in range(3):
+        ingress.put("message_received", _LazyMessageReceivedEvent(message_args(MessageId=f"m-{i}")))
+    delivered = [ingress.get_nowait()[1] for _ in range(3)]
+    assert [event.message_id for event in delivered] == ["m-0", "m-1", "m-2"]
+    assert isinstance(delivered[0], _LazyMessageReceivedEvent)
+    assert type(delivered[1]) is MessageReceivedEvent
+
+
+def test_dataclass_replace_works_on_lazy_events():
+    event = _LazyMessageReceivedEvent(message_args())
+    changed = dataclasses.replace(event, topic="other")
+    assert changed.topic == "other" and changed.message_id == "m-1"
+    assert changed == dataclasses.replace(event._materialize(), topic="other")
+    assert event.topic == "topic"
@@ -0,0 +1,43 @@
+"""Unit tests for deferred .NET runtime initialization."""
+
+import os
+import subprocess
+import sys
+
+PACKAGE_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def run_python(code):
+    return subprocess.run([sys.executable, "-c", code], cwd=PACKAGE_ROOT,
+                          capture_output=True, text=True, timeout=60)
+
+
+def test_import_does_not_load_the_runtime():
+    result = run_python(
+        "import sys, hexaeight_agent\n"
+        "from hexaeight_agent import TaskInfo, MessageLock, OverflowPolicy\n"
+        "import hexaeight_agent.hexaeight_agent as m\n"
+        "assert 'clr' not in sys.modules and 'pythonnet' not in sys.modules\n"
+        "assert m.clr is None and not m._HEXAEIGHT_AGENT_AVAILABLE\n"
+        "print('ok')\n"
+    )
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == "ok"
+
+
+def test_import_metrics_are_empty_before_first_use():
+    result = run_python("import hexaeight_agent\nprint(hexaeight_agent.get_import_metrics())")
+    assert result.returncode == 0, result.stderr
+    assert "clr_load_ms" not in result.stdout
+
+
+def test_star_import_does_not_load_the_runtime():
+    result = run_python(
+        "import sys\n"
+        "from hexaeight_agent import *\n"
+        "import hexaeight_agent.hexaeight_agent as m\n"
+        "assert 'clr' not in sys.modules and not m._HEXAEIGHT_AGENT_AVAILABLE\n"
+        "print('ok')\n"
+    )
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == "ok"
@@ -0,0 +1,112 @@
+"""Unit tests for LLMResponseCache."""
+
+import asyncio
+import sqlite3
+import threading
+import time
+
+from hexaeight_agent.hexaeight_agent import LLMClient, LLMResponse, LLMResponseCache
+
+from .test_llm_client import URL, answering_gateway, request
+
+
+def response(content="answer", success=True):
+    return LLMResponse(request_id="r-1", original_request_message_id="m-1", success=success,
+                       content=content, tokens_used=10, cost=0.5)
+
+
+def test_memory_tier_hits_expires_and_ignores_failures():
+    cache = LLMResponseCache(ttl_seconds=0.05)
+    cache.put("k", response())
+    cache.put("failed", response(success=False))
+    assert cache.get("k").content == "answer"
+    assert cache.get("failed") is None
+    time.sleep(0.06)
+    assert cache.get("k") is None
+    stats = cache.statistics()
+    assert stats["memory_hits"] == 1 and stats["misses"] == 2 and stats["expirations"] == 1
+    assert stats["cost_saved"] == 0.5
+
+
+def test_disk_tier_survives_restart(tmp_path):
+    path = str(tmp_path / "cache.db")
+    cache = LLMResponseCache(sqlite_path=path)
+    cache.put("k", response())
+    cache.close()
+
+    reopened = LLMResponseCache(sqlite_path=path)
+    assert asyncio.run(reopened.get_async("k")).content == "answer"
+    assert reopened.get("k").content == "answer"
+    stats = reopened.statistics()
+    assert stats["disk_hits"] == 1 and stats["memory_hits"] == 1
+    assert stats["disk_entries"] == 1 and stats["disk_bytes"] > 0
+    reopened.close()
+
+
+def test_disk_work_runs_off_the_calling_thread(tmp_path):
+    cache = LLMResponseCache(max_entries=1, sqlite_path=str(tmp_path / "cache.db"))
+    caller = threading.get_ident()
+    threads = set()
+    original = cache._flush_pending
+
+    def recording_flush():
+        threads.add(threading.get_ident())
+        original()
+
+    cache._flush_pending = recording_flush
+    cache.put("a", response("a"))
+    cache.put("b", response("b"))  # evicts "a" from memory
+    assert asyncio.run(cache.get_async("a")).content == "a"
+    cache.close()
+    assert threads and caller not in threads
+
+
+def test_access_times_are_written_in_batches(tmp_path):
+    path = str(tmp_path / "cache.db")
+    cache = LLMResponseCache(max_entries=1, sqlite_path=path)
+    cache.put("a", response("a"))
+    cache.put("b", response("b"))
+    cache._disk.submit(lambda: None).result()  # let the queued writes land
+    written = dict(sqlite3.connect(path).execute("SELECT key, last_access FROM llm_responses"))
+    time.sleep(0.01)
+    cache.get("a")
+    assert cache._pending_access.keys() == {"a"}
+    assert dict(sqlite3.connect(path).execute("SELECT key, last_access FROM llm_responses")) == written
+    cache.close()
+    assert dict(sqlite3.connect(path).execute("SELECT key, last_access FROM llm_responses"))["a"] > written["a"]
+
+
+def test_disk_size_is_tracked_and_bounded(tmp_path):
+    path = str(tmp_path / "cache.db")
+    size = len(LLMResponseCache._serialize(response("x" * 100)).encode("utf-8"))
+    cache = LLMResponseCache(sqlite_path=path, max_disk_bytes=2 * size)
+    for key in ("a", "b", "c"):
+        cache.put(key, response("x" * 100))
+        cache._disk.submit(lambda: None).result()
+    cache.put("c", response("x" * 100))  # replacing an entry does not double count it
+    cache.close()
+    reopened = LLMResponseCache(sqlite_path=path)
+    stats = reopened.statistics()
+    assert stats["disk_entries"] == 2 and stats["disk_bytes"] == 2 * size
+    assert cache.statistics()["evictions"] == 1
+    reopened.close()
+
+
+def test_client_answers_repeated_requests_from_the_cache(make_agent, tmp_path):
+    agent = make_agent()
+    sent = []
+    agent.send_llm_request = answering_gateway(agent, sent)
+    cache = LLMResponseCache(max_entries=1, sqlite_path=str(tmp_path / "cache.db"))
+
+    async def scenario():
+        client = LLMClient(agent, URL, cache=cache)
+        first = await client.request(request(temperature=0, request_id="r-1"))
+        cache.put("other", response())  # pushes the answer out of memory, onto disk only
+        second = await client.request(request(temperature=0, request_id="r-2"))
+        return first, second
+
+    first, second = asyncio.run(scenario())
+    cache.close()
+    assert sent == ["r-1"]
+    assert second.content == first.content and second.request_id == "r-2"
+    assert cache.statistics()["disk_hits"] == 1
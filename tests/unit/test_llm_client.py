@@ -0,0 +1,142 @@
+"""Unit tests for LLMClient response correlation and limits."""
+
+import asyncio
+import json
+import threading
+
+from hexaeight_agent.hexaeight_agent import (
+    LLMClient, LLMMessage, LLMRequest, _TokenBucket, _parse_llm_response
+)
+
+URL = "http://pubsub"
+
+
+class ClrMessageArgs:
+    """Stands in for the CLR MessageReceivedEventArgs."""
+
+    def __init__(self, content, is_from_self=False):
+        self.Topic = "topic"
+        self.Sender = "gateway"
+        self.SenderInternalId = "gateway-internal"
+        self.DecryptedContent = content
+        self.Timestamp = None
+        self.MessageId = "msg-1"
+        self.IsTaskMessage = False
+        self.IsFromSelf = is_from_self
+        self.IsScheduleNotification = False
+        self.IsLockExpired = False
+
+
+def gateway_reply(request_id, content="hello"):
+    return json.dumps({"RequestId": request_id, "Success": True, "Content": content, "TokensUsed": 3})
+
+
+def deliver_from_clr_thread(agent, content, **flags):
+    thread = threading.Thread(target=agent._on_message_received_clean, args=(None, ClrMessageArgs(content, **flags)))
+    thread.start()
+    thread.join()
+
+
+def answering_gateway(agent, sent, unrelated=None):
+    async def send_llm_request(url, llm_request):
+        sent.append(llm_request.request_id)
+        if unrelated is not None:
+            deliver_from_clr_thread(agent, unrelated)
+        deliver_from_clr_thread(agent, gateway_reply(llm_request.request_id))
+        return True
+
+    return send_llm_request
+
+
+def request(content="hi", **fields):
+    return LLMRequest(model="m", messages=[LLMMessage("user", content)], **fields)
+
+
+def test_responses_are_matched_and_other_messages_passed_on(make_agent):
+    agent = make_agent()
+    sent = []
+    agent.send_llm_request = answering_gateway(agent, sent, unrelated='{"note": "not for the client"}')
+
+    async def scenario():
+        client = LLMClient(agent, URL)
+        response = await client.request(request())
+        await asyncio.sleep(0)
+        return client, response
+
+    client, response = asyncio.run(scenario())
+    assert response.success and response.content == "hello"
+    assert response.request_id == sent[0]
+    assert client.statistics()["responses"] == 1
+    event_type, event = agent._event_ingress.get_nowait()
+    assert event_type == "message_received" and event.decrypted_content == '{"note": "not for the client"}'
+    assert agent._event_ingress.get_nowait() is None
+
+
+def test_messages_from_self_are_not_taken(make_agent):
+    agent = make_agent()
+    client = LLMClient(agent, URL)
+    client._loop = object()
+    client._pending["r-1"] = None
+    deliver_from_clr_thread(agent, gateway_reply("r-1"), is_from_self=True)
+    assert agent._event_ingress.get_nowait()[0] == "message_received"
+
+
+def test_deduplicated_callers_get_their_own_request_id(make_agent):
+    agent = make_agent()
+    sent = []
+    agent.send_llm_request = answering_gateway(agent, sent)
+    first, second = request(request_id="r-1"), request(request_id="r-2")
+
+    async def scenario():
+        client = LLMClient(agent, URL)
+        return client, await client.request_many([first, second])
+
+    client, responses = asyncio.run(scenario())
+    assert sent == ["r-1"]
+    assert [response.request_id for response in responses] == ["r-1", "r-2"]
+    assert [response.content for response in responses] == ["hello", "hello"]
+    assert client.statistics()["deduplicated"] == 1
+
+
+def test_token_bucket_can_be_built_outside_a_loop():
+    bucket = _TokenBucket(tokens_per_minute=6000)
+    assert bucket._lock is None
+    asyncio.run(bucket.acquire(100))
+    asyncio.run(bucket.acquire(100))
+    assert bucket._tokens < 6000
+
+
+def test_parse_llm_response_accepts_wrapped_and_any_case_fields():
+    wrapped = json.dumps({"type": "llm_response", "payload": {"requestid": "r-1", "success": False,
+                                                               "errorMessage": "quota"}})
+    response = _parse_llm_response(wrapped)
+    assert response.request_id == "r-1" and not response.success
+    assert response.error_message == "quota"
+    assert _parse_llm_response("not json") is None
+    assert _parse_llm_response('{"RequestId": "r-1"}') is None
+
+
+def test_unrelated_messages_block_on_a_full_buffer_without_stalling_the_loop(make_agent):
+    agent = make_agent(event_queue_size=1, overflow_policy="block")
+
+    async def scenario():
+        loop = asyncio.get_running_loop()
+        client = LLMClient(agent, URL)
+        client._loop = loop
+        client._pending["r-1"] = response_future = loop.create_future()
+        agent._event_ingress.put("message_received", "filler")
+        blocked = threading.Thread(target=agent._on_message_received_clean,
+                                   args=(None, ClrMessageArgs('{"note": "not for the client"}')))
+        blocked.start()
+        deliver_from_clr_thread(agent, gateway_reply("r-1"))
+        response = await asyncio.wait_for(response_future, 5)
+        assert agent._event_ingress.get_nowait() == ("message_received", "filler")
+        await loop.run_in_executor(None, blocked.join, 5)
+        return blocked, response
+
+    blocked, response = asyncio.run(scenario())
+    assert not blocked.is_alive()
+    assert response.request_id == "r-1"
+    event_type, event = agent._event_ingress.get_nowait()
+    assert event.decrypted_content == '{"note": "not for the client"}'
+    assert agent._event_ingress.get_nowait() is None
@@ -0,0 +1,111 @@
+"""Unit tests for the in-process scheduler of near-term messages."""
+
+import asyncio
+from datetime import datetime, timedelta
+
+import hexaeight_agent.hexaeight_agent as agent_module
+from hexaeight_agent.hexaeight_agent import ScheduledMessage, _LocalScheduler
+
+from .conftest import CompletedTask, FakeAgentConfig
+
+URL = "http://pubsub"
+
+
+def entry(**overrides):
+    fields = dict(schedule_id="s-1", scheduled_for=datetime.now(), target_type="agent_name",
+                  target_value="bob", message="hi")
+    fields.update(overrides)
+    return ScheduledMessage(**fields)
+
+
+def test_accepts_only_plain_messages_due_within_the_horizon():
+    scheduler = _LocalScheduler(None, horizon_seconds=10)
+    assert scheduler.accepts(entry(), 0)
+    assert scheduler.accepts(entry(), 10)
+    assert not scheduler.accepts(entry(), 10.5)
+    assert scheduler.accepts(entry(), -0.1)
+    assert not scheduler.accepts(entry(message_type="task"), 1)
+    assert not scheduler.accepts(entry(target_type="group"), 1)
+    scheduler.horizon_seconds = 0
+    assert not scheduler.accepts(entry(), 0)
+
+
+def test_near_term_messages_are_published_locally(make_agent):
+    agent = make_agent()
+    agent.configure_local_scheduler(5)
+    published = []
+
+    async def publish_to_agent(url, agent_name, message):
+        published.append((url, agent_name, message))
+        return True
+
+    agent.publish_to_agent = publish_to_agent
+
+    async def scenario():
+        assert await agent.schedule_message(URL, datetime.now() + timedelta(milliseconds=20),
+                                            "agent_name", "bob", "hi")
+        assert len(agent.list_pending_schedules()) == 1
+        await asyncio.sleep(0.1)
+
+    asyncio.run(scenario())
+    assert published == [(URL, "bob", "hi")]
+    assert agent.list_pending_schedules() == []
+    assert agent.get_local_scheduler_statistics()["delivered"] == 1
+
+
+def test_schedules_in_the_past_are_rejected(make_agent):
+    agent = make_agent()
+    agent.configure_local_scheduler(5)
+
+    async def scenario():
+        return await agent.schedule_many(URL, [(datetime.now() - timedelta(seconds=1), "agent_name", "bob", "late")])
+
+    result, = asyncio.run(scenario())
+    assert not result["success"]
+    assert result["error"] == "Scheduled time is in the past"
+    assert agent.get_local_scheduler_statistics()["scheduled"] == 0
+
+
+def test_past_schedules_the_local_scheduler_would_not_take_go_to_the_server(make_agent, monkeypatch):
+    monkeypatch.setattr(agent_module, "_to_clr_datetime", lambda value: value)
+    config = FakeAgentConfig()
+    sent = []
+    config.ScheduleMessageAsync = lambda *args: sent.append(args[2:5]) or CompletedTask(True)
+    agent = make_agent(config)
+    agent.configure_local_scheduler(5)
+    past = datetime.now() - timedelta(seconds=1)
+
+    async def scenario():
+        return [await agent.schedule_message(URL, past, "agent_name", "bob", "durable", durable=True),
+                await agent.schedule_message(URL, past, "group", "team", "group message")]
+
+    assert asyncio.run(scenario()) == [True, True]
+    assert sent == [("agent_name", "bob", "durable"), ("group", "team", "group message")]
+
+
+def test_close_cancels_deliveries_in_flight(make_agent):
+    agent = make_agent()
+    agent.configure_local_scheduler(5)
+    started = []
+
+    async def publish_to_agent(url, agent_name, message):
+        started.append(message)
+        await asyncio.sleep(60)
+        return True
+
+    agent.publish_to_agent = publish_to_agent
+
+    async def scenario():
+        await agent.schedule_message(URL, datetime.now() + timedelta(milliseconds=10), "agent_name", "bob", "now")
+        await agent.schedule_message(URL, datetime.now() + timedelta(seconds=4), "agent_name", "bob", "later")
+        await asyncio.sleep(0.05)
+        scheduler = agent._local_scheduler
+        deliveries = list(scheduler._deliveries)
+        assert scheduler.close() == 2
+        await asyncio.sleep(0)
+        return deliveries
+
+    deliveries = asyncio.run(scenario())
+    assert started == ["now"]
+    assert all(delivery.cancelled() for delivery in deliveries)
+    assert agent.list_pending_schedules() == []
@@ -0,0 +1,121 @@
+"""Unit tests for background lock heartbeats."""
+
+import asyncio
+
+from hexaeight_agent.hexaeight_agent import _LockHeartbeatScheduler
+
+from .conftest import CompletedTask, FakeAgentConfig
+
+URL = "http://pubsub"
+
+
+class LockServerConfig(FakeAgentConfig):
+    """Fake server: locks succeed, heartbeats and releases follow the flags."""
+
+    def __init__(self):
+        super().__init__()
+        self.heartbeat_ok = True
+        self.release_ok = True
+        self.heartbeats = 0
+
+    def GetInternalIdentity(self):
+        return "internal-1"
+
+    def LockMessageAsync(self, url, message_id):
+        return CompletedTask(True)
+
+    def ReleaseLockAsync(self, url, message_id):
+        return CompletedTask(self.release_ok)
+
+    def SendLockHeartbeatAsync(self, url, message_id):
+        self.heartbeats += 1
+        return CompletedTask(self.heartbeat_ok)
+
+
+def fast_wheel(agent):
+    agent._lock_heartbeats = _LockHeartbeatScheduler(agent, interval=0.02, tick=0.005)
+
+
+def test_locks_are_not_heartbeated_unless_opted_in(make_agent):
+    agent = make_agent(LockServerConfig())
+    assert asyncio.run(agent.lock_message(URL, "m-1"))
+    assert agent.get_held_locks() == []
+    assert agent.is_locked("m-1")
+
+
+def test_opted_in_locks_are_heartbeated_until_released(make_agent):
+    config = LockServerConfig()
+    agent = make_agent(config, auto_heartbeat_locks=True)
+    fast_wheel(agent)
+
+    async def scenario():
+        await agent.lock_message(URL, "m-1")
+        await asyncio.sleep(0.1)
+        assert await agent.release_lock(URL, "m-1")
+        sent = config.heartbeats
+        await asyncio.sleep(0.05)
+        return sent
+
+    sent = asyncio.run(scenario())
+    assert sent >= 2
+    assert config.heartbeats == sent
+    assert agent.get_lock_heartbeat_statistics()["held_locks"] == 0
+
+
+def test_failed_release_keeps_heartbeating(make_agent):
+    config = LockServerConfig()
+    config.release_ok = False
+    agent = make_agent(config, auto_heartbeat_locks=True)
+
+    async def scenario():
+        await agent.lock_message(URL, "m-1")
+        assert not await agent.release_lock(URL, "m-1")
+
+    asyncio.run(scenario())
+    assert agent.get_held_locks() == [(URL, "m-1")]
+    assert agent.get_lock_hold_statistics()["currently_held"] == 1
+
+
+def test_rejected_heartbeat_forgets_the_lock_everywhere(make_agent):
+    config = LockServerConfig()
+    config.heartbeat_ok = False
+    agent = make_agent(config, auto_heartbeat_locks=True)
+    fast_wheel(agent)
+    changes = []
+    agent.register_lock_listener(lambda change, lock: changes.append((change, lock.message_id)))
+
+    async def scenario():
+        await agent.lock_message(URL, "m-1")
+        await asyncio.sleep(0.08)
+
+    asyncio.run(scenario())
+    assert agent.get_held_locks() == []
+    assert not agent.is_locked("m-1")
+    assert agent.get_lock_hold_statistics()["currently_held"] == 0
+    assert agent.get_lock_heartbeat_statistics()["heartbeat_failures"] == 1
+    assert changes == [("acquired", "m-1"), ("expired", "m-1")]
+
+
+def test_wheel_heartbeats_many_locks_from_one_task():
+    class Agent:
+        def __init__(self):
+            self.sent = []
+
+        async def send_lock_heartbeat(self, url, message_id):
+            self.sent.append(message_id)
+            return True
+
+    agent = Agent()
+
+    async def scenario():
+        wheel = _LockHeartbeatScheduler(agent, interval=0.02, tick=0.005)
+        for i in range(100):
+            wheel.track(URL, f"m-{i}")
+        await asyncio.sleep(0.05)
+        stats = wheel.statistics()
+        wheel.close()
+        return stats
+
+    stats = asyncio.run(scenario())
+    assert set(agent.sent) == {f"m-{i}" for i in range(100)}
+    assert stats["held_locks"] == 100 and stats["heartbeat_failures"] == 0
@@ -0,0 +1,120 @@
+"""Unit tests for the local lock index."""
+
+import asyncio
+import threading
+from datetime import datetime, timedelta
+
+from hexaeight_agent.hexaeight_agent import MessageLock, _LockIndex
+
+from .test_lock_heartbeats import URL, LockServerConfig
+
+OTHER_URL = "http://pubsub-2"
+
+
+class IdentityCountingConfig(LockServerConfig):
+    def __init__(self):
+        super().__init__()
+        self.identity_calls = 0
+        self.identity = "internal-1"
+
+    def GetInternalIdentity(self):
+        self.identity_calls += 1
+        return self.identity
+
+    def LoadAIParentAgent(self, *args):
+        self.identity = "internal-2"
+        return True
+
+
+class ExpiryArgs:
+    def __init__(self, message_id):
+        self.MessageId = message_id
+        self.Timestamp = None
+
+
+class RecordingAgent:
+    def __init__(self):
+        self.errors = []
+
+    def _log_error(self, message):
+        self.errors.append(message)
+
+
+def test_internal_identity_is_fetched_once_per_loaded_identity(make_agent):
+    config = IdentityCountingConfig()
+    agent = make_agent(config)
+    agent._ensure_environment_loaded = lambda: None
+
+    async def lock(message_id):
+        await agent.lock_message(URL, message_id)
+        return agent._lock_index.get(message_id).locked_by_internal_id
+
+    assert asyncio.run(lock("m-1")) == "internal-1"
+    assert asyncio.run(lock("m-2")) == "internal-1"
+    assert config.identity_calls == 1
+    assert agent.load_ai_parent_agent("parent.json")
+    assert asyncio.run(lock("m-3")) == "internal-2"
+    assert config.identity_calls == 2
+
+
+def test_same_message_on_two_servers_is_tracked_separately(make_agent):
+    agent = make_agent(LockServerConfig())
+
+    async def scenario():
+        await agent.lock_message(URL, "m-1")
+        await agent.lock_message(OTHER_URL, "m-1")
+        await agent.release_lock(URL, "m-1")
+
+    asyncio.run(scenario())
+    assert not agent.is_locked("m-1", URL)
+    assert agent.is_locked("m-1", OTHER_URL)
+    assert agent.is_locked("m-1")
+    assert [lock.pubsub_server_url for lock in agent.get_locks_by_expiry()] == [OTHER_URL]
+
+
+def test_expiry_drops_the_message_on_every_server_and_stops_heartbeats(make_agent):
+    agent = make_agent(LockServerConfig(), auto_heartbeat_locks=True)
+    changes = []
+    agent.register_lock_listener(lambda change, lock: changes.append((change, lock.pubsub_server_url)))
+
+    async def scenario():
+        await agent.lock_message(URL, "m-1")
+        await agent.lock_message(OTHER_URL, "m-1")
+        expiry = threading.Thread(target=agent._on_lock_expired_clean, args=(None, ExpiryArgs("m-1")))
+        expiry.start()
+        expiry.join()
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        held = agent.get_held_locks()
+        agent._lock_heartbeats.close()
+        return held
+
+    assert asyncio.run(scenario()) == []
+    assert not agent.is_locked("m-1")
+    assert agent.get_lock_hold_statistics()["lost"] == 2
+    assert sorted(changes) == [("acquired", URL), ("acquired", OTHER_URL),
+                               ("expired", URL), ("expired", OTHER_URL)]
+
+
+def test_reconcile_keeps_known_server_urls():
+    index = _LockIndex(RecordingAgent())
+    index.acquired(URL, "m-1")
+    expires = datetime.utcnow() + timedelta(minutes=5)
+    index.reconcile([MessageLock("m-1", "agent", "internal-1", expires_at=expires),
+                     MessageLock("m-2", "agent", "internal-1", expires_at=expires)])
+    assert index.get("m-1", URL).expires_at == expires
+    assert index.get("m-2").pubsub_server_url == ""
+    assert index.message_ids() == {"m-1", "m-2"}
+
+
+def test_listener_errors_are_logged_through_the_agent():
+    agent = RecordingAgent()
+    index = _LockIndex(agent)
+
+    def broken(change, lock):
+        raise ValueError("listener bug")
+
+    index.add_listener(broken)
+    index.acquired(URL, "m-1")
+    assert agent.errors == ["Error in lock listener: listener bug"]
+    assert index.is_locked("m-1", URL)
@@ -0,0 +1,135 @@
+"""Unit tests for agent.locked() and lock hold statistics."""
+
+import asyncio
+import threading
+
+import pytest
+
+from hexaeight_agent.hexaeight_agent import HexaEightAgentError
+
+from .test_lock_heartbeats import URL, LockServerConfig
+
+
+class ExpiryArgs:
+    def __init__(self, message_id):
+        self.MessageId = message_id
+        self.Timestamp = None
+
+
+class DisconnectingConfig(LockServerConfig):
+    def __init__(self, lock_ok=True):
+        super().__init__()
+        self.lock_ok = lock_ok
+        self.released = []
+
+    def LockMessageAsync(self, url, message_id):
+        return super().LockMessageAsync(url, message_id) if self.lock_ok else self._refused()
+
+    @staticmethod
+    def _refused():
+        from .conftest import CompletedTask
+        return CompletedTask(False)
+
+    def ReleaseLockAsync(self, url, message_id):
+        self.released.append(message_id)
+        return super().ReleaseLockAsync(url, message_id)
+
+    def DisconnectFromPubSub(self):
+        pass
+
+
+def test_lock_is_released_when_block_exits(make_agent):
+    config = DisconnectingConfig()
+    agent = make_agent(config)
+
+    async def scenario():
+        async with agent.locked(URL, "m-1") as lock:
+            assert agent.is_locked("m-1")
+            assert agent.get_held_locks() == [(URL, "m-1")]
+            assert lock.held_seconds >= 0
+
+    asyncio.run(scenario())
+    assert config.released == ["m-1"]
+    assert agent.get_lock_hold_statistics()["released"] == 1
+
+
+def test_lock_is_released_when_body_raises(make_agent):
+    config = DisconnectingConfig()
+    agent = make_agent(config)
+
+    async def scenario():
+        with pytest.raises(KeyError):
+            async with agent.locked(URL, "m-1"):
+                raise KeyError("boom")
+
+    asyncio.run(scenario())
+    assert config.released == ["m-1"]
+
+
+def test_detached_lock_is_kept(make_agent):
+    config = DisconnectingConfig()
+    agent = make_agent(config)
+
+    async def scenario():
+        async with agent.locked(URL, "m-1") as lock:
+            lock.detach()
+
+    asyncio.run(scenario())
+    assert config.released == []
+    assert agent.get_lock_hold_statistics()["currently_held"] == 1
+    assert not agent._lock_heartbeats.is_tracked(URL, "m-1")
+
+
+def test_detached_lock_can_keep_its_heartbeats(make_agent):
+    agent = make_agent(DisconnectingConfig())
+
+    async def scenario():
+        async with agent.locked(URL, "m-1") as lock:
+            lock.detach(keep_alive=True)
+        assert agent._lock_heartbeats.is_tracked(URL, "m-1")
+        agent._lock_heartbeats.close()
+
+    asyncio.run(scenario())
+
+
+def test_failed_acquire_raises(make_agent):
+    agent = make_agent(DisconnectingConfig(lock_ok=False))
+
+    async def scenario():
+        with pytest.raises(HexaEightAgentError):
+            async with agent.locked(URL, "m-1"):
+                pass
+
+    asyncio.run(scenario())
+
+
+def test_expiry_from_clr_thread_clears_hold_timestamp(make_agent):
+    agent = make_agent(DisconnectingConfig())
+
+    async def scenario():
+        await agent.lock_message(URL, "m-1")
+        await agent.lock_message(URL, "m-2")
+        expiry = threading.Thread(target=agent._on_lock_expired_clean, args=(None, ExpiryArgs("m-1")))
+        expiry.start()
+        expiry.join()
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+
+    asyncio.run(scenario())
+    stats = agent.get_lock_hold_statistics()
+    assert stats["currently_held"] == 1 and stats["lost"] == 1
+    assert agent.get_locked_message_ids() == {"m-2"}
+
+
+def test_disconnect_forgets_held_locks(make_agent):
+    agent = make_agent(DisconnectingConfig())
+
+    async def scenario():
+        await agent.lock_message(URL, "m-1")
+
+    asyncio.run(scenario())
+    agent.disconnect_from_pubsub()
+    stats = agent.get_lock_hold_statistics()
+    assert stats["currently_held"] == 0 and stats["oldest_held_seconds"] == 0.0
+    assert stats["lost"] == 1
+    assert agent.get_locked_message_ids() == set()
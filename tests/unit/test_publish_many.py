@@ -0,0 +1,67 @@
+"""Unit tests for bounded-concurrency publishing."""
+
+import asyncio
+
+import pytest
+
+from hexaeight_agent.hexaeight_agent import _map_bounded
+
+from .conftest import CompletedTask, FakeAgentConfig
+
+
+class PublishingConfig(FakeAgentConfig):
+    def __init__(self):
+        super().__init__()
+        self.calls = []
+
+    def PublishToAgentAsync(self, url, target, message):
+        self.calls.append(("agent", target, message))
+        if target == "broken":
+            raise RuntimeError("connection reset")
+        return CompletedTask(target != "rejected")
+
+    def PublishToInternalIdAsync(self, url, target, message):
+        self.calls.append(("internal", target, message))
+        return CompletedTask(True)
+
+
+def test_results_keep_input_order_and_report_failures(make_agent):
+    config = PublishingConfig()
+    agent = make_agent(config)
+    messages = [("a", "1"), ("rejected", "2"), ("broken", "3"), ("b", "4")]
+
+    results = asyncio.run(agent.publish_many("http://pubsub", messages, concurrency=2))
+
+    assert [r["target"] for r in results] == ["a", "rejected", "broken", "b"]
+    assert [r["success"] for r in results] == [True, False, False, True]
+    assert results[1]["error"] == "Publish was not accepted"
+    assert results[2]["error"] == "connection reset"
+
+
+def test_internal_id_targets(make_agent):
+    config = PublishingConfig()
+    agent = make_agent(config)
+    asyncio.run(agent.publish_many("http://pubsub", [("id-1", "x")], target_type="internal_id"))
+    assert config.calls == [("internal", "id-1", "x")]
+
+
+def test_unknown_target_type_is_rejected(make_agent):
+    agent = make_agent()
+    with pytest.raises(ValueError):
+        asyncio.run(agent.publish_many("http://pubsub", [("a", "x")], target_type="broadcast"))
+
+
+def test_map_bounded_caps_in_flight_calls_and_keeps_order():
+    in_flight = []
+    peak = []
+
+    async def work(item):
+        in_flight.append(item)
+        peak.append(len(in_flight))
+        await asyncio.sleep(0.001 * (10 - item))
+        in_flight.remove(item)
+        return item * 2
+
+    results = asyncio.run(_map_bounded(work, list(range(10)), 3))
+    assert results == [i * 2 for i in range(10)]
+    assert max(peak) == 3
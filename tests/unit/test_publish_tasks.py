@@ -0,0 +1,77 @@
+"""Unit tests for task message reuse and publish_tasks."""
+
+import asyncio
+import gc
+
+from hexaeight_agent.hexaeight_agent import TaskInfo, TaskStep
+
+from .conftest import CompletedTask, FakeAgentConfig
+
+URL = "http://pubsub"
+
+
+class ClrTaskMessage:
+    def __init__(self, title, description, steps):
+        self.TaskId = f"task-{title}"
+        self.Title = title
+        self.Description = description
+        self.Steps = list(steps)
+        self.CreatedBy = "agent"
+        self.CreatedByInternalId = "internal-1"
+
+
+class TaskConfig(FakeAgentConfig):
+    def __init__(self):
+        super().__init__()
+        self.created = 0
+        self.published = []
+
+    def CreateTaskMessage(self, title, description, steps):
+        if title == "broken":
+            raise ValueError("cannot build task")
+        self.created += 1
+        return ClrTaskMessage(title, description, steps)
+
+    def PublishTaskAsync(self, url, task_message):
+        self.published.append(task_message.Title)
+        return CompletedTask(True)
+
+
+def test_publish_reuses_the_created_clr_message(make_agent, monkeypatch):
+    monkeypatch.setattr("hexaeight_agent.hexaeight_agent._to_clr_string_list", list)
+    config = TaskConfig()
+    agent = make_agent(config)
+    task = agent.create_task_message("t1", "d", ["s1"])
+    assert asyncio.run(agent.publish_task(URL, task))
+    assert config.created == 1
+    task.steps.append(TaskStep(step_number=2, description="s2"))
+    assert asyncio.run(agent.publish_task(URL, task))
+    assert config.created == 2
+
+
+def test_clr_messages_are_dropped_with_their_task_info(make_agent, monkeypatch):
+    monkeypatch.setattr("hexaeight_agent.hexaeight_agent._to_clr_string_list", list)
+    agent = make_agent(TaskConfig())
+    task = agent.create_task_message("t1", "d", ["s1"])
+    assert len(agent._clr_task_messages) == 1
+    assert "_clr" not in repr(task)
+    del task
+    gc.collect()
+    assert agent._clr_task_messages == {}
+
+
+def test_publish_tasks_does_not_publish_tasks_that_failed_to_create(make_agent, monkeypatch):
+    monkeypatch.setattr("hexaeight_agent.hexaeight_agent._to_clr_string_list", list)
+    config = TaskConfig()
+    agent = make_agent(config)
+    failed = agent.create_task_message("broken", "d", [])
+    results = asyncio.run(agent.publish_tasks(URL, [
+        ("t1", "d", ["s1"]),
+        ("broken", "d", []),
+        failed,
+        TaskInfo(task_id="", title="by hand", description="d"),
+    ]))
+    assert [result["success"] for result in results] == [True, False, False, True]
+    assert results[1]["error"] == "cannot build task"
+    assert results[2]["error"] == "Task message was not created"
+    assert config.published == ["t1", "by hand"]
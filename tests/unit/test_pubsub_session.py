@@ -0,0 +1,111 @@
+"""Unit tests for PubSub sessions."""
+
+import asyncio
+import json
+
+import pytest
+
+from hexaeight_agent.hexaeight_agent import HexaEightAgentError, PubSubSession, _health_payload_ok
+
+from .conftest import CompletedTask, FakeAgentConfig
+
+
+class ServerConfig(FakeAgentConfig):
+    def __init__(self, connects=True, health='{"status": "Healthy"}'):
+        super().__init__()
+        self.connects = connects
+        self.health = health
+
+    def ConnectToPubSubAsync(self, url, agent_type):
+        return CompletedTask(self.connects)
+
+    def GetServerHealthAsync(self, url):
+        if isinstance(self.health, Exception):
+            raise self.health
+        return CompletedTask(self.health)
+
+    def PublishToAgentAsync(self, url, target, message):
+        return CompletedTask(True)
+
+
+def test_connect_to_pubsub_still_returns_bool(make_agent):
+    agent = make_agent(ServerConfig())
+    assert asyncio.run(agent.connect_to_pubsub("http://a")) is True
+    assert agent.get_session("http://a").connected
+
+
+def test_failed_connect_returns_false(make_agent):
+    agent = make_agent(ServerConfig(connects=False))
+    assert asyncio.run(agent.connect_to_pubsub("http://a", max_attempts=1)) is False
+
+
+def test_open_session_binds_url(make_agent):
+    agent = make_agent(ServerConfig())
+
+    async def scenario():
+        session = await agent.open_session("http://a")
+        assert isinstance(session, PubSubSession) and session
+        assert await session.publish_to_agent("bob", "hi")
+        return session
+
+    session = asyncio.run(scenario())
+    assert session.statistics()["operations"]["publish_to_agent"]["calls"] == 1
+
+
+@pytest.mark.parametrize("payload, healthy", [
+    ('{"status": "Healthy"}', True),
+    ('{"Status": "Degraded"}', False),
+    ('{"healthy": false, "status": "ok"}', False),
+    ('"Unhealthy"', False),
+    ("OK", True),
+    ("Service down for maintenance", False),
+    ('{"uptime": 12}', True),
+])
+def test_health_payload_parsing(payload, healthy):
+    assert _health_payload_ok(payload) is healthy
+
+
+def test_check_health_counts_unhealthy_payload_as_failure(make_agent):
+    config = ServerConfig(health=json.dumps({"status": "Unhealthy"}))
+    agent = make_agent(config)
+
+    async def scenario():
+        session = await agent.open_session("http://a")
+        results = [await session.check_health() for _ in range(PubSubSession.UNHEALTHY_AFTER_FAILURES)]
+        return session, results
+
+    session, results = asyncio.run(scenario())
+    assert results == [False] * PubSubSession.UNHEALTHY_AFTER_FAILURES
+    assert not session.healthy
+    assert session.last_error.startswith("Server reported unhealthy")
+
+
+def test_session_health_errors_raise_instead_of_returning_strings(make_agent):
+    agent = make_agent(ServerConfig(health=HexaEightAgentError("timeout")))
+
+    async def scenario():
+        session = await agent.open_session("http://a")
+        with pytest.raises(HexaEightAgentError):
+            await session.get_server_health()
+        assert not await session.check_health()
+        # The agent-level method keeps its error-string contract
+        assert (await agent.get_server_health("http://a")).startswith("Error getting health")
+        return session
+
+    session = asyncio.run(scenario())
+    assert session.statistics()["operations"]["get_server_health"]["failures"] == 1
+
+
+def test_close_goes_through_the_agent(make_agent):
+    agent = make_agent(ServerConfig())
+
+    async def scenario():
+        await agent.open_session("http://a")
+        await agent.open_session("http://b")
+
+    asyncio.run(scenario())
+    agent.get_session("http://a").close()
+    assert agent.get_session("http://a") is None
+    assert [s.pubsub_server_url for s in agent.sessions] == ["http://b"]
+    assert agent.session_for("any-key").pubsub_server_url == "http://b"
+    assert not agent.close_session("http://a")
@@ -0,0 +1,59 @@
+"""Unit tests for schedule time normalization."""
+
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import hexaeight_agent.hexaeight_agent as agent_module
+from hexaeight_agent.hexaeight_agent import _as_utc_naive, _to_clr_datetime
+
+
+@pytest.fixture
+def utc_plus_5(monkeypatch):
+    monkeypatch.setenv("TZ", "Etc/GMT-5")
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+
+class FakeDateTime:
+    def __init__(self, *parts):
+        self.parts = parts
+        self.ticks = 0
+
+    def AddTicks(self, ticks):
+        self.ticks += ticks
+        return self
+
+
+class FakeDateTimeKind:
+    Unspecified = "Unspecified"
+    Utc = "Utc"
+
+
+def test_naive_values_are_local_time(utc_plus_5):
+    assert _as_utc_naive(datetime(2030, 1, 1, 12, 0)) == datetime(2030, 1, 1, 7, 0)
+    aware = datetime(2030, 1, 1, 12, 0, tzinfo=timezone(timedelta(hours=2)))
+    assert _as_utc_naive(aware) == datetime(2030, 1, 1, 10, 0)
+
+
+def test_clr_conversion_keeps_sub_second_precision(monkeypatch):
+    monkeypatch.setattr(agent_module, "DateTime", FakeDateTime)
+    monkeypatch.setattr(agent_module, "DateTimeKind", FakeDateTimeKind)
+    local = _to_clr_datetime(datetime(2030, 1, 1, 12, 0, 0, 123456))
+    assert local.parts == (2030, 1, 1, 12, 0, 0, 123, "Unspecified")
+    assert local.ticks == 4560
+    aware = _to_clr_datetime(datetime(2030, 1, 1, 12, 0, tzinfo=timezone(timedelta(hours=2))))
+    assert aware.parts == (2030, 1, 1, 10, 0, 0, 0, "Utc")
+
+
+def test_schedules_due_in_local_time_are_kept_until_due(make_agent, utc_plus_5):
+    agent = make_agent()
+    soon = agent._track_schedule("http://pubsub", datetime.now() + timedelta(minutes=5),
+                                 "agent_name", "bob", "hi")
+    agent._track_schedule("http://pubsub", datetime.now() - timedelta(minutes=5), "agent_name", "bob", "late")
+    later = agent._track_schedule("http://pubsub", datetime.now(timezone.utc) + timedelta(minutes=10),
+                                  "agent_name", "bob", "later")
+    assert agent.list_pending_schedules() == [soon, later]
@@ -0,0 +1,168 @@
+"""Unit tests for the signing identity gate."""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+import hexaeight_agent.hexaeight_agent as agent_module
+from hexaeight_agent.hexaeight_agent import SigningContext, _SigningIdentityGate
+
+from .conftest import CompletedTask, FakeAgentConfig
+
+
+def identity(name):
+    return SigningContext(folder_path=name, resource_name=name, machine_token="t", secret="s", license_code="l")
+
+
+ALICE, BOB = identity("alice"), identity("bob")
+
+
+@pytest.fixture
+def gate(monkeypatch):
+    applied = []
+    monkeypatch.setattr(agent_module, "_apply_signing_context", lambda context: applied.append(context.folder_path))
+    gate = _SigningIdentityGate()
+    gate.applied = applied
+    monkeypatch.setattr(agent_module, "_SIGNING_GATE", gate)
+    return gate
+
+
+def test_same_identity_signs_concurrently_with_one_switch(gate):
+    async def scenario():
+        async def sign():
+            async with gate.use(ALICE):
+                await asyncio.sleep(0.01)
+                return gate._in_flight
+
+        return await asyncio.gather(*(sign() for _ in range(5)))
+
+    assert max(asyncio.run(scenario())) == 5
+    assert gate.applied == ["alice"] and gate.switches == 1
+
+
+def test_identities_on_different_event_loops_take_turns(gate):
+    alice_holds, order, errors, released_at = threading.Event(), [], [], []
+
+    async def bob():
+        async with gate.use(BOB):
+            order.append("bob")
+            # Woken promptly on its own loop, not whenever that loop next stirs
+            assert time.monotonic() - released_at[0] < 0.5
+
+    def worker():
+        try:
+            alice_holds.wait(5)
+            asyncio.run(asyncio.wait_for(bob(), 5))
+        except Exception as e:
+            errors.append(e)
+
+    async def alice():
+        async with gate.use(ALICE):
+            alice_holds.set()
+            while not gate._waiting:
+                await asyncio.sleep(0.001)
+            order.append("alice")
+            released_at.append(time.monotonic())
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    asyncio.run(alice())
+    thread.join(5)
+    assert errors == [] and order == ["alice", "bob"]
+    assert gate.applied == ["alice", "bob"]
+
+
+def test_identities_take_turns(gate):
+    order = []
+
+    async def sign(context, label, hold=0.01):
+        async with gate.use(context):
+            order.append(label)
+            await asyncio.sleep(hold)
+
+    async def scenario():
+        first = asyncio.ensure_future(sign(ALICE, "a1"))
+        await asyncio.sleep(0)
+        bob = asyncio.ensure_future(sign(BOB, "b1"))
+        await asyncio.sleep(0)
+        late_alice = asyncio.ensure_future(sign(ALICE, "a2"))
+        await asyncio.gather(first, bob, late_alice)
+
+    asyncio.run(scenario())
+    assert order == ["a1", "b1", "a2"]
+    assert gate.applied == ["alice", "bob", "alice"]
+
+
+def test_cancelled_waiter_does_not_block_others(gate):
+    async def scenario():
+        await gate.acquire(ALICE)
+        waiting_bob = asyncio.ensure_future(gate.acquire(BOB))
+        await asyncio.sleep(0)
+        waiting_bob.cancel()
+        await asyncio.sleep(0)
+        await asyncio.wait_for(gate.acquire(ALICE), 1)
+        gate.release()
+        gate.release()
+
+    asyncio.run(scenario())
+    assert gate._in_flight == 0 and gate._waiting == {}
+
+
+class SigningVariables:
+    Item1, Item2, Item3, Item4 = "alice", "token", "secret", "license"
+
+
+class QueueResult:
+    Success = True
+    Jwt = "jwt"
+    MessageId = "m-1"
+    GenerationTimeMs = 1
+    ErrorMessage = None
+
+
+class SigningConfig(FakeAgentConfig):
+    def GetSigningEnvironmentVariables(self):
+        return SigningVariables()
+
+    def QueueJwtSigningAsync(self, sender_email, message, max_retries, timeout_ms):
+        return CompletedTask(f"req-{message}")
+
+    def WaitForQueuedJwtResultAsync(self, request_id, timeout_ms):
+        return CompletedTask(QueueResult())
+
+
+def test_queued_signing_holds_the_identity_until_its_result_is_collected(make_agent, gate):
+    agent = make_agent(SigningConfig())
+
+    async def scenario():
+        request_id = await agent.queue_signing_async("a@example.com", "hello")
+        held = gate._in_flight
+        result = await agent.wait_for_queue_result_async(request_id)
+        return held, result
+
+    held, result = asyncio.run(scenario())
+    assert held == 1 and result["jwt"] == "jwt"
+    assert gate._in_flight == 0 and agent._signing_leases == {}
+
+
+def test_uncollected_signing_releases_the_identity_after_its_timeout(make_agent, gate):
+    agent = make_agent(SigningConfig())
+
+    async def scenario():
+        await agent.queue_signing_async("a@example.com", "hello", timeout_ms=20)
+        held = gate._in_flight
+        await asyncio.sleep(0.05)
+        return held
+
+    assert asyncio.run(scenario()) == 1
+    assert gate._in_flight == 0
+
+
+def test_batch_signing_releases_the_identity_per_message(make_agent, gate):
+    agent = make_agent(SigningConfig())
+    agent._signing_queue_started = True
+    results = asyncio.run(agent.sign_messages_async([("a@example.com", "one"), ("a@example.com", "two")]))
+    assert [result["success"] for result in results] == [True, True]
+    assert gate._in_flight == 0 and gate.switches == 1
@@ -0,0 +1,159 @@
+"""Tests for feeding Python byte sources to the DLL's stream signer."""
+
+import asyncio
+import io
+
+import pytest
+
+import hexaeight_agent.hexaeight_agent as agent_module
+from hexaeight_agent.hexaeight_agent import _iter_source_chunks, _source_size, _SigningIdentityGate
+
+from .conftest import CompletedTask, FakeAgentConfig
+
+
+class AsyncFile:
+    """Shaped like an aiofiles handle: async iteration plus a coroutine read."""
+
+    def __init__(self, lines):
+        self._lines = list(lines)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if not self._lines:
+            raise StopAsyncIteration
+        return self._lines.pop(0)
+
+    async def read(self, size=-1):
+        raise AssertionError("read must not be used when __aiter__ is available")
+
+
+class FakePipeServer:
+    def __init__(self, direction):
+        self.ClientSafePipeHandle = self
+        self.data = bytearray()
+        self.disposed = False
+
+    def Dispose(self):
+        self.disposed = True
+
+
+class FakePipeClient:
+    def __init__(self, direction, handle):
+        self._server = handle
+        self.disposed = False
+
+    def Write(self, data, offset, count):
+        assert not self._server.disposed
+        self._server.data += data[offset:offset + count]
+
+    def Dispose(self):
+        self.disposed = True
+
+
+class Result:
+    Success = True
+    Jwt = "jwt"
+    MessageId = "msg-1"
+    GenerationTimeMs = 5
+    ErrorMessage = None
+
+
+class StreamSigningConfig(FakeAgentConfig):
+    def __init__(self):
+        super().__init__()
+        self.queued = []
+
+    def QueueJwtSigningFromStreamAsync(self, sender, stream, expected_size, max_retries, timeout_ms):
+        self.queued.append((sender, stream, expected_size))
+        return CompletedTask("req-1")
+
+    def WaitForQueuedJwtResultAsync(self, request_id, timeout_ms):
+        return CompletedTask(Result())
+
+    def QueueJwtSigningFromFileAsync(self, *args):
+        raise AssertionError("non-path sources must not go through a file")
+
+
+async def collect(source, chunk_size):
+    return [bytes(chunk) async for chunk in _iter_source_chunks(source, chunk_size)]
+
+
+def test_async_iteration_is_preferred_over_read():
+    chunks = asyncio.run(collect(AsyncFile([b"abc", b"defgh"]), 4))
+
+    assert chunks == [b"abc", b"defg", b"h"]
+
+
+def test_blocking_read_sources_are_chunked():
+    assert asyncio.run(collect(io.BytesIO(b"abcdefghij"), 4)) == [b"abcd", b"efgh", b"ij"]
+
+
+def test_source_size_counts_remaining_file_bytes(tmp_path):
+    path = tmp_path / "content.bin"
+    path.write_bytes(b"x" * 100)
+
+    with open(path, "rb") as handle:
+        handle.seek(40)
+        assert _source_size(handle) == 60
+    assert _source_size(memoryview(b"abc")) == 3
+    assert _source_size(AsyncFile([])) is None
+
+
+@pytest.fixture
+def stream_agent(make_agent, monkeypatch):
+    monkeypatch.setattr(agent_module, "AnonymousPipeServerStream", FakePipeServer)
+    monkeypatch.setattr(agent_module, "AnonymousPipeClientStream", FakePipeClient)
+    monkeypatch.setattr(agent_module, "PipeDirection", type("PipeDirection", (), {"In": 0, "Out": 1}))
+    monkeypatch.setattr(agent_module, "_SIGNING_GATE", _SigningIdentityGate())
+    monkeypatch.setattr(agent_module, "_apply_signing_context", lambda context: None)
+    config = StreamSigningConfig()
+    agent = make_agent(config)
+    agent._signing_queue_started = True
+    agent._get_signing_context = lambda folder_path="": None
+    return agent, config
+
+
+def test_non_path_sources_are_piped_to_the_stream_signer(stream_agent):
+    agent, config = stream_agent
+
+    result = asyncio.run(agent.sign_stream_async("a@example.com", AsyncFile([b"hello ", b"world"]),
+                                                 chunk_size=4, size=11))
+
+    (sender, reader, expected_size), = config.queued
+    assert (sender, expected_size) == ("a@example.com", 11)
+    assert bytes(reader.data) == b"hello world"
+    assert reader.disposed
+    assert result["jwt"] == "jwt" and result["bytes"] == 11
+
+
+def test_failing_source_closes_the_reader_and_raises(stream_agent):
+    agent, config = stream_agent
+
+    async def broken():
+        yield b"partial"
+        raise OSError("disk went away")
+
+    with pytest.raises(OSError, match="disk went away"):
+        asyncio.run(agent.sign_stream_async("a@example.com", broken(), size=100))
+
+    (_, reader, expected_size), = config.queued
+    assert expected_size == 100
+    assert reader.disposed
+
+
+def test_unmeasurable_sources_need_a_size(stream_agent):
+    agent, config = stream_agent
+
+    with pytest.raises(ValueError, match="size is required"):
+        asyncio.run(agent.sign_stream_async("a@example.com", AsyncFile([b"data"])))
+    assert config.queued == []
+
+
+def test_bytes_sources_are_measured(stream_agent):
+    agent, config = stream_agent
+
+    asyncio.run(agent.sign_stream_async("a@example.com", b"twelve bytes"))
+    (_, reader, expected_size), = config.queued
+    assert expected_size == 12 and bytes(reader.data) == b"twelve bytes"
@@ -0,0 +1,68 @@
+"""Unit tests for the TaskHandle returned by create_and_lock_task."""
+
+import asyncio
+
+from .conftest import CompletedTask
+from .test_lock_heartbeats import URL, LockServerConfig
+
+
+class ValueTuple:
+    def __init__(self, item1, item2):
+        self.Item1 = item1
+        self.Item2 = item2
+
+
+class TaskServerConfig(LockServerConfig):
+    def __init__(self):
+        super().__init__()
+        self.step_updates = []
+        self.completed = []
+
+    def CreateAndLockTaskAsync(self, url, title, description, steps):
+        return CompletedTask(ValueTuple(f"task-{title}", f"msg-{title}"))
+
+    def UpdateTaskStepCompletionAsync(self, url, task_id, step_number, result):
+        self.step_updates.append((task_id, step_number, result))
+        return CompletedTask(True)
+
+    def CompleteTaskAsync(self, url, task_id, message_id):
+        self.completed.append((task_id, message_id))
+        return CompletedTask(True)
+
+
+def create(agent, title="t1"):
+    return asyncio.run(agent.create_and_lock_task(URL, title, "d", ["s1"]))
+
+
+def test_handle_unpacks_like_the_old_tuple(make_agent, monkeypatch):
+    monkeypatch.setattr("hexaeight_agent.hexaeight_agent._to_clr_string_list", list)
+    handle = create(make_agent(TaskServerConfig()))
+    task_id, message_id = handle
+    assert (task_id, message_id) == ("task-t1", "msg-t1")
+    assert handle[0] == "task-t1" and len(handle) == 2
+    assert handle.pubsub_server_url == URL
+    assert handle.created_by_internal_id == "internal-1"
+
+
+def test_handle_tracks_its_lock_until_completed(make_agent, monkeypatch):
+    monkeypatch.setattr("hexaeight_agent.hexaeight_agent._to_clr_string_list", list)
+    config = TaskServerConfig()
+    agent = make_agent(config)
+    handle = create(agent)
+    assert handle.is_locked and handle.lock_expires_at is not None
+
+    async def finish():
+        assert await handle.update_step(1, {"ok": True})
+        assert await handle.complete()
+
+    asyncio.run(finish())
+    assert config.step_updates == [("task-t1", 1, '{"ok": true}')]
+    assert config.completed == [("task-t1", "msg-t1")]
+    assert not handle.is_locked and handle.lock_expires_at is None
+
+
+def test_failed_creation_returns_none(make_agent, monkeypatch):
+    monkeypatch.setattr("hexaeight_agent.hexaeight_agent._to_clr_string_list", list)
+    config = TaskServerConfig()
+    config.CreateAndLockTaskAsync = lambda *args: CompletedTask(None)
+    assert create(make_agent(config)) is None
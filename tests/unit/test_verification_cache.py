@@ -0,0 +1,124 @@
+"""Unit tests for batch JWT verification and the verified-token cache."""
+
+import asyncio
+import base64
+import json
+import time
+
+import pytest
+
+import hexaeight_agent.hexaeight_agent as agent_module
+from hexaeight_agent.hexaeight_agent import _jwt_expiry, _VerifiedTokenCache
+
+from .conftest import CompletedTask, FakeAgentConfig
+
+
+def jwt_with(claims):
+    def encode(data):
+        return base64.urlsafe_b64encode(json.dumps(data).encode()).rstrip(b"=").decode()
+
+    return f"{encode({'alg': 'none'})}.{encode(claims)}.signature"
+
+
+VERIFIED = {"success": True, "verified": True, "signed_by": "alice"}
+
+
+class VerifyResult:
+    def __init__(self, success):
+        self.Success = success
+        self.UserHash = "hash"
+        self.SignedBy = "alice" if success else None
+        self.MessageId = "m-1"
+        self.VerificationTimeMs = 1
+        self.ErrorMessage = None if success else "bad signature"
+
+
+class VerifyingConfig(FakeAgentConfig):
+    def __init__(self):
+        super().__init__()
+        self.calls = []
+
+    def VerifyJwtAsync(self, jwt, original_message, expected_sender_email, is_file_path):
+        self.calls.append((jwt, original_message))
+        return CompletedTask(VerifyResult(jwt != "forged"))
+
+
+def test_jwt_expiry_reads_the_exp_claim():
+    assert _jwt_expiry(jwt_with({"exp": 1700000000})) == 1700000000.0
+    assert _jwt_expiry(jwt_with({"sub": "alice"})) is None
+    assert _jwt_expiry("a.b.c.d.e") is None
+    assert _jwt_expiry("not-a-jwt") is None
+
+
+def test_entries_expire_with_the_token_or_the_ttl():
+    cache = _VerifiedTokenCache(ttl_seconds=60)
+    cache.put("long", jwt_with({"exp": time.time() + 3600}), VERIFIED)
+    cache.put("short", jwt_with({"exp": time.time() + 0.05}), VERIFIED)
+    cache.put("expired", jwt_with({"exp": time.time() - 1}), VERIFIED)
+    cache.put("failed", "token", {"success": False, "verified": False})
+    time.sleep(0.06)
+    assert cache.get("long") == VERIFIED
+    assert cache.get("short") is None
+    assert cache.get("expired") is None and cache.get("failed") is None
+    assert cache.statistics()["expired"] == 1
+
+
+def test_least_recently_used_entries_are_evicted():
+    cache = _VerifiedTokenCache(max_entries=2)
+    cache.put("a", "token", VERIFIED)
+    cache.put("b", "token", VERIFIED)
+    cache.get("a")
+    cache.put("c", "token", VERIFIED)
+    assert cache.get("b") is None and cache.get("a") is not None
+    assert cache.statistics()["evictions"] == 1
+
+
+def test_batch_verifies_duplicates_once_and_caches_successes(make_agent):
+    config = VerifyingConfig()
+    agent = make_agent(config)
+    items = [("good", "hello"), {"jwt": "forged", "original_message": "hello"}, ("good", "hello", None)]
+
+    first = asyncio.run(agent.verify_many_async(items, use_cache=True))
+    second = asyncio.run(agent.verify_many_async(items, use_cache=True))
+    assert [result["verified"] for result in first] == [True, False, True]
+    assert config.calls == [("good", "hello"), ("forged", "hello"), ("forged", "hello")]
+    assert second[0]["cached"] and "cached" not in second[1]
+    agent.clear_verification_cache()
+    asyncio.run(agent.verify_many_async([("good", "hello")], use_cache=True))
+    assert config.calls[-1] == ("good", "hello")
+
+
+def test_batch_verification_is_uncached_by_default(make_agent):
+    config = VerifyingConfig()
+    agent = make_agent(config)
+    for _ in range(2):
+        result, = asyncio.run(agent.verify_many_async([("good", "hello")]))
+        assert "cached" not in result
+    assert len(config.calls) == 2
+
+
+@pytest.mark.parametrize("item", [("only-jwt",), ("j", "m", None, False, "extra"), {"jwt": "j"}])
+def test_malformed_batch_items_are_rejected(make_agent, item):
+    config = VerifyingConfig()
+    agent = make_agent(config)
+    with pytest.raises(ValueError):
+        asyncio.run(agent.verify_many_async([("good", "hello"), item]))
+    assert config.calls == []
+
+
+def test_file_verification_skips_hashing_unless_caching_is_asked_for(make_agent, monkeypatch, tmp_path):
+    path = tmp_path / "artifact.bin"
+    path.write_bytes(b"content")
+    hashed = []
+    digest = agent_module._FILE_FINGERPRINTS.digest
+    monkeypatch.setattr(agent_module._FILE_FINGERPRINTS, "digest", lambda p: hashed.append(p) or digest(p))
+    config = VerifyingConfig()
+    agent = make_agent(config)
+
+    for _ in range(2):
+        asyncio.run(agent.verify_jwt_async("good", str(path), is_file_path=True))
+    assert hashed == [] and len(config.calls) == 2
+
+    asyncio.run(agent.verify_jwt_async("good", str(path), is_file_path=True, use_cache=True))
+    cached = asyncio.run(agent.verify_jwt_async("good", str(path), is_file_path=True, use_cache=True))
+    assert cached["cached"] and len(config.calls) == 3 and len(hashed) == 2
@@ -0,0 +1,85 @@
+"""Unit tests for the worker pool's runtime start-up choices."""
+
+import os
+
+import pytest
+
+from hexaeight_agent.hexaeight_agent import (
+    FAST_IMPORT_ENV,
+    AgentWorkerConfig,
+    HexaEightWorkerPool,
+    _apply_worker_fast_import,
+    _prewarm_worker_runtime,
+    _run_agent_worker,
+)
+
+
+class RecordingProcess:
+    def __init__(self, started, target, args=(), name=None, daemon=None):
+        self._started = started
+        self.target = target
+        self.args = args
+        self.exitcode = 0
+
+    def start(self):
+        self._started.append(self)
+
+    def join(self, timeout=None):
+        pass
+
+
+class RecordingContext:
+    def __init__(self):
+        self.started = []
+
+    def Process(self, **kwargs):
+        return RecordingProcess(self.started, **kwargs)
+
+
+def worker_main(agent, config):
+    pass
+
+
+def make_pool(**kwargs):
+    pool = HexaEightWorkerPool(worker_main, [AgentWorkerConfig("a.json"), AgentWorkerConfig("b.json")],
+                               start_method="spawn", **kwargs)
+    pool._context = RecordingContext()
+    return pool
+
+
+def test_worker_keeps_supervisor_choice_by_default(monkeypatch):
+    monkeypatch.delenv(FAST_IMPORT_ENV, raising=False)
+    _apply_worker_fast_import(None)
+    assert FAST_IMPORT_ENV not in os.environ
+
+
+@pytest.mark.parametrize("fast_import, expected", [(True, "1"), (False, "0")])
+def test_explicit_fast_import_choice_is_applied(monkeypatch, fast_import, expected):
+    monkeypatch.delenv(FAST_IMPORT_ENV, raising=False)
+    _apply_worker_fast_import(fast_import)
+    assert os.environ[FAST_IMPORT_ENV] == expected
+
+
+def test_no_prewarm_without_fast_import(monkeypatch):
+    monkeypatch.delenv(FAST_IMPORT_ENV, raising=False)
+    pool = make_pool()
+    pool.start()
+    targets = [process.target for process in pool._context.started]
+    assert targets == [_run_agent_worker, _run_agent_worker]
+    assert all(process.args[2] is None for process in pool._context.started)
+
+
+def test_prewarm_once_when_supervisor_opted_in(monkeypatch):
+    monkeypatch.setenv(FAST_IMPORT_ENV, "1")
+    pool = make_pool()
+    pool.start()
+    targets = [process.target for process in pool._context.started]
+    assert targets == [_prewarm_worker_runtime, _run_agent_worker, _run_agent_worker]
+
+
+def test_pool_parameter_overrides_environment(monkeypatch):
+    monkeypatch.setenv(FAST_IMPORT_ENV, "1")
+    pool = make_pool(fast_import=False)
+    pool.start()
+    assert [process.target for process in pool._context.started] == [_run_agent_worker] * 2
+    assert all(process.args[2] is False for process in pool._context.started)